@@ -0,0 +1,90 @@
+"""
+Database routing for read replicas.
+
+Reads only go to a replica inside ``read_from_replica()``, which is applied
+to read-heavy endpoints; everything else keeps using ``default``. Once a
+request performs a write it is pinned to ``default`` so it reads its own
+writes, and ``ReplicaPinningMiddleware`` keeps the client pinned for
+``REPLICA_STICKY_SECONDS`` afterwards to cover replication lag.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+PRIMARY = 'default'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+_request_state = ContextVar('replica_request_state', default=None)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica_')]
+
+
+@contextmanager
+def read_from_replica():
+    """Route reads in this block (or decorated function) to a replica."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Force reads in this block (or decorated function) to the primary."""
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def request_routing(pinned=False):
+    """
+    Per-request routing state. Yields a dict whose ``wrote`` flag tells
+    whether the request performed a write.
+    """
+    state = {'pinned': pinned, 'wrote': False}
+    token = _request_state.set(state)
+    try:
+        yield state
+    finally:
+        _request_state.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Sends opted-in reads to a random replica alias (``replica_<n>``) unless
+    the current request is pinned to the primary. All writes go to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get():
+            return PRIMARY
+        state = _request_state.get()
+        if state is not None and state['pinned']:
+            return PRIMARY
+        replicas = replica_aliases()
+        return random.choice(replicas) if replicas else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state['pinned'] = True
+            state['wrote'] = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Allowed everywhere so local SQLite replicas can be migrated
+        # with ``migrate --database=replica_<n>``
+        return True
@@ -12,7 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
-from decouple import config
+from decouple import config, Csv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -44,6 +44,7 @@ INSTALLED_APPS = [
     'users',
     'questions',
     'testcase',
+    'submissions',
     'utils',
 ]
 
@@ -56,6 +57,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'gencoder.middleware.ReplicaPinningMiddleware',
 ]
 
 ROOT_URLCONF = 'gencoder.urls'
@@ -88,9 +90,98 @@ DATABASES = {
     }
 }
 
+# Read replicas: comma-separated database names using the default engine,
+# e.g. DATABASE_REPLICAS=replica1.sqlite3,replica2.sqlite3 for local testing.
+# They become the aliases replica_1, replica_2, ...
+DATABASE_REPLICAS = config('DATABASE_REPLICAS', default='', cast=Csv())
+for index, replica_name in enumerate(DATABASE_REPLICAS, start=1):
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / replica_name,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['gencoder.db_router.ReplicaRouter']
+
+# Seconds a client stays pinned to the primary after a write
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=5, cast=int)
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# The question caches are invalidated by bumping version counters stored in
+# this cache, so with more than one worker process it must be a shared backend
+# (e.g. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache with
+# CACHE_LOCATION=redis://127.0.0.1:6379/1, or memcached). The per-process
+# default is only correct for a single process.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='gencoder-default'),
+    }
+}
+
+# Seconds an assembled question detail payload stays cached
+QUESTION_DETAIL_CACHE_TIMEOUT = config('QUESTION_DETAIL_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Cache-Control max-age (seconds) for question list/detail responses, which
+# are always revalidated with ETags, and for the near-static language/topic lists
+QUESTION_HTTP_MAX_AGE = config('QUESTION_HTTP_MAX_AGE', default=0, cast=int)
+CATALOG_HTTP_MAX_AGE = config('CATALOG_HTTP_MAX_AGE', default=300, cast=int)
+
+# Local SQLite FTS5 file backing question search
+SEARCH_INDEX_PATH = config('SEARCH_INDEX_PATH', default=str(BASE_DIR / 'search_index.sqlite3'))
+
+# Write-behind batching of UserProfile counters: flush period (seconds) and
+# the number of distinct pending users that triggers an early flush
+PROFILE_COUNTER_FLUSH_INTERVAL = config('PROFILE_COUNTER_FLUSH_INTERVAL', default=2.0, cast=float)
+PROFILE_COUNTER_MAX_PENDING = config('PROFILE_COUNTER_MAX_PENDING', default=1000, cast=int)
+
+# Password-hashing processes kept per web worker for bulk user provisioning;
+# started on the first upload and reused (the command sizes its own pool)
+USER_PROVISION_WORKERS = config('USER_PROVISION_WORKERS', default=2, cast=int)
+
+# Seconds after which the in-process leaderboard is rebuilt from submission
+# history on the next read. Each worker only applies its own verdicts
+# incrementally, so this bounds how long workers' standings can differ.
+# 0 builds once per process and is only correct with a single worker.
+LEADERBOARD_REBUILD_INTERVAL = config('LEADERBOARD_REBUILD_INTERVAL', default=300, cast=int)
+
+# Signed token authentication: token lifetimes (seconds) and the
+# in-process cache of authenticated users
+ACCESS_TOKEN_LIFETIME = config('ACCESS_TOKEN_LIFETIME', default=900, cast=int)
+REFRESH_TOKEN_LIFETIME = config('REFRESH_TOKEN_LIFETIME', default=7 * 24 * 3600, cast=int)
+TOKEN_USER_CACHE_SIZE = config('TOKEN_USER_CACHE_SIZE', default=10000, cast=int)
+TOKEN_USER_CACHE_TTL = config('TOKEN_USER_CACHE_TTL', default=300, cast=int)
+
+# Judge limits: a question's time/memory limits are scaled per language by
+# these multipliers, and run timeouts are capped at the executor's maximum
+JUDGE_LANGUAGE_LIMIT_MULTIPLIERS = {
+    'cpp': {'time': 1.0, 'memory': 1.0},
+    'java': {'time': 2.0, 'memory': 2.0},
+    'python': {'time': 3.0, 'memory': 1.5},
+}
+JUDGE_MAX_RUN_TIMEOUT_MS = config('JUDGE_MAX_RUN_TIMEOUT_MS', default=3000, cast=int)
+JUDGE_COMPILE_TIMEOUT_MS = config('JUDGE_COMPILE_TIMEOUT_MS', default=10000, cast=int)
+
+# Concurrent executor calls per worker process, and how many of them only
+# interactive "run" requests may use, so they never queue behind submissions
+JUDGE_EXECUTOR_SLOTS = config('JUDGE_EXECUTOR_SLOTS', default=8, cast=int)
+JUDGE_INTERACTIVE_RESERVED_SLOTS = config('JUDGE_INTERACTIVE_RESERVED_SLOTS', default=2, cast=int)
+
+# Concurrent executor calls (and pooled executor connections) per event
+# loop for the async execute view and judge streams; further submissions
+# wait without a thread
+JUDGE_ASYNC_EXECUTOR_SLOTS = config('JUDGE_ASYNC_EXECUTOR_SLOTS', default=64, cast=int)
+
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
-    'PAGE_SIZE': 100
+    'PAGE_SIZE': 100,
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'users.authentication.SignedTokenAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
 }
 
 # Password validation
@@ -0,0 +1,100 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+from questions.models import Question
+from .db_router import read_from_replica, request_routing, use_primary
+from .middleware import ReplicaPinningMiddleware
+
+
+REPLICA = 'replica_1'
+
+
+class ReplicaRoutingTests(TestCase):
+    """
+    Routing against a second SQLite file registered as ``replica_1``, the
+    alias ``DATABASE_REPLICAS`` creates. The replica is not a mirror here,
+    so each read shows which database served it. The alias only exists
+    once the class is set up, so it is allowed (and rolled back after each
+    test) from then on.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._directory = tempfile.TemporaryDirectory()
+        replica = {
+            **connections.settings['default'],
+            'NAME': os.path.join(cls._directory.name, 'replica.sqlite3'),
+            'TEST': {**connections.settings['default']['TEST'], 'MIRROR': None},
+        }
+        cls._databases = mock.patch.dict(settings.DATABASES, {REPLICA: replica})
+        cls._databases.start()
+        cls.databases = {'default', REPLICA}
+        call_command('migrate', database=REPLICA, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del cls.databases
+        cls._databases.stop()
+        cls._directory.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.question = Question.objects.create(title='Primary copy')
+        Question.objects.using(REPLICA).create(id=self.question.id, title='Replica copy')
+
+    def title(self):
+        return Question.objects.get(id=self.question.id).title
+
+    def test_reads_use_the_replica_only_when_opted_in(self):
+        self.assertEqual(self.title(), 'Primary copy')
+        with read_from_replica():
+            self.assertEqual(self.title(), 'Replica copy')
+            with use_primary():
+                self.assertEqual(self.title(), 'Primary copy')
+
+    def test_a_write_pins_the_rest_of_the_request(self):
+        with request_routing() as state, read_from_replica():
+            self.assertEqual(self.title(), 'Replica copy')
+            Question.objects.filter(id=self.question.id).update(title='Edited')
+            self.assertTrue(state['wrote'])
+            self.assertEqual(self.title(), 'Edited')
+
+    def test_unsafe_requests_read_from_the_replica_until_they_write(self):
+        def view(request):
+            with read_from_replica():
+                return HttpResponse(self.title())
+
+        response = ReplicaPinningMiddleware(view)(RequestFactory().post('/'))
+
+        self.assertEqual(response.content, b'Replica copy')
+        self.assertNotIn(ReplicaPinningMiddleware.COOKIE_NAME, response.cookies)
+
+    def test_writing_requests_set_the_pin_cookie(self):
+        def view(request):
+            Question.objects.create(title='New')
+            with read_from_replica():
+                return HttpResponse(self.title())
+
+        response = ReplicaPinningMiddleware(view)(RequestFactory().post('/'))
+
+        self.assertEqual(response.content, b'Primary copy')
+        cookie = response.cookies[ReplicaPinningMiddleware.COOKIE_NAME]
+        self.assertEqual(cookie['max-age'], settings.REPLICA_STICKY_SECONDS)
+
+    def test_pin_cookie_keeps_the_client_on_the_primary(self):
+        response = self.client.get('/api/questions/')
+        self.assertEqual(response.json()['results'][0]['title'], 'Replica copy')
+
+        self.client.cookies[ReplicaPinningMiddleware.COOKIE_NAME] = '1'
+        response = self.client.get('/api/questions/?pinned')
+        self.assertEqual(response.json()['results'][0]['title'], 'Primary copy')
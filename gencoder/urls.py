@@ -22,4 +22,5 @@ urlpatterns = [
     path('api/users/', include('users.urls')),
     path('api/questions/', include('questions.urls')),
     path('api/judge/', include('utils.judge.urls')),
+    path('api/submissions/', include('submissions.urls')),
 ]
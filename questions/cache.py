@@ -0,0 +1,205 @@
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import add_never_cache_headers, patch_cache_control
+from django.views.decorators.http import condition
+
+
+DETAIL_TIMEOUT = getattr(settings, 'QUESTION_DETAIL_CACHE_TIMEOUT', 3600)
+BUILD_LOCK_TIMEOUT = 30
+BUILD_WAIT_INTERVAL = 0.05
+
+
+class _KeyLocks:
+    """
+    Per-key locks shared by the threads of this process. Entries are
+    reference counted so the table only holds keys that are being built.
+    """
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._locks = {}
+
+    def acquire(self, key):
+        with self._guard:
+            lock, users = self._locks.get(key, (None, 0))
+            if lock is None:
+                lock = threading.Lock()
+            self._locks[key] = (lock, users + 1)
+        lock.acquire()
+        return lock
+
+    def release(self, key, lock):
+        lock.release()
+        with self._guard:
+            _, users = self._locks[key]
+            if users <= 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, users - 1)
+
+
+_key_locks = _KeyLocks()
+
+
+def _version_key(scope):
+    return f"questions:version:{scope}"
+
+
+def _detail_scope(question_id):
+    return f"detail:{question_id}"
+
+
+def _detail_key(question_id, version):
+    return f"questions:detail:{question_id}:v{version}"
+
+
+def _new_version():
+    # Seeded from the clock so an evicted counter never falls back to a
+    # version whose payload may still be cached.
+    return int(time.time() * 1000)
+
+
+def get_version(scope):
+    """Return the current cache version of a scope (e.g. ``list``, ``topics``)."""
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def peek_version(scope):
+    """Return the current version of a scope, or None without creating one."""
+    return cache.get(_version_key(scope))
+
+
+def bump_version(scope):
+    """Invalidate everything cached or validated under a scope."""
+    key = _version_key(scope)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = _new_version()
+        cache.set(key, version, None)
+        return version
+
+
+def get_detail_version(question_id):
+    """Return the current cache version for a question's detail payload."""
+    return get_version(_detail_scope(question_id))
+
+
+def peek_detail_version(question_id):
+    """Return a question's detail version, or None if it has none yet."""
+    return peek_version(_detail_scope(question_id))
+
+
+def bump_detail_version(question_id):
+    """Invalidate every cached detail payload of a question."""
+    return bump_version(_detail_scope(question_id))
+
+
+def get_or_build_detail(question_id, builder):
+    """
+    Return ``(payload, complete)`` for a question's assembled detail
+    payload, from the cache or by calling ``builder`` on a miss.
+
+    ``builder`` returns a ``(payload, cacheable)`` tuple; incomplete payloads
+    (e.g. when storage reads failed) are returned but not stored. While the
+    question has no cache version yet, the payload is built without being
+    stored and the version is only created once the build succeeded, so
+    requests for missing questions leave no version keys behind. Concurrent
+    misses on the same key are coalesced: threads of this process wait on a
+    shared lock and other processes wait on a cache-held lock while a single
+    caller builds the payload.
+    """
+    version = peek_detail_version(question_id)
+    if version is None:
+        payload, cacheable = builder()
+        get_detail_version(question_id)
+        return payload, cacheable
+
+    key = _detail_key(question_id, version)
+    payload = cache.get(key)
+    if payload is not None:
+        return payload, True
+
+    lock = _key_locks.acquire(key)
+    try:
+        payload = cache.get(key)
+        if payload is not None:
+            return payload, True
+
+        build_lock_key = f"{key}:lock"
+        owns_build_lock = cache.add(build_lock_key, 1, BUILD_LOCK_TIMEOUT)
+        if not owns_build_lock:
+            payload = _wait_for_payload(key)
+            if payload is not None:
+                return payload, True
+
+        try:
+            payload, cacheable = builder()
+            if cacheable:
+                cache.set(key, payload, DETAIL_TIMEOUT)
+            return payload, cacheable
+        finally:
+            if owns_build_lock:
+                cache.delete(build_lock_key)
+    finally:
+        _key_locks.release(key, lock)
+
+
+def _wait_for_payload(key):
+    """Poll for a payload being built by another process."""
+    deadline = time.monotonic() + BUILD_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(BUILD_WAIT_INTERVAL)
+        payload = cache.get(key)
+        if payload is not None:
+            return payload
+        if cache.get(f"{key}:lock") is None:
+            break
+    return None
+
+
+def conditional_get(etag_func=None, last_modified_func=None, **cache_control_kwargs):
+    """
+    View decorator answering ``If-None-Match``/``If-Modified-Since`` with 304
+    before the view runs, and adding ``Cache-Control`` to successful responses.
+    The validator functions receive the view's arguments and must be cheap:
+    they run on every request, including the ones answered with 304. An
+    ETag function may return None when there is nothing to validate yet.
+
+    Only complete 200 responses keep their validators. Errors lose them, and
+    so do responses the view marked with ``cacheable = False`` (degraded
+    payloads); those are also sent with ``no-store`` so clients never
+    revalidate against them.
+    """
+    def decorator(view_func):
+        conditional_view = condition(
+            etag_func=etag_func,
+            last_modified_func=last_modified_func
+        )(view_func)
+
+        @wraps(view_func)
+        def inner(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if response.status_code == 304 or (
+                response.status_code == 200 and getattr(response, 'cacheable', True)
+            ):
+                patch_cache_control(response, **cache_control_kwargs)
+                return response
+
+            for header in ('ETag', 'Last-Modified'):
+                if response.has_header(header):
+                    del response[header]
+            if response.status_code == 200:
+                add_never_cache_headers(response)
+            return response
+        return inner
+    return decorator
@@ -0,0 +1,88 @@
+import logging
+
+from django.core.cache import cache
+
+from utils.judge.Judge import Judge
+from utils.storage.s3_service import S3Service
+from .cache import DETAIL_TIMEOUT, get_detail_version
+from .models import Question, Code
+
+
+logger = logging.getLogger(__name__)
+
+s3 = S3Service()
+
+
+def _judge_config_key(question_id, version):
+    return f"questions:judge:{question_id}:v{version}"
+
+
+def load_starter_code(question_id):
+    """Starter code of a question from storage, keyed by language name."""
+    codes = Code.objects.filter(question_id=question_id).select_related('language')
+    return {code.language.name: s3.get_content(code.code_s3_key) for code in codes}
+
+
+def _signature_summary(language_analysis):
+    """Keep the parts of a language's analysis the judge and editors need."""
+    ast_analysis = language_analysis.get('ast_analysis') or {}
+    parameters = (ast_analysis.get('parameter_analysis') or {}).get('parameters', [])
+    return {
+        'detected_type': language_analysis.get('detected_type'),
+        'confidence': round(language_analysis.get('confidence', 0), 4),
+        'return_type': ast_analysis.get('return_type'),
+        'parameters': [
+            {'name': parameter['name'], 'type': parameter['type_hint'] or parameter['inferred_type']}
+            for parameter in parameters
+        ]
+    }
+
+
+def analyze_question(question, starter_code):
+    """
+    Detect the question's problem type from its starter code and store the
+    type, its confidence and the per-language signatures on the question.
+    Runs when starter code is created or changed, never per submission.
+    """
+    analysis = Judge().analyze_starter_code(starter_code)
+    question.problem_type = analysis['detected_problem_type']
+    question.problem_type_confidence = round(analysis['confidence'], 4)
+    question.signature = {
+        language: _signature_summary(language_analysis)
+        for language, language_analysis in analysis['language_analysis'].items()
+    }
+    question.save(update_fields=['problem_type', 'problem_type_confidence', 'signature'])
+    return analysis
+
+
+def get_judge_config(question_id):
+    """
+    Return ``{'problem_type', 'signature', 'compare_mode', 'float_tolerance',
+    'time_limit_ms', 'memory_limit_mb'}`` for judging a question, cached
+    under the question's detail version so edits invalidate it.
+    Questions created before detection was stored are analyzed once here and
+    the result persisted. Raises ``Question.DoesNotExist``.
+    """
+    key = _judge_config_key(question_id, get_detail_version(question_id))
+    config = cache.get(key)
+    if config is not None:
+        return config
+
+    question = Question.objects.get(id=question_id)
+    if question.problem_type is None:
+        starter_code = load_starter_code(question.id)
+        if starter_code:
+            analyze_question(question, starter_code)
+            logger.info("Stored detected problem type %s for question %s", question.problem_type, question.id)
+
+    config = {
+        'problem_type': question.problem_type,
+        'signature': question.signature,
+        'compare_mode': question.compare_mode,
+        'float_tolerance': question.float_tolerance,
+        'time_limit_ms': question.time_limit_ms,
+        'memory_limit_mb': question.memory_limit_mb
+    }
+    if config['problem_type']:
+        cache.set(key, config, DETAIL_TIMEOUT)
+    return config
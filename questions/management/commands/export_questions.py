@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from questions.transfer import BundleWriter, QuestionExporter
+from utils.storage.s3_service import S3Service
+
+
+class Command(BaseCommand):
+    help = "Export questions with their test cases and starter code to a directory or .zip archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument('destination', help='Directory, or a path ending in .zip')
+        parser.add_argument('--workers', type=int, default=8,
+                            help='Threads used for reading from S3')
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='Questions fetched per batch')
+        parser.add_argument('--checkpoint', default=None,
+                            help='Checkpoint file for resuming (default: <destination>.export-checkpoint)')
+        parser.add_argument('--resume', action='store_true',
+                            help='Continue an interrupted run, skipping questions in its checkpoint')
+
+    def handle(self, *args, **options):
+        writer = BundleWriter(options['destination'], resume=options['resume'])
+        exporter = QuestionExporter(
+            S3Service(),
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+            checkpoint_path=options['checkpoint'] or f"{options['destination'].rstrip('/')}.export-checkpoint",
+            resume=options['resume'],
+            report=self.stdout.write
+        )
+        # An interrupted run leaves its staging files for --resume; only a
+        # finished one is packed into the destination archive
+        progress = exporter.run(writer)
+        writer.close(complete=not progress.failed)
+
+        if progress.skipped:
+            self.stdout.write(f"Skipped {progress.skipped} questions already exported (checkpoint)")
+        for name, error in exporter.errors:
+            self.stderr.write(f"{name}: {error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {progress.processed - progress.failed} questions, {progress.failed} failed"
+        ))
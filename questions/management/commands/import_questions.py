@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from questions.transfer import BundleReader, QuestionImporter
+from utils.storage.s3_service import S3Service
+
+
+class Command(BaseCommand):
+    help = "Import questions with their test cases and starter code from a directory or archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='Directory, .zip or .tar[.gz] of question bundles')
+        parser.add_argument('--workers', type=int, default=8,
+                            help='Threads used for reading bundles and uploading to S3')
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='Questions inserted per database batch')
+        parser.add_argument('--checkpoint', default=None,
+                            help='Checkpoint file for resuming (default: <source>.import-checkpoint)')
+        parser.add_argument('--resume', action='store_true',
+                            help='Continue an interrupted run, skipping questions in its checkpoint')
+
+    def handle(self, *args, **options):
+        try:
+            reader = BundleReader(options['source'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        importer = QuestionImporter(
+            S3Service(),
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+            checkpoint_path=options['checkpoint'] or f"{options['source'].rstrip('/')}.import-checkpoint",
+            resume=options['resume'],
+            report=self.stdout.write
+        )
+        progress = importer.run(reader)
+
+        if progress.skipped:
+            self.stdout.write(f"Skipped {progress.skipped} questions already imported (checkpoint)")
+        for name, error in importer.errors:
+            self.stderr.write(f"{name}: {error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {progress.processed - progress.failed} questions, {progress.failed} failed"
+        ))
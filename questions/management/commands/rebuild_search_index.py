@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from questions.models import Question
+from questions.search import search_index
+from utils.storage.s3_service import S3Service
+
+
+class Command(BaseCommand):
+    help = "Rebuild the question full-text search index from the database and S3."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8,
+                            help='Concurrent S3 reads for question markdown')
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help='Questions fetched from the database per batch')
+
+    def handle(self, *args, **options):
+        s3 = S3Service()
+        batch_size = options['batch_size']
+
+        def fetch_markdown(question):
+            try:
+                return s3.get_question(question.id)
+            except Exception as e:
+                self.stderr.write(f"Question {question.id}: no description indexed ({str(e)})")
+                return ''
+
+        def entries(pool):
+            questions = (
+                Question.objects.order_by('id')
+                .prefetch_related('topics')
+                .iterator(chunk_size=batch_size)
+            )
+            while True:
+                batch = list(islice(questions, batch_size))
+                if not batch:
+                    return
+                for question, markdown in zip(batch, pool.map(fetch_markdown, batch)):
+                    yield (
+                        question.id,
+                        question.title,
+                        markdown,
+                        question.difficulty,
+                        [topic.topic for topic in question.topics.all()],
+                    )
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            count = search_index.rebuild(entries(pool))
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} questions"))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-19 10:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0008_question_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='code',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the uploaded starter code', max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the uploaded markdown content', max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0009_question_content_hash_code_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('accepted', models.PositiveIntegerField(default=0)),
+                ('solvers', models.PositiveIntegerField(default=0, help_text='Distinct users with an accepted submission')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('language', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='question_stats', to='questions.language')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='questions.question')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('question', 'language'), name='unique_question_language_stats'), models.UniqueConstraint(condition=models.Q(('language__isnull', True)), fields=('question',), name='unique_question_overall_stats')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-19 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0010_questionstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='problem_type',
+            field=models.CharField(blank=True, choices=[('function_only_int', 'Integer Function'), ('function_only_array', 'Array Function'), ('function_only_string', 'String Function')], help_text='Judge wrapper detected from the starter code', max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='problem_type_confidence',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='signature',
+            field=models.JSONField(blank=True, default=dict, help_text='Parsed solution signature per language'),
+        ),
+    ]
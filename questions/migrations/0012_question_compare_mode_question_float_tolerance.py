@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-19 14:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0011_question_problem_type_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='compare_mode',
+            field=models.CharField(choices=[('exact', 'Exact (normalized whitespace)'), ('tokens', 'Token-wise'), ('float', 'Token-wise with float tolerance')], default='exact', help_text='How program output is compared with expected output', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='float_tolerance',
+            field=models.FloatField(default=1e-06, help_text='Absolute or relative tolerance in float compare mode'),
+        ),
+    ]
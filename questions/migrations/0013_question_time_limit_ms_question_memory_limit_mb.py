@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0012_question_compare_mode_question_float_tolerance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='time_limit_ms',
+            field=models.PositiveIntegerField(default=1000, help_text='Run time limit per test case, before language multipliers'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='memory_limit_mb',
+            field=models.PositiveIntegerField(default=256, help_text='Memory limit per test case, before language multipliers'),
+        ),
+    ]
@@ -37,15 +37,42 @@ class Language(models.Model):
         return self.get_name_display()
 
 class Question(models.Model):
+    COMPARE_MODE_CHOICES = (
+        ('exact', 'Exact (normalized whitespace)'),
+        ('tokens', 'Token-wise'),
+        ('float', 'Token-wise with float tolerance'),
+    )
+    PROBLEM_TYPE_CHOICES = (
+        ('function_only_int', 'Integer Function'),
+        ('function_only_array', 'Array Function'),
+        ('function_only_string', 'String Function'),
+    )
+    
     title = models.CharField(max_length=200, blank=False,)
     question_s3_key = models.CharField(max_length=500, null=True, blank=True, 
                                       help_text="S3 key for the markdown question file")
+    content_hash = models.CharField(max_length=64, null=True, blank=True,
+                                    help_text="SHA-256 of the uploaded markdown content")
     difficulty = models.CharField(max_length=20, choices=[
         ('easy', 'Easy'),
         ('medium', 'Medium'),
         ('hard', 'Hard')
     ], default='easy')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    problem_type = models.CharField(max_length=50, choices=PROBLEM_TYPE_CHOICES, null=True, blank=True,
+                                    help_text="Judge wrapper detected from the starter code")
+    problem_type_confidence = models.FloatField(default=0)
+    signature = models.JSONField(default=dict, blank=True,
+                                 help_text="Parsed solution signature per language")
+    compare_mode = models.CharField(max_length=20, choices=COMPARE_MODE_CHOICES, default='exact',
+                                    help_text="How program output is compared with expected output")
+    float_tolerance = models.FloatField(default=1e-6,
+                                        help_text="Absolute or relative tolerance in float compare mode")
+    time_limit_ms = models.PositiveIntegerField(default=1000,
+                                                help_text="Run time limit per test case, before language multipliers")
+    memory_limit_mb = models.PositiveIntegerField(default=256,
+                                                  help_text="Memory limit per test case, before language multipliers")
     
     languages = models.ManyToManyField('Language', related_name='questions')
     topics = models.ManyToManyField('Topic', related_name='questions')
@@ -65,6 +92,8 @@ class Code(models.Model):
     language = models.ForeignKey(Language, related_name='codes', on_delete=models.CASCADE)
     code_s3_key = models.TextField(max_length=500, null=False, blank=False,
                                    help_text="S3 key for the code file")
+    content_hash = models.CharField(max_length=64, null=True, blank=True,
+                                    help_text="SHA-256 of the uploaded starter code")
     
     
     class Meta:
@@ -74,11 +103,32 @@ class Code(models.Model):
         return f"{self.question.title} - {self.language.get_name_display()}"
 
 
-
-
-
-
-
-
-
+class QuestionStats(models.Model):
+    """
+    Materialized acceptance aggregates for a question, overall (``language``
+    is null) and per language. Maintained incrementally as submissions are
+    judged and periodically reconciled from submission history.
+    """
+    question = models.ForeignKey(Question, related_name='stats', on_delete=models.CASCADE)
+    language = models.ForeignKey(Language, related_name='question_stats', on_delete=models.CASCADE,
+                                 null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    accepted = models.PositiveIntegerField(default=0)
+    solvers = models.PositiveIntegerField(default=0, help_text="Distinct users with an accepted submission")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['question', 'language'], name='unique_question_language_stats'),
+            models.UniqueConstraint(fields=['question'], condition=models.Q(language__isnull=True),
+                                    name='unique_question_overall_stats'),
+        ]
+    
+    @property
+    def acceptance_rate(self):
+        return round(self.accepted / self.attempts, 4) if self.attempts else 0.0
+    
+    def __str__(self):
+        scope = self.language.get_name_display() if self.language_id else 'All languages'
+        return f"{self.question_id} - {scope}: {self.accepted}/{self.attempts}"
 
@@ -0,0 +1,179 @@
+import logging
+import re
+import sqlite3
+import threading
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+SCHEMA = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS question_fts
+    USING fts5(title, body, tokenize='porter unicode61')
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS question_meta (
+        question_id INTEGER PRIMARY KEY,
+        difficulty TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS question_topic (
+        topic TEXT NOT NULL,
+        question_id INTEGER NOT NULL,
+        PRIMARY KEY (topic, question_id)
+    ) WITHOUT ROWID
+    """,
+)
+
+# bm25 column weights: a hit in the title outranks one in the body
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+
+class QuestionSearchIndex:
+    """
+    Local SQLite FTS5 index over question titles and markdown descriptions.
+
+    The index lives in its own SQLite file (``SEARCH_INDEX_PATH``) whatever the
+    main database backend is. Rows are keyed by question ID, with difficulty
+    and topics kept in side tables so filters are applied inside the same
+    ranked query.
+    """
+
+    def __init__(self, path=None):
+        self.path = str(path or settings.SEARCH_INDEX_PATH)
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            try:
+                for statement in SCHEMA:
+                    connection.execute(statement)
+                connection.commit()
+            except sqlite3.OperationalError as e:
+                connection.close()
+                raise Exception(f"Failed to initialize search index (is FTS5 available?): {str(e)}")
+            self._local.connection = connection
+        return connection
+
+    def index_question(self, question, markdown_content):
+        """Insert or replace a question's entry in the index."""
+        topics = list(question.topics.values_list('topic', flat=True))
+        connection = self._connection()
+        with connection:
+            self._write(connection, question.id, question.title, markdown_content,
+                        question.difficulty, topics)
+
+    def index_entries(self, entries):
+        """
+        Insert or replace many questions in one transaction. ``entries`` has
+        the same shape as for :meth:`rebuild`.
+        """
+        connection = self._connection()
+        with connection:
+            for entry in entries:
+                self._write(connection, *entry)
+
+    def remove_question(self, question_id):
+        """Drop a question from the index."""
+        connection = self._connection()
+        with connection:
+            self._delete(connection, question_id)
+
+    def rebuild(self, entries):
+        """
+        Replace the whole index with ``entries``, an iterable of
+        ``(question_id, title, markdown, difficulty, topics)`` tuples, in a
+        single transaction. Returns the number of indexed questions.
+        """
+        connection = self._connection()
+        count = 0
+        with connection:
+            connection.execute("DELETE FROM question_fts")
+            connection.execute("DELETE FROM question_meta")
+            connection.execute("DELETE FROM question_topic")
+            for entry in entries:
+                self._insert(connection, *entry)
+                count += 1
+        connection.execute("INSERT INTO question_fts(question_fts) VALUES ('optimize')")
+        connection.commit()
+        return count
+
+    def search(self, query, difficulty=None, topic=None, limit=20, offset=0):
+        """
+        Return ``(question_id, score, snippet)`` tuples ranked by bm25, best
+        first. Lower scores are better, as reported by SQLite.
+        """
+        match = self._build_match(query)
+        if not match:
+            return []
+
+        sql = [
+            "SELECT f.rowid,",
+            f"bm25(question_fts, {TITLE_WEIGHT}, {BODY_WEIGHT}) AS score,",
+            "snippet(question_fts, 1, '**', '**', '...', 16)",
+            "FROM question_fts f",
+            "JOIN question_meta m ON m.question_id = f.rowid",
+            "WHERE question_fts MATCH ?",
+        ]
+        params = [match]
+        if difficulty:
+            sql.append("AND m.difficulty = ?")
+            params.append(difficulty)
+        if topic:
+            sql.append("AND EXISTS (SELECT 1 FROM question_topic t "
+                       "WHERE t.topic = ? AND t.question_id = f.rowid)")
+            params.append(topic)
+        sql.append("ORDER BY score LIMIT ? OFFSET ?")
+        params.extend([limit, offset])
+
+        return self._connection().execute(' '.join(sql), params).fetchall()
+
+    @staticmethod
+    def _build_match(query):
+        """
+        Turn free text into an FTS5 expression: every word is quoted so user
+        input can't inject query syntax, and the last word is a prefix match
+        to support search-as-you-type.
+        """
+        tokens = TOKEN_RE.findall(query or '')
+        if not tokens:
+            return ''
+        terms = [f'"{token}"' for token in tokens]
+        terms[-1] += '*'
+        return ' '.join(terms)
+
+    def _write(self, connection, question_id, title, markdown, difficulty, topics):
+        self._delete(connection, question_id)
+        self._insert(connection, question_id, title, markdown, difficulty, topics)
+
+    @staticmethod
+    def _insert(connection, question_id, title, markdown, difficulty, topics):
+        connection.execute(
+            "INSERT INTO question_fts(rowid, title, body) VALUES (?, ?, ?)",
+            (question_id, title, markdown or '')
+        )
+        connection.execute(
+            "INSERT INTO question_meta(question_id, difficulty) VALUES (?, ?)",
+            (question_id, difficulty)
+        )
+        connection.executemany(
+            "INSERT OR IGNORE INTO question_topic(topic, question_id) VALUES (?, ?)",
+            [(topic, question_id) for topic in topics]
+        )
+
+    @staticmethod
+    def _delete(connection, question_id):
+        connection.execute("DELETE FROM question_fts WHERE rowid = ?", (question_id,))
+        connection.execute("DELETE FROM question_meta WHERE question_id = ?", (question_id,))
+        connection.execute("DELETE FROM question_topic WHERE question_id = ?", (question_id,))
+
+
+search_index = QuestionSearchIndex()
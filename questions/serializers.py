@@ -44,10 +44,29 @@ class QuestionSerializer(serializers.ModelSerializer):
         required=False
     )
     
+    # Acceptance aggregates, present when the queryset prefetched them
+    stats = serializers.SerializerMethodField()
+    
     class Meta:
         model = Question
         fields = '__all__'
-        read_only_fields = ('created_at', 'updated_at', 'question_s3_key')
+        read_only_fields = ('created_at', 'updated_at', 'question_s3_key',
+                            'problem_type', 'problem_type_confidence', 'signature', 'content_hash')
+    
+    def get_stats(self, obj):
+        """Read the materialized overall aggregates prefetched into ``overall_stats``."""
+        overall_stats = getattr(obj, 'overall_stats', None)
+        if overall_stats is None:
+            return None
+        if not overall_stats:
+            return {'attempts': 0, 'accepted': 0, 'solvers': 0, 'acceptance_rate': 0.0}
+        stats = overall_stats[0]
+        return {
+            'attempts': stats.attempts,
+            'accepted': stats.accepted,
+            'solvers': stats.solvers,
+            'acceptance_rate': stats.acceptance_rate
+        }
     
     def create(self, validated_data):
         """Handle creation with topic and language relationships"""
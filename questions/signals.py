@@ -0,0 +1,18 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Language, Topic
+from .cache import bump_version
+
+
+@receiver([post_save, post_delete], sender=Language)
+def invalidate_languages(sender, **kwargs):
+    """Languages are nested in question listings, so both validators change."""
+    bump_version('languages')
+    bump_version('list')
+
+
+@receiver([post_save, post_delete], sender=Topic)
+def invalidate_topics(sender, **kwargs):
+    """Topics are nested in question listings, so both validators change."""
+    bump_version('topics')
+    bump_version('list')
@@ -1,3 +1,494 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from testcase.models import TestCase as QuestionTestCase
+from utils.hashing import content_hash
+from utils.judge.comparator import expected_digest
+from .cache import (
+    bump_detail_version, bump_version, get_detail_version, get_or_build_detail, peek_detail_version
+)
+from .models import Question, Topic
+from .search import QuestionSearchIndex
+from .transfer import BundleReader, BundleWriter, Checkpoint, QuestionExporter, QuestionImporter
+from .views import QuestionSearchAPIView
+
+
+class CountingBuilder:
+    """Detail builder that records how often it was called."""
+
+    def __init__(self, payload, complete=True):
+        self.payload = payload
+        self.complete = complete
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return dict(self.payload, build=self.calls), self.complete
+
+
+class DetailCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_first_build_creates_version_without_caching(self):
+        builder = CountingBuilder({'id': 1})
+
+        payload, complete = get_or_build_detail(1, builder)
+
+        self.assertEqual(payload['build'], 1)
+        self.assertTrue(complete)
+        self.assertIsNotNone(peek_detail_version(1))
+
+    def test_complete_payload_is_served_from_cache(self):
+        builder = CountingBuilder({'id': 1})
+        get_or_build_detail(1, builder)
+
+        first, _ = get_or_build_detail(1, builder)
+        second, complete = get_or_build_detail(1, builder)
+
+        self.assertEqual(builder.calls, 2)
+        self.assertEqual(first, second)
+        self.assertTrue(complete)
+
+    def test_incomplete_payload_is_not_cached(self):
+        builder = CountingBuilder({'id': 1}, complete=False)
+        get_or_build_detail(1, builder)
+
+        get_or_build_detail(1, builder)
+        _, complete = get_or_build_detail(1, builder)
+
+        self.assertEqual(builder.calls, 3)
+        self.assertFalse(complete)
+
+    def test_bump_invalidates_cached_payload(self):
+        builder = CountingBuilder({'id': 1})
+        get_or_build_detail(1, builder)
+        get_or_build_detail(1, builder)
+
+        bump_detail_version(1)
+        payload, _ = get_or_build_detail(1, builder)
+
+        self.assertEqual(payload['build'], 3)
+
+    def test_failed_build_leaves_no_version(self):
+        def builder():
+            raise LookupError('missing')
+
+        with self.assertRaises(LookupError):
+            get_or_build_detail(42, builder)
+        self.assertIsNone(peek_detail_version(42))
+
+
+class FakeStorage:
+    """In-memory stand-in for the S3 service used by the question views."""
+
+    def __init__(self, fail=False):
+        self.objects = {}
+        self.writes = []
+        self.fail = fail
+
+    def get_question(self, question_id):
+        return self.get_content(f"questions/question_{question_id}/question.md")
+
+    def get_content(self, key):
+        if self.fail:
+            raise Exception('storage unavailable')
+        return self.objects.get(key, '')
+
+    def put_content(self, key, content, content_type=None):
+        self.objects[key] = content
+        self.writes.append(key)
+        return key
+
+    def upload_question(self, question_id, question_content):
+        return self.put_content(f"questions/question_{question_id}/question.md", question_content)
+
+    def upload_input(self, question_id, case_id, input_data):
+        return self.put_content(f"questions/question_{question_id}/testcases/case_{case_id}/input.txt", input_data)
+
+    def upload_output(self, question_id, case_id, output_data):
+        return self.put_content(f"questions/question_{question_id}/testcases/case_{case_id}/output.txt", output_data)
+
+    def upload_starter_code(self, question_id, language, code_content):
+        return self.put_content(f"questions/question_{question_id}/starter_code/{language}.txt", code_content)
+
+    def delete_keys(self, keys):
+        for key in keys:
+            self.objects.pop(key, None)
+
+    def delete_question(self, question_id):
+        prefix = f"questions/question_{question_id}/"
+        self.delete_keys([key for key in self.objects if key.startswith(prefix)])
+
+
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.storage = FakeStorage()
+        patcher = mock.patch('questions.views.s3', self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.question = Question.objects.create(title='Two Sum', difficulty='easy')
+        self.storage.upload_question(self.question.id, '# Two Sum')
+
+    def detail_url(self, question_id=None):
+        return f"/api/questions/{question_id or self.question.id}/"
+
+    def test_list_answers_matching_etag_with_304(self):
+        response = self.client.get('/api/questions/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertIn('must-revalidate', response['Cache-Control'])
+
+        response = self.client.get('/api/questions/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_list_etag_depends_on_query_string(self):
+        first = self.client.get('/api/questions/?page_size=1')
+        second = self.client.get('/api/questions/?page_size=2')
+
+        self.assertNotEqual(first['ETag'], second['ETag'])
+
+    def test_list_etag_changes_when_version_is_bumped(self):
+        etag = self.client.get('/api/questions/')['ETag']
+
+        bump_version('list')
+        response = self.client.get('/api/questions/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_detail_is_validated_once_it_has_a_version(self):
+        first = self.client.get(self.detail_url())
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()['description'], '# Two Sum')
+
+        second = self.client.get(self.detail_url())
+        etag = second['ETag']
+        response = self.client.get(self.detail_url(), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_detail_etag_changes_when_question_is_bumped(self):
+        self.client.get(self.detail_url())
+        etag = self.client.get(self.detail_url())['ETag']
+
+        bump_detail_version(self.question.id)
+        response = self.client.get(self.detail_url(), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_degraded_detail_has_no_validators(self):
+        self.client.get(self.detail_url())
+        self.storage.fail = True
+
+        response = self.client.get(self.detail_url())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['description'], '# Error Loading Description')
+        self.assertFalse(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
+        self.assertIn('no-store', response['Cache-Control'])
+
+    def test_missing_question_has_no_validators(self):
+        response = self.client.get(self.detail_url(9999))
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
+        self.assertIsNone(peek_detail_version(9999))
+
+    def test_catalog_lists_are_publicly_cacheable(self):
+        response = self.client.get('/api/questions/languages/')
+        self.assertIn('public', response['Cache-Control'])
+
+        response = self.client.get('/api/questions/languages/', HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(response.status_code, 304)
+
+
+class SearchIndexTests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.index = QuestionSearchIndex(os.path.join(directory.name, 'search.sqlite3'))
+        self.index.rebuild([
+            (1, 'Two Sum', 'Find two numbers that add up to a target.', 'easy', ['arrays']),
+            (2, 'Longest Palindrome', 'Return the longest palindromic substring.', 'medium', ['strings']),
+            (3, 'Subarray Sum', 'Count subarrays whose sum equals k, like two sum.', 'medium', ['arrays']),
+        ])
+
+    def ids(self, *args, **kwargs):
+        return [question_id for question_id, _, _ in self.index.search(*args, **kwargs)]
+
+    def test_title_match_outranks_body_match(self):
+        self.assertEqual(self.ids('two sum'), [1, 3])
+
+    def test_last_word_is_a_prefix(self):
+        self.assertEqual(self.ids('palin'), [2])
+
+    def test_filters_by_difficulty_and_topic(self):
+        self.assertEqual(self.ids('sum', difficulty='medium'), [3])
+        self.assertEqual(self.ids('longest', topic='arrays'), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(self.ids('sum OR "palindrome'), [])
+        self.assertEqual(self.ids('***'), [])
+
+    def test_limit_and_offset(self):
+        ranked = self.ids('sum')
+        self.assertEqual(self.ids('sum', limit=1, offset=1), ranked[1:2])
+
+    def test_reindex_and_remove(self):
+        question = Question.objects.create(title='Three Sum', difficulty='hard')
+        self.index.index_question(question, 'Find triples.')
+        self.assertIn(question.id, self.ids('three'))
+
+        self.index.remove_question(question.id)
+        self.assertEqual(self.ids('three'), [])
+
+
+class QuestionSearchAPITests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.index = QuestionSearchIndex(os.path.join(directory.name, 'search.sqlite3'))
+        patcher = mock.patch('questions.views.search_index', self.index)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        arrays = Topic.objects.create(topic='arrays')
+        self.two_sum = Question.objects.create(title='Two Sum', difficulty='easy')
+        self.two_sum.topics.add(arrays)
+        self.subarray = Question.objects.create(title='Subarray Sum', difficulty='medium')
+        self.index.rebuild([
+            (self.two_sum.id, 'Two Sum', 'Add two numbers.', 'easy', ['arrays']),
+            (self.subarray.id, 'Subarray Sum', 'Two sum over subarrays.', 'medium', []),
+            (9999, 'Deleted Sum', 'Two sum, deleted.', 'easy', []),
+        ])
+
+    def search(self, **params):
+        return self.client.get('/api/questions/search/', params)
+
+    def test_results_are_ranked_and_serialized(self):
+        response = self.search(q='two sum')
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([result['id'] for result in results], [self.two_sum.id, self.subarray.id])
+        self.assertEqual(results[0]['topics'][0]['topic'], 'arrays')
+        self.assertGreater(results[0]['score'], results[1]['score'])
+        self.assertIn('**', results[1]['snippet'])
+
+    def test_related_rows_are_prefetched(self):
+        with self.assertNumQueries(4):
+            self.search(q='sum')
+
+    def test_limit_is_clamped(self):
+        self.assertEqual(self.search(q='sum', limit=1000).json()['limit'], QuestionSearchAPIView.MAX_LIMIT)
+        self.assertEqual(self.search(q='sum', limit=-5).json()['limit'], 1)
+
+    def test_stale_hits_are_skipped(self):
+        results = self.search(q='deleted').json()['results']
+
+        self.assertEqual(results, [])
+
+    def test_rejects_bad_parameters(self):
+        self.assertEqual(self.search().status_code, 400)
+        self.assertEqual(self.search(q='sum', offset=-1).status_code, 400)
+        self.assertEqual(self.search(q='sum', limit='ten').status_code, 400)
+
+
+class QuestionUpdateTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.storage = FakeStorage()
+        for target, replacement in (('s3', self.storage), ('search_index', mock.Mock())):
+            patcher = mock.patch(f'questions.views.{target}', replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.question = Question.objects.create(title='Two Sum', difficulty='easy')
+        self.question.content_hash = content_hash('# Two Sum')
+        self.question.save()
+        self.storage.upload_question(self.question.id, '# Two Sum')
+        self.cases = [self.create_case(slot, f'{slot}\n', f'{slot * 2}\n') for slot in (1, 2)]
+        self.storage.writes.clear()
+
+    def create_case(self, slot, input_content, output_content):
+        expected_hash, expected_length = expected_digest(output_content)
+        return QuestionTestCase.objects.create(
+            question=self.question,
+            input_s3_key=self.storage.upload_input(self.question.id, f'case_{slot}', input_content),
+            output_s3_key=self.storage.upload_output(self.question.id, f'case_{slot}', output_content),
+            input_hash=content_hash(input_content),
+            output_hash=content_hash(output_content),
+            expected_hash=expected_hash,
+            expected_length=expected_length,
+            is_hidden=True
+        )
+
+    def put(self, data):
+        return self.client.put(f'/api/questions/{self.question.id}/', data, content_type='application/json')
+
+    def test_id_only_entries_keep_their_cases(self):
+        version = get_detail_version(self.question.id)
+
+        response = self.put({'test_cases': [{'id': case.id} for case in self.cases]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()['data']['changed']['test_cases'])
+        self.assertEqual(QuestionTestCase.objects.filter(question=self.question).count(), 2)
+        self.assertEqual(self.storage.writes, [])
+        self.assertEqual(get_detail_version(self.question.id), version)
+
+    def test_only_changed_files_are_uploaded(self):
+        first, second = self.cases
+
+        response = self.put({'test_cases': [
+            {'id': first.id, 'input_content': '1\n', 'output_content': '3\n'},
+            {'id': second.id, 'is_example': True},
+        ]})
+
+        self.assertTrue(response.json()['data']['changed']['test_cases'])
+        self.assertEqual(self.storage.writes, [first.output_s3_key])
+        first.refresh_from_db()
+        self.assertEqual(first.output_hash, content_hash('3\n'))
+        self.assertEqual(first.expected_hash, expected_digest('3\n')[0])
+        second.refresh_from_db()
+        self.assertTrue(second.is_example)
+        self.assertEqual(second.output_hash, content_hash('4\n'))
+
+    def test_missing_cases_are_deleted_and_new_ones_take_the_next_slot(self):
+        first, second = self.cases
+
+        self.put({'test_cases': [
+            {'id': first.id},
+            {'input_content': '5\n', 'output_content': '10\n'},
+            {'input_content': '', 'output_content': ''},
+        ]})
+
+        cases = list(QuestionTestCase.objects.filter(question=self.question).order_by('id'))
+        self.assertEqual(len(cases), 2)
+        self.assertEqual(cases[0].id, first.id)
+        self.assertIn('/case_case_3/', cases[1].input_s3_key)
+        self.assertNotIn(second.input_s3_key, self.storage.objects)
+        self.assertNotIn(second.output_s3_key, self.storage.objects)
+
+    def test_unchanged_markdown_is_not_uploaded(self):
+        response = self.put({'markdown_content': '# Two Sum'})
+
+        self.assertFalse(response.json()['data']['changed']['description'])
+        self.assertEqual(self.storage.writes, [])
+
+    def test_content_hash_cannot_be_set_by_clients(self):
+        response = self.put({'content_hash': content_hash('# Something else'),
+                             'markdown_content': '# Something else'})
+
+        self.assertTrue(response.json()['data']['changed']['description'])
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.content_hash, content_hash('# Something else'))
+        self.assertEqual(self.storage.get_question(self.question.id), '# Something else')
+
+    def test_changes_invalidate_the_detail_cache(self):
+        version = get_detail_version(self.question.id)
+
+        self.put({'markdown_content': '# Two Sum, revised'})
+
+        self.assertNotEqual(get_detail_version(self.question.id), version)
+        self.assertEqual(self.storage.get_question(self.question.id), '# Two Sum, revised')
+
+
+class QuestionImportTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.source = os.path.join(self.directory.name, 'bundles')
+        self.checkpoint = os.path.join(self.directory.name, 'import-checkpoint')
+        self.storage = FakeStorage()
+        patcher = mock.patch('questions.transfer.search_index', mock.Mock())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.bundle = {
+            'name': 'two_sum',
+            'title': 'Two Sum',
+            'difficulty': 'easy',
+            'topics': [],
+            'languages': [],
+            'compare_mode': 'float',
+            'float_tolerance': 0.001,
+            'time_limit_ms': 2500,
+            'memory_limit_mb': 512,
+            'markdown': '# Two Sum',
+            'test_cases': [{'input_content': '1 2\n', 'output_content': '3\n',
+                            'is_example': True, 'is_hidden': False}],
+            'starter_code': {}
+        }
+        BundleWriter(self.source).write(self.bundle)
+
+    def import_bundles(self, resume=False):
+        importer = QuestionImporter(self.storage, workers=2, checkpoint_path=self.checkpoint,
+                                    resume=resume, report=lambda message: None)
+        return importer.run(BundleReader(self.source))
+
+    def test_failed_batch_removes_its_questions(self):
+        with mock.patch.object(QuestionTestCase.objects, 'bulk_create', side_effect=RuntimeError('database gone')):
+            with self.assertRaises(RuntimeError):
+                self.import_bundles()
+
+        self.assertFalse(Question.objects.exists())
+        self.assertEqual(self.storage.objects, {})
+
+    def test_rows_left_by_a_killed_run_are_removed_on_resume(self):
+        orphan = Question.objects.create(title='Two Sum')
+        self.storage.upload_question(orphan.id, '# Two Sum')
+        Checkpoint(self.checkpoint).record_created([('two_sum', orphan.id)])
+
+        progress = self.import_bundles(resume=True)
+
+        self.assertEqual(progress.processed, 1)
+        question = Question.objects.get()
+        self.assertNotEqual(question.id, orphan.id)
+        self.assertEqual(QuestionTestCase.objects.filter(question=question).count(), 1)
+        self.assertNotIn(f"questions/question_{orphan.id}/question.md", self.storage.objects)
+
+    def test_judge_settings_round_trip(self):
+        self.import_bundles()
+        question = Question.objects.get()
+        self.assertEqual((question.compare_mode, question.float_tolerance), ('float', 0.001))
+        self.assertEqual((question.time_limit_ms, question.memory_limit_mb), (2500, 512))
+
+        target = os.path.join(self.directory.name, 'export')
+        QuestionExporter(self.storage, workers=2, report=lambda message: None).run(BundleWriter(target))
+        exported = BundleReader(target).read(f"question_{question.id}")
+
+        self.assertEqual(exported['compare_mode'], 'float')
+        self.assertEqual(exported['float_tolerance'], 0.001)
+        self.assertEqual((exported['time_limit_ms'], exported['memory_limit_mb']), (2500, 512))
+
+    def test_unknown_compare_mode_fails_the_bundle(self):
+        BundleWriter(self.source).write({**self.bundle, 'compare_mode': 'fuzzy'})
+
+        progress = self.import_bundles()
+
+        self.assertEqual(progress.failed, 1)
+        self.assertFalse(Question.objects.exists())
+
+    def test_invalid_limits_fail_the_bundle(self):
+        for limits in ({'time_limit_ms': 0}, {'memory_limit_mb': '256'}):
+            with self.subTest(limits=limits):
+                BundleWriter(self.source).write({**self.bundle, **limits})
+
+                self.assertIn('must be a positive integer', BundleReader(self.source).read('two_sum')['error'])
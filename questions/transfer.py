@@ -0,0 +1,585 @@
+"""
+Bulk import/export of questions as bundles.
+
+A bundle is one folder per question, inside a directory or a .zip/.tar[.gz]
+archive:
+
+    <name>/question.json            title, difficulty, topics, languages,
+                                    output comparison, time and memory
+                                    limits, test case flags, starter code
+                                    languages
+    <name>/question.md              markdown description
+    <name>/testcases/<n>/input.txt  test case input (n starts at 1)
+    <name>/testcases/<n>/output.txt expected output
+    <name>/starter_code/<lang>.txt  starter code per language
+"""
+import json
+import logging
+import os
+import posixpath
+import shutil
+import tarfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Prefetch
+
+from testcase.models import TestCase
+from utils.hashing import content_hash
+from utils.judge.comparator import expected_digest
+from .cache import bump_version
+from .models import Question, Language, Topic, Code
+from .search import search_index
+
+
+logger = logging.getLogger(__name__)
+
+QUESTION_FILE = 'question.json'
+MARKDOWN_FILE = 'question.md'
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class _DirectoryBackend:
+    def __init__(self, path):
+        self.path = path
+
+    def names(self):
+        return sorted(
+            entry.name for entry in os.scandir(self.path)
+            if entry.is_dir() and os.path.isfile(os.path.join(entry.path, QUESTION_FILE))
+        )
+
+    def read_text(self, name, relpath):
+        path = os.path.join(self.path, name, *relpath.split('/'))
+        if not os.path.isfile(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as file:
+            return file.read()
+
+
+class _ZipBackend:
+    def __init__(self, path):
+        self._archive = zipfile.ZipFile(path)
+        self._members = set(self._archive.namelist())
+        self._lock = threading.Lock()
+
+    def names(self):
+        return sorted(
+            posixpath.dirname(member) for member in self._members
+            if posixpath.basename(member) == QUESTION_FILE and posixpath.dirname(member)
+        )
+
+    def read_text(self, name, relpath):
+        member = f"{name}/{relpath}"
+        if member not in self._members:
+            return None
+        with self._lock:
+            return self._archive.read(member).decode('utf-8')
+
+
+class _TarBackend:
+    def __init__(self, path):
+        self._archive = tarfile.open(path)
+        self._members = {
+            member.name.removeprefix('./'): member
+            for member in self._archive.getmembers() if member.isfile()
+        }
+        self._lock = threading.Lock()
+
+    def names(self):
+        return sorted(
+            posixpath.dirname(member) for member in self._members
+            if posixpath.basename(member) == QUESTION_FILE and posixpath.dirname(member)
+        )
+
+    def read_text(self, name, relpath):
+        member = self._members.get(f"{name}/{relpath}")
+        if member is None:
+            return None
+        with self._lock:
+            return self._archive.extractfile(member).read().decode('utf-8')
+
+
+class BundleReader:
+    """
+    Reads question bundles lazily from a directory, .zip or .tar[.gz] archive.
+    """
+
+    def __init__(self, path):
+        if os.path.isdir(path):
+            self._backend = _DirectoryBackend(path)
+        elif zipfile.is_zipfile(path):
+            self._backend = _ZipBackend(path)
+        elif tarfile.is_tarfile(path):
+            self._backend = _TarBackend(path)
+        else:
+            raise ValueError(f"{path} is not a directory, zip or tar archive")
+
+    def names(self):
+        return self._backend.names()
+
+    def read(self, name):
+        """
+        Load one bundle into a dict. Errors are returned in the ``error`` key
+        so one malformed bundle doesn't abort a whole batch.
+        """
+        try:
+            meta = json.loads(self._backend.read_text(name, QUESTION_FILE))
+            markdown = self._backend.read_text(name, MARKDOWN_FILE)
+            if not meta.get('title') or not markdown:
+                raise ValueError("title and question.md are required")
+            compare_mode = meta.get('compare_mode', Question._meta.get_field('compare_mode').default)
+            if compare_mode not in dict(Question.COMPARE_MODE_CHOICES):
+                raise ValueError(f"Unknown compare_mode {compare_mode!r}")
+            limits = {}
+            for field in ('time_limit_ms', 'memory_limit_mb'):
+                value = meta.get(field, Question._meta.get_field(field).default)
+                if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+                    raise ValueError(f"{field} must be a positive integer")
+                limits[field] = value
+
+            test_cases = []
+            for index, flags in enumerate(meta.get('test_cases', []), start=1):
+                test_cases.append({
+                    'input_content': self._backend.read_text(name, f"testcases/{index}/input.txt") or '',
+                    'output_content': self._backend.read_text(name, f"testcases/{index}/output.txt") or '',
+                    'is_example': flags.get('is_example', False),
+                    'is_hidden': flags.get('is_hidden', True)
+                })
+
+            starter_code = {}
+            for language in meta.get('starter_code', []):
+                code = self._backend.read_text(name, f"starter_code/{language}.txt")
+                if code:
+                    starter_code[language] = code
+
+            return {
+                'name': name,
+                'title': meta['title'],
+                'difficulty': meta.get('difficulty', 'easy'),
+                'topics': meta.get('topics', []),
+                'languages': meta.get('languages', []),
+                'compare_mode': compare_mode,
+                'float_tolerance': float(meta.get('float_tolerance', Question._meta.get_field('float_tolerance').default)),
+                **limits,
+                'markdown': markdown,
+                'test_cases': test_cases,
+                'starter_code': starter_code
+            }
+        except Exception as e:
+            return {'name': name, 'error': str(e)}
+
+
+class BundleWriter:
+    """
+    Writes question bundles to a directory, or to a .zip archive when the
+    path ends with ``.zip``. Not thread-safe; call from a single thread.
+
+    A zip archive has no central directory until it is closed, so one left
+    by a killed run cannot be resumed. Zip exports therefore write bundles
+    to a ``<path>.partial`` staging directory, which survives interruptions
+    and is kept when ``resume`` is set. ``close`` packs the staging directory
+    into a temporary archive and renames it into place, so ``path`` only
+    ever holds a complete archive. Call it only after the export finished;
+    unless ``complete``, the staging directory is kept so a resumed run can
+    retry the failed bundles and pack everything again.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self._archive_path = None
+        if path.endswith('.zip'):
+            self._archive_path = path
+            self.path = f"{path}.partial"
+            if not resume and os.path.isdir(self.path):
+                shutil.rmtree(self.path)
+        os.makedirs(self.path, exist_ok=True)
+
+    def write(self, bundle):
+        name = bundle['name']
+        meta = {
+            'title': bundle['title'],
+            'difficulty': bundle['difficulty'],
+            'topics': bundle['topics'],
+            'languages': bundle['languages'],
+            'compare_mode': bundle['compare_mode'],
+            'float_tolerance': bundle['float_tolerance'],
+            'time_limit_ms': bundle['time_limit_ms'],
+            'memory_limit_mb': bundle['memory_limit_mb'],
+            'test_cases': [
+                {'is_example': case['is_example'], 'is_hidden': case['is_hidden']}
+                for case in bundle['test_cases']
+            ],
+            'starter_code': sorted(bundle['starter_code'])
+        }
+        self._write_text(name, QUESTION_FILE, json.dumps(meta, indent=2))
+        self._write_text(name, MARKDOWN_FILE, bundle['markdown'])
+        for index, case in enumerate(bundle['test_cases'], start=1):
+            self._write_text(name, f"testcases/{index}/input.txt", case['input_content'])
+            self._write_text(name, f"testcases/{index}/output.txt", case['output_content'])
+        for language, code in bundle['starter_code'].items():
+            self._write_text(name, f"starter_code/{language}.txt", code)
+
+    def close(self, complete=True):
+        if self._archive_path is None:
+            return
+        temporary_path = f"{self._archive_path}.tmp"
+        with zipfile.ZipFile(temporary_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for directory, _, files in os.walk(self.path):
+                for file_name in sorted(files):
+                    path = os.path.join(directory, file_name)
+                    archive.write(path, os.path.relpath(path, self.path).replace(os.sep, '/'))
+        os.replace(temporary_path, self._archive_path)
+        if complete:
+            shutil.rmtree(self.path)
+
+    def _write_text(self, name, relpath, content):
+        path = os.path.join(self.path, name, *relpath.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+
+
+class Checkpoint:
+    """
+    Append-only log of finished bundle names, so an interrupted run can be
+    resumed without redoing work. Only a resumed run reads an existing log;
+    any other run starts a new one, so finishing an import does not make a
+    later import of the same bundle skip every question.
+
+    An import also logs the IDs of question rows before it uploads their
+    files. Rows logged for a bundle that never finished are left over from
+    a killed run; they are read from any existing log, resumed or not, as
+    ``unfinished`` so the importer can remove them.
+    """
+
+    CREATED = 'created'
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.done = set()
+        # Bundle name -> question ID of rows whose import never finished
+        self.unfinished = {}
+        if path and os.path.exists(path):
+            done, created = set(), {}
+            with open(path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    line = line.rstrip('\n')
+                    if line.startswith(f"{self.CREATED}\t"):
+                        _, question_id, name = line.split('\t', 2)
+                        created[name] = int(question_id)
+                    elif line.strip():
+                        done.add(line.strip())
+            self.unfinished = {name: question_id for name, question_id in created.items() if name not in done}
+            if resume:
+                self.done = done
+            else:
+                os.remove(path)
+
+    def record(self, names):
+        self._append(names)
+        self.done.update(names)
+
+    def record_created(self, created):
+        """Log ``(name, question_id)`` pairs before their files are uploaded."""
+        self._append(f"{self.CREATED}\t{question_id}\t{name}" for name, question_id in created)
+
+    def _append(self, lines):
+        lines = list(lines)
+        if not self.path or not lines:
+            return
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.writelines(f"{line}\n" for line in lines)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def clear(self):
+        """Forget a run that finished with nothing left to resume."""
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+        self.done = set()
+
+
+class _Progress:
+    def __init__(self, total, report, skipped=0):
+        self.total = total
+        self.report = report
+        self.skipped = skipped
+        self.processed = 0
+        self.failed = 0
+        self.started = time.monotonic()
+
+    def update(self, processed, failed):
+        self.processed += processed
+        self.failed += failed
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        self.report(
+            f"{self.processed}/{self.total} questions "
+            f"({self.processed / elapsed:.1f}/s), {self.failed} failed"
+        )
+
+
+class QuestionImporter:
+    """
+    Imports bundles in batches: bundles are read by a thread pool, question
+    rows and their relations are inserted with ``bulk_create``, and each
+    question's S3 uploads run concurrently on the same pool.
+
+    S3 keys need the question IDs, so the rows exist before their test
+    cases and starter code. Their IDs are logged to the checkpoint first,
+    and a batch that fails removes its rows again; rows left by a killed
+    run are removed at the start of the next one, before any bundle is
+    imported again.
+    """
+
+    def __init__(self, s3, workers=8, batch_size=50, checkpoint_path=None, resume=False, report=print):
+        self.s3 = s3
+        self.workers = workers
+        self.batch_size = batch_size
+        self.checkpoint = Checkpoint(checkpoint_path, resume)
+        self.report = report
+        self.errors = []
+
+    def run(self, reader):
+        names = reader.names()
+        pending = [name for name in names if name not in self.checkpoint.done]
+        progress = _Progress(len(pending), self.report, skipped=len(names) - len(pending))
+        self.topics = {topic.topic: topic for topic in Topic.objects.all()}
+        self.languages = {language.name: language for language in Language.objects.all()}
+        if self.checkpoint.unfinished:
+            self._discard(self.checkpoint.unfinished.values())
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for names in _batched(pending, self.batch_size):
+                bundles = list(pool.map(reader.read, names))
+                imported = self._import_batch(pool, bundles)
+                self.checkpoint.record(imported)
+                progress.update(len(bundles), len(bundles) - len(imported))
+
+        if not progress.failed:
+            self.checkpoint.clear()
+        return progress
+
+    def _import_batch(self, pool, bundles):
+        valid = []
+        for bundle in bundles:
+            if 'error' in bundle:
+                self.errors.append((bundle['name'], bundle['error']))
+            else:
+                valid.append(bundle)
+        if not valid:
+            return []
+
+        with transaction.atomic():
+            questions = Question.objects.bulk_create([
+                Question(
+                    title=bundle['title'],
+                    difficulty=bundle['difficulty'],
+                    compare_mode=bundle['compare_mode'],
+                    float_tolerance=bundle['float_tolerance'],
+                    time_limit_ms=bundle['time_limit_ms'],
+                    memory_limit_mb=bundle['memory_limit_mb'],
+                    content_hash=content_hash(bundle['markdown'])
+                )
+                for bundle in valid
+            ])
+            self._create_relations(questions, valid)
+        self.checkpoint.record_created(
+            (bundle['name'], question.id) for question, bundle in zip(questions, valid)
+        )
+
+        try:
+            test_cases, codes, imported, failed = [], [], [], []
+            uploads = pool.map(self._upload_bundle, questions, valid)
+            for question, bundle, result in zip(questions, valid, uploads):
+                if isinstance(result, Exception):
+                    self.errors.append((bundle['name'], str(result)))
+                    failed.append(question)
+                    continue
+                test_cases.extend(result[0])
+                codes.extend(result[1])
+                imported.append((question, bundle))
+
+            with transaction.atomic():
+                TestCase.objects.bulk_create(test_cases, batch_size=500)
+                Code.objects.bulk_create(codes, batch_size=500)
+        except BaseException:
+            self._discard(question.id for question in questions)
+            raise
+        if failed:
+            self._discard(question.id for question in failed)
+
+        bump_version('list')
+        try:
+            search_index.index_entries(
+                (question.id, question.title, bundle['markdown'], question.difficulty,
+                 [topic for topic in bundle['topics'] if topic in self.topics])
+                for question, bundle in imported
+            )
+        except Exception as e:
+            logger.warning("Failed to index imported questions for search: %s", e)
+
+        return [bundle['name'] for _, bundle in imported]
+
+    def _discard(self, question_ids):
+        """Delete partly imported questions and whatever they uploaded."""
+        question_ids = list(question_ids)
+        Question.objects.filter(id__in=question_ids).delete()
+        for question_id in question_ids:
+            try:
+                self.s3.delete_question(question_id)
+            except Exception:
+                pass  # Nothing was uploaded
+        bump_version('list')
+
+    def _create_relations(self, questions, bundles):
+        topic_links, language_links = [], []
+        for question, bundle in zip(questions, bundles):
+            for topic in bundle['topics']:
+                if topic in self.topics:
+                    topic_links.append(Question.topics.through(
+                        question_id=question.id, topic_id=self.topics[topic].id))
+            for language in bundle['languages']:
+                if language in self.languages:
+                    language_links.append(Question.languages.through(
+                        question_id=question.id, language_id=self.languages[language].id))
+        Question.topics.through.objects.bulk_create(topic_links, batch_size=500)
+        Question.languages.through.objects.bulk_create(language_links, batch_size=500)
+
+    def _upload_bundle(self, question, bundle):
+        """
+        Upload one question's files and return the unsaved TestCase and Code
+        rows pointing at them. Exceptions are returned, not raised, so that
+        ``pool.map`` keeps going.
+        """
+        try:
+            self.s3.upload_question(question.id, bundle['markdown'])
+
+            test_cases = []
+            for index, case in enumerate(bundle['test_cases']):
+                if not case['input_content'] or not case['output_content']:
+                    continue  # Skip empty test case
+                case_id = f"case_{index + 1}"
+                expected_hash, expected_length = expected_digest(case['output_content'])
+                test_cases.append(TestCase(
+                    question=question,
+                    input_s3_key=self.s3.upload_input(question.id, case_id, case['input_content']),
+                    output_s3_key=self.s3.upload_output(question.id, case_id, case['output_content']),
+                    input_hash=content_hash(case['input_content']),
+                    output_hash=content_hash(case['output_content']),
+                    expected_hash=expected_hash,
+                    expected_length=expected_length,
+                    is_example=case['is_example'],
+                    is_hidden=case['is_hidden']
+                ))
+
+            codes = []
+            for language_name, code_content in bundle['starter_code'].items():
+                language = self.languages.get(language_name)
+                if language is None:
+                    continue
+                codes.append(Code(
+                    question=question,
+                    language=language,
+                    code_s3_key=self.s3.upload_starter_code(question.id, language_name, code_content),
+                    content_hash=content_hash(code_content)
+                ))
+
+            return test_cases, codes
+        except Exception as e:
+            return e
+
+
+class QuestionExporter:
+    """
+    Exports questions in ID order, fetching each batch's S3 content on a
+    thread pool while the database is read with a chunked iterator.
+    """
+
+    def __init__(self, s3, workers=8, batch_size=50, checkpoint_path=None, resume=False, report=print):
+        self.s3 = s3
+        self.workers = workers
+        self.batch_size = batch_size
+        self.checkpoint = Checkpoint(checkpoint_path, resume)
+        self.report = report
+        self.errors = []
+
+    def run(self, writer):
+        queryset = Question.objects.order_by('id').prefetch_related(
+            'topics',
+            'languages',
+            Prefetch('test_cases', queryset=TestCase.objects.order_by('id')),
+            Prefetch('codes', queryset=Code.objects.select_related('language'))
+        )
+        skipped = queryset.filter(id__in=self._ids(self.checkpoint.done)).count()
+        progress = _Progress(queryset.count() - skipped, self.report, skipped=skipped)
+        pending = (
+            question for question in queryset.iterator(chunk_size=self.batch_size)
+            if self._name(question) not in self.checkpoint.done
+        )
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for questions in _batched(pending, self.batch_size):
+                exported = []
+                for bundle in pool.map(self._fetch_bundle, questions):
+                    if 'error' in bundle:
+                        self.errors.append((bundle['name'], bundle['error']))
+                        continue
+                    writer.write(bundle)
+                    exported.append(bundle['name'])
+                self.checkpoint.record(exported)
+                progress.update(len(questions), len(questions) - len(exported))
+
+        if not progress.failed:
+            self.checkpoint.clear()
+        return progress
+
+    def _name(self, question):
+        return f"question_{question.id}"
+
+    @staticmethod
+    def _ids(names):
+        return [int(name[len('question_'):]) for name in names if name[len('question_'):].isdigit()]
+
+    def _fetch_bundle(self, question):
+        name = self._name(question)
+        try:
+            return {
+                'name': name,
+                'title': question.title,
+                'difficulty': question.difficulty,
+                'topics': [topic.topic for topic in question.topics.all()],
+                'languages': [language.name for language in question.languages.all()],
+                'compare_mode': question.compare_mode,
+                'float_tolerance': question.float_tolerance,
+                'time_limit_ms': question.time_limit_ms,
+                'memory_limit_mb': question.memory_limit_mb,
+                'markdown': self.s3.get_question(question.id),
+                'test_cases': [
+                    {
+                        'input_content': self.s3.get_content(case.input_s3_key),
+                        'output_content': self.s3.get_content(case.output_s3_key),
+                        'is_example': case.is_example,
+                        'is_hidden': case.is_hidden
+                    }
+                    for case in question.test_cases.all()
+                ],
+                'starter_code': {
+                    code.language.name: self.s3.get_content(code.code_s3_key)
+                    for code in question.codes.all()
+                }
+            }
+        except Exception as e:
+            return {'name': name, 'error': str(e)}
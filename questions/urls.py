@@ -9,4 +9,5 @@ urlpatterns = [
     # Supporting endpoints
     path('languages/', views.LanguageListAPIView.as_view(), name='language-list'),
     path('topics/', views.TopicListAPIView.as_view(), name='topic-list'),
+    path('search/', views.QuestionSearchAPIView.as_view(), name='question-search'),
 ]
\ No newline at end of file
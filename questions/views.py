@@ -2,13 +2,61 @@ from rest_framework.views import APIView
 from utils.storage.s3_service import S3Service
 from .serializers import QuestionSerializer, LanguageSerializer, TopicSerializer
 from rest_framework.response import Response
-from .models import Question, Language, Topic, Code
+from .models import Question, Language, Topic, Code, QuestionStats
 from rest_framework.pagination import PageNumberPagination
 from rest_framework import status
 from testcase.models import TestCase
+from .cache import (
+    get_or_build_detail, peek_detail_version, bump_detail_version, get_version, bump_version, conditional_get
+)
+from .search import search_index
+from .judging import analyze_question, load_starter_code
+from utils.hashing import content_hash
+from utils.judge.comparator import expected_digest
+from gencoder.db_router import read_from_replica, use_primary
+from django.conf import settings
+from django.db.models import Prefetch
+from django.utils.decorators import method_decorator
+import hashlib
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+CASE_SLOT_RE = re.compile(r'/case_case_(\d+)/')
 
 s3 = S3Service()
 
+QUESTION_CACHE_CONTROL = {'max_age': settings.QUESTION_HTTP_MAX_AGE, 'must_revalidate': True}
+CATALOG_CACHE_CONTROL = {'public': True, 'max_age': settings.CATALOG_HTTP_MAX_AGE}
+
+
+def _question_etag(request, question_id=None):
+    """
+    Validator for question list/detail responses, built from cache versions
+    only so that a 304 costs no database or S3 access. A question without a
+    detail version yet gets none, so unknown IDs create no version keys.
+    """
+    if question_id:
+        version = peek_detail_version(question_id)
+        return f"question-{question_id}-v{version}" if version is not None else None
+    query = hashlib.md5(request.META.get('QUERY_STRING', '').encode('utf-8')).hexdigest()
+    return f"questions-v{get_version('list')}-{query}"
+
+
+def _question_last_modified(request, question_id=None):
+    if question_id:
+        return Question.objects.filter(id=question_id).values_list('updated_at', flat=True).first()
+    return None
+
+
+def _language_etag(request):
+    return f"languages-v{get_version('languages')}"
+
+
+def _topic_etag(request):
+    return f"topics-v{get_version('topics')}"
+
 class StandardResultsSetPagination(PageNumberPagination):
     page_size = 100
     page_size_query_param = 'page_size'
@@ -22,6 +70,12 @@ class QuestionAPIView(APIView):
     
     pagination_class = StandardResultsSetPagination
     
+    @method_decorator(read_from_replica())
+    @method_decorator(conditional_get(
+        etag_func=_question_etag,
+        last_modified_func=_question_last_modified,
+        **QUESTION_CACHE_CONTROL
+    ))
     def get(self, request, question_id=None):
         """
         Handle GET requests to retrieve questions.
@@ -31,54 +85,14 @@ class QuestionAPIView(APIView):
         if question_id:
             # Get specific question with test cases
             try:
-                question = Question.objects.get(id=question_id)
-                
-                test_cases = TestCase.objects.filter(question=question)
-                
-                question_data = QuestionSerializer(question).data
-                
-                question_data['test_cases'] = []
-                for i, test_case in enumerate(test_cases):
-                    try:
-                        # Get input/output content from S3
-                        s3_content = s3.get_input_and_output(question.id, test_case.id)
-                        
-                        test_case_data = {
-                            'id': test_case.id,
-                            'input_content': s3_content.get('input', ''),
-                            'output_content': s3_content.get('output', ''),
-                            'is_example': test_case.is_example,
-                            'is_hidden': test_case.is_hidden
-                        }
-                        
-                        question_data['test_cases'].append(test_case_data)
-                        
-                    except Exception as e:
-                        # Add empty test case data to prevent frontend from breaking
-                        test_case_data = {
-                            'id': test_case.id,
-                            'input_content': '',
-                            'output_content': '',
-                            'is_example': test_case.is_example,
-                            'is_hidden': test_case.is_hidden
-                        }
-                        question_data['test_cases'].append(test_case_data)
-        
-                try:
-                    question_data['starter_code'] = self._get_starter_code(question.id)
-                except Exception as e:
-                    question_data['starter_code'] = {}
-        
-                try:
-                    question_data['description'] = self._get_description(question.id)
-                except Exception as e:
-                    question_data['description'] = "# Error Loading Description"
-        
-                # Add languages and topics
-                question_data['languages'] = LanguageSerializer(question.languages.all(), many=True).data
-                question_data['topics'] = TopicSerializer(question.topics.all(), many=True).data
-        
-                return Response(question_data, status=status.HTTP_200_OK)
+                question_data, complete = get_or_build_detail(
+                    question_id,
+                    lambda: self._build_question_detail(question_id)
+                )
+                response = Response(question_data, status=status.HTTP_200_OK)
+                # Degraded payloads must not be cached or revalidated against
+                response.cacheable = complete
+                return response
                 
             except Question.DoesNotExist:
                 return Response({
@@ -92,7 +106,15 @@ class QuestionAPIView(APIView):
         else:
             # List all questions with pagination
             try:
-                questions = Question.objects.all().order_by('-created_at')
+                questions = Question.objects.all().order_by('-created_at').prefetch_related(
+                    'topics',
+                    'languages',
+                    Prefetch(
+                        'stats',
+                        queryset=QuestionStats.objects.filter(language__isnull=True),
+                        to_attr='overall_stats'
+                    )
+                )
                 paginator = self.pagination_class()
                 paginated_questions = paginator.paginate_queryset(questions, request)
                 
@@ -104,6 +126,65 @@ class QuestionAPIView(APIView):
                     'error': 'Failed to fetch questions'
                 }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    @use_primary()
+    def _build_question_detail(self, question_id):
+        """
+        Assemble the full detail payload for a question from the database and S3.
+        Returns the payload and whether every storage read succeeded, so that
+        partial payloads are not cached. Reads the primary: the payload is
+        cached until the next edit, so it must not capture replica lag.
+        """
+        question = Question.objects.get(id=question_id)
+        complete = True
+        
+        test_cases = TestCase.objects.filter(question=question).order_by('id')
+        
+        question_data = QuestionSerializer(question).data
+        
+        question_data['test_cases'] = []
+        for i, test_case in enumerate(test_cases):
+            try:
+                # Get input/output content from S3
+                test_case_data = {
+                    'id': test_case.id,
+                    'input_content': s3.get_content(test_case.input_s3_key),
+                    'output_content': s3.get_content(test_case.output_s3_key),
+                    'is_example': test_case.is_example,
+                    'is_hidden': test_case.is_hidden
+                }
+                
+                question_data['test_cases'].append(test_case_data)
+                
+            except Exception as e:
+                complete = False
+                # Add empty test case data to prevent frontend from breaking
+                test_case_data = {
+                    'id': test_case.id,
+                    'input_content': '',
+                    'output_content': '',
+                    'is_example': test_case.is_example,
+                    'is_hidden': test_case.is_hidden
+                }
+                question_data['test_cases'].append(test_case_data)
+
+        try:
+            question_data['starter_code'] = self._get_starter_code(question.id)
+        except Exception as e:
+            complete = False
+            question_data['starter_code'] = {}
+
+        try:
+            question_data['description'] = self._get_description(question.id)
+        except Exception as e:
+            complete = False
+            question_data['description'] = "# Error Loading Description"
+
+        # Add languages and topics
+        question_data['languages'] = LanguageSerializer(question.languages.all(), many=True).data
+        question_data['topics'] = TopicSerializer(question.topics.all(), many=True).data
+
+        return question_data, complete
+    
     def post(self, request, *args, **kwargs):
         """
         Handle POST requests to create a new question.
@@ -133,6 +214,8 @@ class QuestionAPIView(APIView):
             # Upload to S3
             try:
                 s3.upload_question(question.id, markdown_content)
+                question.content_hash = content_hash(markdown_content)
+                question.save(update_fields=['content_hash'])
             except Exception as e:
                 question.delete()  # Cleanup
                 return Response({
@@ -144,7 +227,17 @@ class QuestionAPIView(APIView):
             self._create_test_cases(question, request.data.get('test_cases', []))
             
             # Handle starter code
-            self._create_starter_code(question, request.data.get('starter_code', {}))
+            starter_code = request.data.get('starter_code', {})
+            self._create_starter_code(question, starter_code)
+            self._detect_problem_type(question, starter_code)
+            
+            bump_detail_version(question.id)
+            bump_version('list')
+            
+            try:
+                search_index.index_question(question, markdown_content)
+            except Exception as e:
+                logger.warning("Failed to index question %s for search: %s", question.id, e)
             
             return Response({
                 'success': True,
@@ -175,11 +268,16 @@ class QuestionAPIView(APIView):
             try:
                 input_key = s3.upload_input(question.id, case_id, input_content)
                 output_key = s3.upload_output(question.id, case_id, output_content)
+                expected_hash, expected_length = expected_digest(output_content)
                 
                 TestCase.objects.create(
                     question=question,
                     input_s3_key=input_key,
                     output_s3_key=output_key,
+                    input_hash=content_hash(input_content),
+                    output_hash=content_hash(output_content),
+                    expected_hash=expected_hash,
+                    expected_length=expected_length,
                     is_example=test_case_data.get('is_example', False),
                     is_hidden=test_case_data.get('is_hidden', True)
                 )
@@ -208,25 +306,294 @@ class QuestionAPIView(APIView):
                     Code.objects.create(
                         question=question,
                         language=language,
-                        code_s3_key=key
+                        code_s3_key=key,
+                        content_hash=content_hash(code_content)
                     )
                 except Exception as e:
                     raise Exception(f"Failed to upload starter code for {language.name}: {str(e)}")
                 
+    def _detect_problem_type(self, question, starter_code):
+        """
+        Store the problem type and signatures detected from the starter code,
+        so the judge never analyzes code or trusts a client-supplied type.
+        """
+        try:
+            analyze_question(question, {
+                language: code for language, code in starter_code.items()
+                if language in dict(Language.LANGUAGE_CHOICES)
+            })
+        except Exception as e:
+            logger.warning("Failed to detect problem type for question %s: %s", question.id, e)
+    
     def _get_starter_code(self, question_id):
         """
-        Retrieve the starter code for a specific question and language.
+        Retrieve the starter code of a question for every language it has.
         """
-        languages = Language.objects.all()
+        codes = Code.objects.filter(question_id=question_id).select_related('language')
         starter_code = {}
         try:
-            for language in languages:
-                starter_code[language.name] = s3.get_starter_code(question_id, language.name)
+            for code in codes:
+                starter_code[code.language.name] = s3.get_content(code.code_s3_key)
             return starter_code
         except Exception as e:
             raise Exception(f"Failed to retrieve starter code: {str(e)}")
         
 
+    def put(self, request, question_id=None):
+        """
+        Handle PUT requests to update a question in place.
+        Markdown, test cases and starter code are compared against their stored
+        content hashes so only changed objects are re-uploaded, and only the
+        caches affected by the change are invalidated.
+        """
+        if not question_id:
+            return Response({
+                'success': False,
+                'error': 'Question ID required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            question = Question.objects.get(id=question_id)
+        except Question.DoesNotExist:
+            return Response({
+                'error': 'Question not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        markdown_content = request.data.get('markdown_content')
+        if markdown_content is not None and not markdown_content:
+            return Response({
+                'success': False,
+                'error': 'Markdown content cannot be empty'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        question_serializer = QuestionSerializer(question, data=request.data, partial=True)
+        if not question_serializer.is_valid():
+            return Response({
+                'success': False,
+                'error': 'Invalid question data',
+                'details': question_serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        changes = {
+            'judging': False,
+            'listing': False,
+            'description': False,
+            'test_cases': False,
+            'starter_code': False
+        }
+        try:
+            listed_before = self._listing_fields(question)
+            judged_before = self._judging_fields(question)
+            question = question_serializer.save()
+            changes['listing'] = self._listing_fields(question) != listed_before
+            changes['judging'] = self._judging_fields(question) != judged_before
+            
+            if markdown_content is not None:
+                changes['description'] = self._update_description(question, markdown_content)
+            
+            if 'test_cases' in request.data:
+                changes['test_cases'] = self._update_test_cases(question, request.data.get('test_cases') or [])
+            
+            if 'starter_code' in request.data:
+                changes['starter_code'] = self._update_starter_code(question, request.data.get('starter_code') or {})
+                if changes['starter_code']:
+                    self._detect_problem_type(question, load_starter_code(question.id))
+            
+        except Exception as e:
+            # Some objects may have been replaced before the failure
+            bump_detail_version(question.id)
+            bump_version('list')
+            return Response({
+                'success': False,
+                'error': f'Failed to update question: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        self._invalidate_after_update(question, changes, markdown_content)
+        
+        return Response({
+            'success': True,
+            'message': 'Question updated successfully',
+            'data': {
+                'id': question.id,
+                'title': question.title,
+                'difficulty': question.difficulty,
+                'changed': changes
+            }
+        }, status=status.HTTP_200_OK)
+    
+    def _listing_fields(self, question):
+        """Fields rendered in question listings and the search index."""
+        return (
+            question.title,
+            question.difficulty,
+            sorted(question.topics.values_list('id', flat=True)),
+            sorted(question.languages.values_list('id', flat=True))
+        )
+    
+    def _judging_fields(self, question):
+        """Fields read by the judge through its cached configuration."""
+        return (question.compare_mode, question.float_tolerance, question.time_limit_ms, question.memory_limit_mb)
+    
+    def _update_description(self, question, markdown_content):
+        digest = content_hash(markdown_content)
+        if digest == question.content_hash:
+            return False
+        
+        s3.upload_question(question.id, markdown_content)
+        question.content_hash = digest
+        question.save(update_fields=['content_hash', 'updated_at'])
+        return True
+    
+    def _update_test_cases(self, question, test_cases_data):
+        """
+        Reconcile stored test cases with the submitted list. Cases carrying an
+        existing ``id`` are updated in place (re-uploading only the files whose
+        hash changed), cases without one are created, and stored cases missing
+        from the list are deleted. An existing case sent without input or
+        output content keeps that file unchanged, so ``{"id": ...}`` alone
+        keeps the case as it is. Returns whether anything changed.
+        """
+        existing = {
+            test_case.id: test_case
+            for test_case in TestCase.objects.filter(question=question).order_by('id')
+        }
+        next_slot = self._next_case_slot(existing.values())
+        kept = set()
+        changed = False
+        
+        for test_case_data in test_cases_data:
+            input_content = test_case_data.get('input_content', '')
+            output_content = test_case_data.get('output_content', '')
+            test_case = existing.get(test_case_data.get('id'))
+            
+            if test_case is None:
+                if not input_content or not output_content:
+                    continue  # Skip empty test case
+                input_hash = content_hash(input_content)
+                output_hash = content_hash(output_content)
+                expected_hash, expected_length = expected_digest(output_content)
+                case_id = f"case_{next_slot}"
+                next_slot += 1
+                TestCase.objects.create(
+                    question=question,
+                    input_s3_key=s3.upload_input(question.id, case_id, input_content),
+                    output_s3_key=s3.upload_output(question.id, case_id, output_content),
+                    input_hash=input_hash,
+                    output_hash=output_hash,
+                    expected_hash=expected_hash,
+                    expected_length=expected_length,
+                    is_example=test_case_data.get('is_example', False),
+                    is_hidden=test_case_data.get('is_hidden', True)
+                )
+                changed = True
+                continue
+            
+            kept.add(test_case.id)
+            update_fields = []
+            input_hash = content_hash(input_content) if input_content else test_case.input_hash
+            output_hash = content_hash(output_content) if output_content else test_case.output_hash
+            if input_hash != test_case.input_hash:
+                s3.put_content(test_case.input_s3_key, input_content)
+                test_case.input_hash = input_hash
+                update_fields.append('input_hash')
+            if output_hash != test_case.output_hash:
+                s3.put_content(test_case.output_s3_key, output_content)
+                test_case.output_hash = output_hash
+                test_case.expected_hash, test_case.expected_length = expected_digest(output_content)
+                update_fields.extend(['output_hash', 'expected_hash', 'expected_length'])
+            for flag in ('is_example', 'is_hidden'):
+                if flag in test_case_data and test_case_data[flag] != getattr(test_case, flag):
+                    setattr(test_case, flag, test_case_data[flag])
+                    update_fields.append(flag)
+            
+            if update_fields:
+                test_case.save(update_fields=update_fields + ['updated_at'])
+                changed = True
+        
+        removed = [test_case for test_case_id, test_case in existing.items() if test_case_id not in kept]
+        if removed:
+            keys = []
+            for test_case in removed:
+                keys.extend([test_case.input_s3_key, test_case.output_s3_key])
+            s3.delete_keys(keys)
+            TestCase.objects.filter(id__in=[test_case.id for test_case in removed]).delete()
+            changed = True
+        
+        return changed
+    
+    def _next_case_slot(self, test_cases):
+        """Next free case number in the question's S3 test case folder."""
+        slots = [0]
+        for test_case in test_cases:
+            match = CASE_SLOT_RE.search(test_case.input_s3_key or '')
+            if match:
+                slots.append(int(match.group(1)))
+        return max(slots) + 1
+    
+    def _update_starter_code(self, question, starter_code_data):
+        """
+        Upload starter code only for languages whose content hash changed.
+        An empty value removes the language's starter code.
+        Returns whether anything changed.
+        """
+        languages = {language.name: language for language in Language.objects.all()}
+        codes = {
+            code.language.name: code
+            for code in Code.objects.filter(question=question).select_related('language')
+        }
+        changed = False
+        
+        for language_name, code_content in starter_code_data.items():
+            language = languages.get(language_name)
+            if language is None:
+                continue
+            code = codes.get(language_name)
+            
+            if not code_content:
+                if code is not None:
+                    s3.delete_keys([code.code_s3_key])
+                    code.delete()
+                    changed = True
+                continue
+            
+            digest = content_hash(code_content)
+            if code is not None and code.content_hash == digest:
+                continue
+            
+            try:
+                key = s3.upload_starter_code(question.id, language_name, code_content)
+            except Exception as e:
+                raise Exception(f"Failed to upload starter code for {language_name}: {str(e)}")
+            
+            if code is None:
+                Code.objects.create(
+                    question=question,
+                    language=language,
+                    code_s3_key=key,
+                    content_hash=digest
+                )
+            else:
+                code.code_s3_key = key
+                code.content_hash = digest
+                code.save(update_fields=['code_s3_key', 'content_hash'])
+            changed = True
+        
+        return changed
+    
+    def _invalidate_after_update(self, question, changes, markdown_content):
+        """Invalidate only the caches that render the changed parts."""
+        if any(changes.values()):
+            bump_detail_version(question.id)
+        if changes['listing']:
+            bump_version('list')
+        if changes['listing'] or changes['description']:
+            try:
+                if markdown_content is None:
+                    markdown_content = self._get_description(question.id)
+                search_index.index_question(question, markdown_content)
+            except Exception as e:
+                logger.warning("Failed to reindex question %s for search: %s", question.id, e)
+
     def delete(self, request, question_id):
         """
         Handle DELETE requests to delete a specific question.
@@ -239,6 +606,13 @@ class QuestionAPIView(APIView):
             TestCase.objects.filter(question=question).delete()
             Code.objects.filter(question=question).delete()
             question.delete()
+            bump_detail_version(question_id)
+            bump_version('list')
+            
+            try:
+                search_index.remove_question(question_id)
+            except Exception as e:
+                logger.warning("Failed to remove question %s from search index: %s", question_id, e)
                         
             return Response({
                 'success': True,
@@ -259,6 +633,8 @@ class LanguageListAPIView(APIView):
     API view to list all programming languages.
     """
     
+    @method_decorator(read_from_replica())
+    @method_decorator(conditional_get(etag_func=_language_etag, **CATALOG_CACHE_CONTROL))
     def get(self, request):
         """Get all available programming languages"""
         try:
@@ -279,6 +655,8 @@ class TopicListAPIView(APIView):
     API view to list all topics.
     """
     
+    @method_decorator(read_from_replica())
+    @method_decorator(conditional_get(etag_func=_topic_etag, **CATALOG_CACHE_CONTROL))
     def get(self, request):
         """Get all available topics"""
         try:
@@ -295,3 +673,76 @@ class TopicListAPIView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class QuestionSearchAPIView(APIView):
+    """
+    API view for full-text search over question titles and descriptions.
+    """
+    
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 100
+    
+    def get(self, request):
+        """
+        Search questions ranked by relevance.
+        Query params: q (required), difficulty, topic, limit, offset
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({
+                'success': False,
+                'error': 'Search query (q) is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', self.DEFAULT_LIMIT)), self.MAX_LIMIT))
+            offset = int(request.query_params.get('offset', 0))
+        except ValueError:
+            return Response({
+                'success': False,
+                'error': 'limit and offset must be integers'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if offset < 0:
+            return Response({
+                'success': False,
+                'error': 'offset must not be negative'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            hits = search_index.search(
+                query,
+                difficulty=request.query_params.get('difficulty'),
+                topic=request.query_params.get('topic'),
+                limit=limit,
+                offset=offset
+            )
+            
+            questions = Question.objects.prefetch_related(
+                'topics',
+                'languages',
+                Prefetch(
+                    'stats',
+                    queryset=QuestionStats.objects.filter(language__isnull=True),
+                    to_attr='overall_stats'
+                )
+            ).in_bulk([question_id for question_id, _, _ in hits])
+            results = []
+            for question_id, score, snippet in hits:
+                question = questions.get(question_id)
+                if question is None:
+                    continue  # Index is ahead of a deletion; skip stale hit
+                data = QuestionSerializer(question).data
+                data['score'] = -score
+                data['snippet'] = snippet
+                results.append(data)
+            
+            return Response({
+                'success': True,
+                'results': results,
+                'limit': limit,
+                'offset': offset
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({
+                'success': False,
+                'error': f'Search failed: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,301 @@
+import math
+import random
+import threading
+import time
+
+from django.conf import settings
+
+from .models import Submission
+
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+
+    def __init__(self, key, next_nodes, widths):
+        self.key = key
+        self.next = next_nodes
+        self.width = widths
+
+
+class RankedSkipList:
+    """
+    Indexable skip list of unique, mutually comparable keys.
+
+    Each link stores how many positions it skips, so insert, remove, rank
+    lookup and positional access are all O(log n) expected.
+    """
+
+    def __init__(self, max_levels=24):
+        self.max_levels = max_levels
+        # Tail sentinel compares greater than any numeric tuple key
+        self._tail = _Node((math.inf,), [], [])
+        self._head = _Node(None, [self._tail] * max_levels, [1] * max_levels)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _random_level(self):
+        level = 1
+        while level < self.max_levels and random.random() < 0.5:
+            level += 1
+        return level
+
+    def insert(self, key):
+        chain = [None] * self.max_levels
+        steps_at_level = [0] * self.max_levels
+        node = self._head
+        for level in reversed(range(self.max_levels)):
+            while node.next[level].key <= key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        height = self._random_level()
+        new_node = _Node(key, [None] * height, [None] * height)
+        steps = 0
+        for level in range(height):
+            previous = chain[level]
+            new_node.next[level] = previous.next[level]
+            previous.next[level] = new_node
+            new_node.width[level] = previous.width[level] - steps
+            previous.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(height, self.max_levels):
+            chain[level].width[level] += 1
+        self.size += 1
+
+    def remove(self, key):
+        chain = [None] * self.max_levels
+        node = self._head
+        for level in reversed(range(self.max_levels)):
+            while node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+
+        target = chain[0].next[0]
+        if target is self._tail or target.key != key:
+            raise KeyError(key)
+        for level in range(len(target.next)):
+            previous = chain[level]
+            previous.width[level] += target.width[level] - 1
+            previous.next[level] = target.next[level]
+        for level in range(len(target.next), self.max_levels):
+            chain[level].width[level] -= 1
+        self.size -= 1
+
+    def rank(self, key):
+        """Number of keys strictly smaller than ``key``."""
+        position = 0
+        node = self._head
+        for level in reversed(range(self.max_levels)):
+            while node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+        return position
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        node = self._head
+        index += 1
+        for level in reversed(range(self.max_levels)):
+            while node.width[level] <= index:
+                index -= node.width[level]
+                node = node.next[level]
+        return node.key
+
+    def slice(self, start, stop):
+        """Keys at positions ``start`` to ``stop - 1``, walking the bottom level."""
+        start = max(start, 0)
+        stop = min(stop, self.size)
+        if start >= stop:
+            return []
+        node = self._head
+        index = start + 1
+        for level in reversed(range(self.max_levels)):
+            while node.width[level] <= index:
+                index -= node.width[level]
+                node = node.next[level]
+        keys = []
+        for _ in range(stop - start):
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+class _Standings:
+    """Solved counts, penalties and the ranking they produce."""
+
+    SOLVED = -1
+
+    def __init__(self, penalty_per_rejection):
+        self.penalty_per_rejection = penalty_per_rejection
+        self.ranking = RankedSkipList()
+        self.scores = {}
+        # (user_id, question_id) -> rejected attempts so far, or SOLVED
+        self.attempts = {}
+
+    @staticmethod
+    def key(user_id, solved, penalty):
+        return (-solved, penalty, user_id)
+
+    def apply(self, user_id, question_id, accepted):
+        attempt_key = (user_id, question_id)
+        attempts = self.attempts.get(attempt_key, 0)
+        if attempts == self.SOLVED:
+            return
+        if not accepted:
+            self.attempts[attempt_key] = attempts + 1
+            return
+
+        self.attempts[attempt_key] = self.SOLVED
+        solved, penalty = self.scores.get(user_id, (0, 0))
+        if user_id in self.scores:
+            self.ranking.remove(self.key(user_id, solved, penalty))
+        solved += 1
+        penalty += attempts * self.penalty_per_rejection
+        self.scores[user_id] = (solved, penalty)
+        self.ranking.insert(self.key(user_id, solved, penalty))
+
+
+class Leaderboard:
+    """
+    In-process ranking of users by problems solved (descending) and penalty
+    (ascending), maintained incrementally as verdicts arrive.
+
+    Penalty follows ICPC rules without contest time: every rejected attempt
+    on a question counts ``PENALTY_PER_REJECTION`` once the question is
+    solved. Users with equal scores share a rank. The ranking is built from
+    submission history in one streaming pass on first use, and rebuilt after
+    ``LEADERBOARD_REBUILD_INTERVAL`` seconds, which keeps worker processes
+    that each see only their own verdicts in step: other workers' verdicts
+    show up within one interval.
+
+    A rebuild reads history without holding the lock, so readers keep the
+    current ranking until the new one is swapped in. Verdicts recorded with
+    their submission ID meanwhile are replayed onto the new ranking unless
+    the history pass already counted them (an ID no higher than the last
+    one it read).
+    """
+
+    PENALTY_PER_REJECTION = 20
+
+    def __init__(self, rebuild_interval=0):
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.RLock()
+        # Serializes rebuilds; readers only wait for it before the first build
+        self._rebuild_lock = threading.Lock()
+        self._standings = _Standings(self.PENALTY_PER_REJECTION)
+        self._built_at = None
+        self._last_applied_id = 0
+        # Verdicts recorded while a rebuild reads history, else None
+        self._pending = None
+
+    @property
+    def is_built(self):
+        return self._built_at is not None
+
+    def record(self, user_id, question_id, accepted, submission_id=None):
+        """
+        Apply one verdict. O(log n) in the number of ranked users. Pass the
+        ``submission_id`` so a concurrent rebuild neither drops nor double
+        counts it.
+        """
+        with self._lock:
+            if submission_id is not None:
+                if submission_id <= self._last_applied_id:
+                    return
+                if self._pending is not None:
+                    self._pending.append((submission_id, user_id, question_id, accepted))
+            self._standings.apply(user_id, question_id, accepted)
+
+    def rebuild(self):
+        """Rebuild from submission history in one streaming pass."""
+        with self._rebuild_lock:
+            self._rebuild()
+
+    def _rebuild(self):
+        with self._lock:
+            self._pending = []
+        try:
+            history = (
+                Submission.objects
+                .filter(user__isnull=False)
+                .order_by('id')
+                .values_list('id', 'user_id', 'question_id', 'verdict')
+                .iterator(chunk_size=5000)
+            )
+            standings = _Standings(self.PENALTY_PER_REJECTION)
+            last_applied_id = 0
+            for submission_id, user_id, question_id, verdict in history:
+                standings.apply(user_id, question_id, verdict == 'accepted')
+                last_applied_id = submission_id
+
+            with self._lock:
+                for submission_id, user_id, question_id, accepted in self._pending:
+                    if submission_id > last_applied_id:
+                        standings.apply(user_id, question_id, accepted)
+                self._standings = standings
+                self._last_applied_id = last_applied_id
+                self._built_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._pending = None
+
+    def _is_stale(self):
+        with self._lock:
+            return (
+                self._built_at is None
+                or (self.rebuild_interval and time.monotonic() - self._built_at > self.rebuild_interval)
+            )
+
+    def ensure_fresh(self):
+        if not self._is_stale():
+            return
+        # Before the first build there is nothing to serve, so wait for it;
+        # after that, a reader that finds a rebuild running uses the old ranking
+        if self._rebuild_lock.acquire(blocking=not self.is_built):
+            try:
+                if self._is_stale():
+                    self._rebuild()
+            finally:
+                self._rebuild_lock.release()
+
+    def _entry(self, key):
+        solved, penalty, user_id = -key[0], key[1], key[2]
+        # Competition ranking: one plus the number of strictly better users
+        rank = self._standings.ranking.rank((key[0], key[1], -math.inf)) + 1
+        return {'rank': rank, 'user_id': user_id, 'solved': solved, 'penalty': penalty}
+
+    def top(self, limit):
+        self.ensure_fresh()
+        with self._lock:
+            return [self._entry(key) for key in self._standings.ranking.slice(0, limit)]
+
+    def rank_of(self, user_id):
+        self.ensure_fresh()
+        with self._lock:
+            scores = self._standings.scores
+            if user_id not in scores:
+                return None
+            return self._entry(_Standings.key(user_id, *scores[user_id]))
+
+    def neighbours(self, user_id, radius):
+        """The user's entry with up to ``radius`` users ranked above and below."""
+        self.ensure_fresh()
+        with self._lock:
+            standings = self._standings
+            if user_id not in standings.scores:
+                return []
+            position = standings.ranking.rank(_Standings.key(user_id, *standings.scores[user_id]))
+            keys = standings.ranking.slice(position - radius, position + radius + 1)
+            return [self._entry(key) for key in keys]
+
+    def __len__(self):
+        self.ensure_fresh()
+        with self._lock:
+            return len(self._standings.ranking)
+
+
+leaderboard = Leaderboard(rebuild_interval=settings.LEADERBOARD_REBUILD_INTERVAL)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from submissions.stats import reconcile_question_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute per-question acceptance aggregates from submission history."
+
+    def handle(self, *args, **options):
+        count = reconcile_question_stats()
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {count} question stats rows"))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-19 11:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('questions', '0009_question_content_hash_code_content_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Submission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(choices=[('python', 'Python'), ('java', 'Java'), ('cpp', 'C++')], max_length=20)),
+                ('verdict', models.CharField(choices=[('accepted', 'Accepted'), ('wrong_answer', 'Wrong Answer')], max_length=32)),
+                ('case_verdicts', models.TextField(blank=True, default='', help_text='Compact per-case verdicts, one character per test case')),
+                ('passed_cases', models.PositiveIntegerField(default=0)),
+                ('total_cases', models.PositiveIntegerField(default=0)),
+                ('runtime_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('code_hash', models.CharField(help_text='SHA-256 of the submitted code', max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to='questions.question')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['user', '-id', 'question', 'language', 'verdict', 'passed_cases', 'total_cases', 'runtime_ms', 'created_at'], name='submission_user_history_idx'), models.Index(fields=['user', 'question', 'verdict'], name='submission_user_solved_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-19 12:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0010_questionstats'),
+        ('submissions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RuntimeDistribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(choices=[('python', 'Python'), ('java', 'Java'), ('cpp', 'C++')], max_length=20)),
+                ('sketch', models.BinaryField(default=bytes)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='runtime_distributions', to='questions.question')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('question', 'language'), name='unique_runtime_distribution')],
+            },
+        ),
+    ]
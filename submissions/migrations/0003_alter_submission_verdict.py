@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submissions', '0002_runtimedistribution'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='submission',
+            name='verdict',
+            field=models.CharField(choices=[('accepted', 'Accepted'), ('wrong_answer', 'Wrong Answer'), ('time_limit_exceeded', 'Time Limit Exceeded'), ('memory_limit_exceeded', 'Memory Limit Exceeded'), ('runtime_error', 'Runtime Error'), ('compilation_error', 'Compilation Error')], max_length=32),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submissions', '0003_alter_submission_verdict'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='cpu_time_ms',
+            field=models.PositiveIntegerField(blank=True, help_text='CPU time summed over executed cases', null=True),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='peak_memory_bytes',
+            field=models.PositiveBigIntegerField(blank=True, help_text='Highest peak memory of any executed case', null=True),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='compile_time_ms',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='case_metrics',
+            field=models.JSONField(blank=True, default=list, help_text='Per-case wall/CPU time, peak memory, exit code and signal'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.1 on 2026-10-19 18:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_solves(apps, schema_editor):
+    """Mark every question already solved, so earlier solves are not counted again."""
+    Submission = apps.get_model('submissions', 'Submission')
+    SolvedQuestion = apps.get_model('submissions', 'SolvedQuestion')
+    solved = (
+        Submission.objects
+        .filter(verdict='accepted', user__isnull=False)
+        .values_list('user_id', 'question_id', 'language')
+        .distinct()
+        .iterator()
+    )
+    seen_overall = set()
+    batch = []
+    for user_id, question_id, language in solved:
+        batch.append(SolvedQuestion(user_id=user_id, question_id=question_id, language=language))
+        if (user_id, question_id) not in seen_overall:
+            seen_overall.add((user_id, question_id))
+            batch.append(SolvedQuestion(user_id=user_id, question_id=question_id, language=''))
+        if len(batch) >= 1000:
+            SolvedQuestion.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    SolvedQuestion.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0013_question_time_limit_ms_question_memory_limit_mb'),
+        ('submissions', '0004_submission_metrics'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SolvedQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(blank=True, default='', help_text='Empty for the overall solve of the question', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='solves', to='questions.question')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='solved_questions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'question', 'language'), name='unique_solved_question')],
+            },
+        ),
+        migrations.RunPython(backfill_solves, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.db import models
+from questions.models import Language
+
+
+class Submission(models.Model):
+    VERDICT_CHOICES = (
+        ('accepted', 'Accepted'),
+        ('wrong_answer', 'Wrong Answer'),
+        ('time_limit_exceeded', 'Time Limit Exceeded'),
+        ('memory_limit_exceeded', 'Memory Limit Exceeded'),
+        ('runtime_error', 'Runtime Error'),
+        ('compilation_error', 'Compilation Error'),
+    )
+    
+    # One character per test case in ``case_verdicts``
+    CASE_VERDICT_CODES = {
+        'correct': 'A',
+        'incorrect': 'W',
+        'time_limit_exceeded': 'T',
+        'memory_limit_exceeded': 'M',
+        'runtime_error': 'R',
+        'compilation_error': 'C',
+    }
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='submissions',
+                             null=True, blank=True)
+    question = models.ForeignKey('questions.Question', on_delete=models.CASCADE, related_name='submissions')
+    language = models.CharField(max_length=20, choices=Language.LANGUAGE_CHOICES)
+    verdict = models.CharField(max_length=32, choices=VERDICT_CHOICES)
+    case_verdicts = models.TextField(blank=True, default='',
+                                     help_text="Compact per-case verdicts, one character per test case")
+    passed_cases = models.PositiveIntegerField(default=0)
+    total_cases = models.PositiveIntegerField(default=0)
+    runtime_ms = models.PositiveIntegerField(null=True, blank=True)
+    cpu_time_ms = models.PositiveIntegerField(null=True, blank=True, help_text="CPU time summed over executed cases")
+    peak_memory_bytes = models.PositiveBigIntegerField(null=True, blank=True,
+                                                       help_text="Highest peak memory of any executed case")
+    compile_time_ms = models.PositiveIntegerField(null=True, blank=True)
+    case_metrics = models.JSONField(default=list, blank=True,
+                                    help_text="Per-case wall/CPU time, peak memory, exit code and signal")
+    code_hash = models.CharField(max_length=64, help_text="SHA-256 of the submitted code")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            # Covers the history listing: keyset on (user, id) plus every listed column
+            models.Index(
+                fields=['user', '-id', 'question', 'language', 'verdict',
+                        'passed_cases', 'total_cases', 'runtime_ms', 'created_at'],
+                name='submission_user_history_idx'
+            ),
+            models.Index(fields=['user', 'question', 'verdict'], name='submission_user_solved_idx'),
+        ]
+        ordering = ['-id']
+    
+    def __str__(self):
+        return f"Submission {self.id} for Question {self.question_id}: {self.verdict}"
+
+
+class RuntimeDistribution(models.Model):
+    """
+    Streaming quantile sketch of accepted runtimes for one question and
+    language, serialized with ``RuntimeSketch.to_bytes``.
+    """
+    question = models.ForeignKey('questions.Question', on_delete=models.CASCADE, related_name='runtime_distributions')
+    language = models.CharField(max_length=20, choices=Language.LANGUAGE_CHOICES)
+    sketch = models.BinaryField(default=bytes)
+    count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['question', 'language'], name='unique_runtime_distribution'),
+        ]
+    
+    def __str__(self):
+        return f"Runtimes for Question {self.question_id} ({self.language}): {self.count}"
+
+
+
+class SolvedQuestion(models.Model):
+    """
+    Marks a question as solved by a user, overall (``language`` empty) and
+    per language. The unique constraint makes "first accepted submission"
+    race-free: only the insert that creates the row counts as the first solve.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='solved_questions')
+    question = models.ForeignKey('questions.Question', on_delete=models.CASCADE, related_name='solves')
+    language = models.CharField(max_length=20, blank=True, default='',
+                                help_text="Empty for the overall solve of the question")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'question', 'language'], name='unique_solved_question'),
+        ]
+    
+    def __str__(self):
+        return f"User {self.user_id} solved Question {self.question_id} ({self.language or 'any'})"
@@ -0,0 +1,124 @@
+import logging
+
+from django.db import IntegrityError, transaction
+
+from users.counters import profile_counters
+from utils.hashing import content_hash
+from .leaderboard import leaderboard
+from .models import SolvedQuestion, Submission
+from .stats import record_question_stats, record_runtime
+
+
+logger = logging.getLogger(__name__)
+
+
+def submission_verdict(case_results, total_cases=None):
+    """
+    Overall verdict: accepted when every case passed, otherwise the verdict
+    of the first failing case (``incorrect`` being a wrong answer).
+    """
+    if total_cases is None:
+        total_cases = len(case_results)
+    for case in case_results:
+        if case['status'] != 'correct':
+            return 'wrong_answer' if case['status'] == 'incorrect' else case['status']
+    return 'accepted' if case_results and len(case_results) == total_cases else 'wrong_answer'
+
+
+def summarize_metrics(case_results, compile_metrics=None):
+    """
+    Submission-level resource figures from per-case ``metrics``: summed wall
+    and CPU time, the highest peak memory, and compilation metrics.
+    """
+    def collect(name):
+        return [
+            case['metrics'][name] for case in case_results
+            if case.get('metrics') and case['metrics'].get(name) is not None
+        ]
+
+    wall_times = collect('wall_time_ms')
+    cpu_times = collect('cpu_time_ms')
+    memory = collect('memory_bytes')
+    return {
+        'total_wall_time_ms': sum(wall_times) if wall_times else None,
+        'total_cpu_time_ms': sum(cpu_times) if cpu_times else None,
+        'peak_memory_bytes': max(memory) if memory else None,
+        'compile': compile_metrics
+    }
+
+
+def _claim_solve(user_id, question_id, language=''):
+    """
+    Record that the user solved the question (in ``language``, or overall
+    when empty). True only for the call that created the row, so concurrent
+    accepted submissions cannot both count as the first solve.
+    """
+    try:
+        with transaction.atomic():
+            SolvedQuestion.objects.create(user_id=user_id, question_id=question_id, language=language)
+        return True
+    except IntegrityError:
+        return False
+
+
+def record_submission(user_id, question_id, language, user_code, case_results, total_cases=None,
+                      compile_metrics=None):
+    """
+    Persist a judged submission and queue the user's profile counters.
+
+    ``case_results`` is the ordered list of per-case results produced by the
+    judge, each with a ``status`` and optional ``runtime_ms`` and ``metrics``.
+    When judging stopped early, ``total_cases`` is the size of the whole test
+    suite. Resource metrics are stored per case and aggregated. For
+    accepted submissions with timing data, ``submission.faster_than`` is set
+    to the percentage of earlier accepted runtimes in the same language it beat.
+    """
+    if total_cases is None:
+        total_cases = len(case_results)
+    case_verdicts = ''.join(
+        Submission.CASE_VERDICT_CODES.get(case['status'], '?') for case in case_results
+    )
+    passed_cases = sum(1 for case in case_results if case['status'] == 'correct')
+    verdict = submission_verdict(case_results, total_cases)
+    accepted = verdict == 'accepted'
+    runtimes = [case['runtime_ms'] for case in case_results if case.get('runtime_ms') is not None]
+    metrics = summarize_metrics(case_results, compile_metrics)
+
+    first_solve = False
+    first_language_solve = False
+    # The submission row and its stats increments commit together, so a
+    # concurrent reconcile_question_stats never counts one without the other
+    with transaction.atomic():
+        if accepted and user_id:
+            first_solve = _claim_solve(user_id, question_id)
+            first_language_solve = _claim_solve(user_id, question_id, language)
+
+        submission = Submission.objects.create(
+            user_id=user_id,
+            question_id=question_id,
+            language=language,
+            verdict=verdict,
+            case_verdicts=case_verdicts,
+            passed_cases=passed_cases,
+            total_cases=total_cases,
+            runtime_ms=sum(runtimes) if runtimes else None,
+            cpu_time_ms=metrics['total_cpu_time_ms'],
+            peak_memory_bytes=metrics['peak_memory_bytes'],
+            compile_time_ms=(compile_metrics or {}).get('wall_time_ms'),
+            case_metrics=[case.get('metrics') for case in case_results],
+            code_hash=content_hash(user_code)
+        )
+
+        record_question_stats(question_id, language, accepted, first_solve, first_language_solve)
+
+    submission.faster_than = None
+    if accepted and submission.runtime_ms is not None:
+        submission.faster_than = record_runtime(question_id, language, submission.runtime_ms)
+
+    if user_id:
+        profile_counters.add(user_id, submissions=1, solved=1 if first_solve else 0)
+        if leaderboard.is_built:
+            # Otherwise the first read builds it from history, this row included
+            leaderboard.record(user_id, question_id, accepted, submission_id=submission.id)
+
+    return submission
@@ -0,0 +1,169 @@
+import math
+
+
+def _write_varint(buffer, value):
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            buffer.append(byte | 0x80)
+        else:
+            buffer.append(byte)
+            return
+
+
+def _read_varint(data, offset):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+def _zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value):
+    return value // 2 if not value & 1 else -(value + 1) // 2
+
+
+class RuntimeSketch:
+    """
+    Mergeable streaming quantile sketch with relative accuracy (DDSketch).
+
+    Values are counted in logarithmic buckets whose bounds grow by a factor
+    ``gamma``, so any quantile is reported within ``relative_accuracy`` of the
+    true value, using a few hundred buckets for runtimes from microseconds
+    to minutes. Merging is bucket-wise addition. After :meth:`prepare`, the
+    percentile rank of a value is O(1): one logarithm and one lookup in a
+    prefix-sum table. Serialized as varint-encoded bucket deltas.
+    """
+
+    FORMAT_VERSION = 1
+    MIN_VALUE = 1e-3
+
+    def __init__(self, relative_accuracy=0.01, max_buckets=2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+        self._cumulative = None
+        self._min_index = 0
+
+    def _index(self, value):
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def add(self, value, count=1):
+        if value < self.MIN_VALUE:
+            self.zero_count += count
+        else:
+            index = self._index(value)
+            self.buckets[index] = self.buckets.get(index, 0) + count
+            if len(self.buckets) > self.max_buckets:
+                self._collapse_lowest()
+        self.count += count
+        self._cumulative = None
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        while len(self.buckets) > self.max_buckets:
+            self._collapse_lowest()
+        self._cumulative = None
+
+    def _collapse_lowest(self):
+        # Lose accuracy on the fastest runtimes rather than the slow tail
+        lowest, second = sorted(self.buckets)[:2]
+        self.buckets[second] += self.buckets.pop(lowest)
+
+    def prepare(self):
+        """Build the prefix-sum table used by :meth:`rank`."""
+        if not self.buckets:
+            self._cumulative = []
+            return
+        self._min_index = min(self.buckets)
+        running = self.zero_count
+        cumulative = []
+        for index in range(self._min_index, max(self.buckets) + 1):
+            cumulative.append(running)
+            running += self.buckets.get(index, 0)
+        self._cumulative = cumulative
+
+    def rank(self, value):
+        """
+        Fraction of recorded values below ``value``, counting values in the
+        same bucket as half below (mid-rank).
+        """
+        if not self.count:
+            return 0.0
+        if self._cumulative is None:
+            self.prepare()
+        if value < self.MIN_VALUE:
+            return (self.zero_count / 2) / self.count
+        if not self._cumulative:
+            return self.zero_count / self.count
+
+        position = self._index(value) - self._min_index
+        if position < 0:
+            return self.zero_count / self.count
+        if position >= len(self._cumulative):
+            return 1.0
+        below = self._cumulative[position]
+        same = self.buckets.get(position + self._min_index, 0)
+        return (below + same / 2) / self.count
+
+    def quantile(self, q):
+        """Approximate value at quantile ``q`` (0..1)."""
+        if not self.count:
+            return None
+        target = q * (self.count - 1)
+        seen = self.zero_count
+        if target < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > target:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def to_bytes(self):
+        buffer = bytearray([self.FORMAT_VERSION])
+        _write_varint(buffer, self.zero_count)
+        _write_varint(buffer, len(self.buckets))
+        previous = 0
+        for index in sorted(self.buckets):
+            _write_varint(buffer, _zigzag(index - previous))
+            _write_varint(buffer, self.buckets[index])
+            previous = index
+        return bytes(buffer)
+
+    @classmethod
+    def from_bytes(cls, data, **kwargs):
+        sketch = cls(**kwargs)
+        if not data:
+            return sketch
+        data = bytes(data)
+        if data[0] != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported sketch format {data[0]}")
+        sketch.zero_count, offset = _read_varint(data, 1)
+        size, offset = _read_varint(data, offset)
+        index = 0
+        for _ in range(size):
+            delta, offset = _read_varint(data, offset)
+            count, offset = _read_varint(data, offset)
+            index += _unzigzag(delta)
+            sketch.buckets[index] = count
+        sketch.count = sketch.zero_count + sum(sketch.buckets.values())
+        return sketch
@@ -0,0 +1,128 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+
+from questions.cache import bump_version
+from questions.models import Language, Question, QuestionStats
+from .models import Submission, RuntimeDistribution
+from .sketch import RuntimeSketch
+
+
+_language_ids = {}
+
+
+def _language_id(name):
+    if name not in _language_ids:
+        _language_ids.update(Language.objects.values_list('name', 'id'))
+    return _language_ids.get(name)
+
+
+def record_question_stats(question_id, language, accepted, first_solve, first_language_solve):
+    """
+    Atomically apply one judged submission to the question's overall and
+    per-language aggregates with ``F()`` increments.
+    """
+    scopes = [(None, first_solve)]
+    language_id = _language_id(language)
+    if language_id is not None:
+        scopes.append((language_id, first_language_solve))
+
+    for scope_language_id, new_solver in scopes:
+        increments = {
+            'attempts': F('attempts') + 1,
+            'accepted': F('accepted') + (1 if accepted else 0),
+            'solvers': F('solvers') + (1 if new_solver else 0),
+        }
+        rows = QuestionStats.objects.filter(question_id=question_id, language_id=scope_language_id)
+        if rows.update(**increments):
+            continue
+        try:
+            with transaction.atomic():
+                QuestionStats.objects.create(
+                    question_id=question_id,
+                    language_id=scope_language_id,
+                    attempts=1,
+                    accepted=1 if accepted else 0,
+                    solvers=1 if new_solver else 0
+                )
+        except IntegrityError:
+            # Created concurrently; apply the increment to that row instead
+            rows.update(**increments)
+
+    # Listings embed the aggregates, so their validators must change, once
+    # the increments are visible
+    transaction.on_commit(lambda: bump_version('list'))
+
+
+def reconcile_question_stats():
+    """
+    Recompute every aggregate from submission history with GROUP BY and
+    replace the stored rows, one question per transaction. Returns the
+    number of rows written.
+
+    Each question's stats rows are locked and deleted before its history is
+    aggregated. Increments from ``record_question_stats`` then either
+    committed earlier, so their submissions are counted, or wait for the
+    lock and apply on top of the new rows. Their submissions were not
+    committed yet, so they are not counted twice. The delete also takes
+    SQLite's write lock, where ``select_for_update`` does nothing.
+    """
+    written = 0
+    for question_id in Question.objects.order_by('id').values_list('id', flat=True).iterator():
+        try:
+            written += _reconcile_question(question_id)
+        except IntegrityError:
+            # A first submission created a row concurrently; its increment
+            # is committed now, so aggregating again counts it once
+            written += _reconcile_question(question_id)
+
+    bump_version('list')
+    return written
+
+
+def _reconcile_question(question_id):
+    accepted = Q(verdict='accepted')
+    aggregates = {
+        'attempts': Count('id'),
+        'accepted': Count('id', filter=accepted),
+        'solvers': Count('user', filter=accepted, distinct=True),
+    }
+    submissions = Submission.objects.filter(question_id=question_id).order_by()
+
+    with transaction.atomic():
+        stats = QuestionStats.objects.filter(question_id=question_id)
+        list(stats.select_for_update().values_list('id', flat=True))
+        stats.delete()
+
+        overall = submissions.aggregate(**aggregates)
+        if not overall['attempts']:
+            return 0
+        rows = [QuestionStats(question_id=question_id, language_id=None, **overall)]
+        for row in submissions.values('language').annotate(**aggregates):
+            language_id = _language_id(row.pop('language'))
+            if language_id is not None:
+                rows.append(QuestionStats(question_id=question_id, language_id=language_id, **row))
+        QuestionStats.objects.bulk_create(rows)
+    return len(rows)
+
+
+def record_runtime(question_id, language, runtime_ms):
+    """
+    Add an accepted runtime to the (question, language) sketch and return the
+    percentage of previously accepted submissions it was faster than, or
+    None when there is nothing to compare against yet.
+    """
+    with transaction.atomic():
+        distribution, _ = (
+            RuntimeDistribution.objects
+            .select_for_update()
+            .get_or_create(question_id=question_id, language=language)
+        )
+        sketch = RuntimeSketch.from_bytes(distribution.sketch)
+        faster_than = round(100 * (1 - sketch.rank(runtime_ms)), 1) if sketch.count else None
+
+        sketch.add(runtime_ms)
+        distribution.sketch = sketch.to_bytes()
+        distribution.count = sketch.count
+        distribution.save(update_fields=['sketch', 'count', 'updated_at'])
+
+    return faster_than
@@ -0,0 +1,396 @@
+import random
+import threading
+from unittest import mock
+
+from django.test import TestCase
+
+from questions.cache import get_version
+from questions.models import Language, Question, QuestionStats
+from users.counters import ProfileCounterBatcher
+from users.models import User
+from . import services, stats
+from .leaderboard import Leaderboard, RankedSkipList, _Standings
+from .models import RuntimeDistribution, SolvedQuestion, Submission
+from .sketch import RuntimeSketch
+
+
+class RankedSkipListTests(TestCase):
+
+    def test_matches_a_sorted_list(self):
+        randomizer = random.Random(7)
+        skip_list = RankedSkipList(max_levels=8)
+        expected = []
+
+        for _ in range(2000):
+            key = (randomizer.randrange(50), randomizer.randrange(50))
+            if key in expected:
+                skip_list.remove(key)
+                expected.remove(key)
+            else:
+                skip_list.insert(key)
+                expected.append(key)
+            expected.sort()
+
+        self.assertEqual(len(skip_list), len(expected))
+        self.assertEqual(skip_list.slice(0, len(expected)), expected)
+        for index, key in enumerate(expected):
+            self.assertEqual(skip_list[index], key)
+            self.assertEqual(skip_list.rank(key), index)
+        self.assertEqual(skip_list.slice(5, 15), expected[5:15])
+
+    def test_bounds(self):
+        skip_list = RankedSkipList()
+        skip_list.insert((1,))
+
+        with self.assertRaises(IndexError):
+            skip_list[1]
+        with self.assertRaises(KeyError):
+            skip_list.remove((2,))
+        self.assertEqual(skip_list.slice(-3, 10), [(1,)])
+        self.assertEqual(skip_list.slice(1, 0), [])
+
+
+class LeaderboardTests(TestCase):
+
+    def setUp(self):
+        self.leaderboard = Leaderboard()
+        self.leaderboard.rebuild()
+
+    def test_ranks_by_solved_then_penalty_with_shared_ranks(self):
+        record = self.leaderboard.record
+        record(1, 10, True)
+        record(1, 11, True)
+        record(2, 10, False)
+        record(2, 10, True)
+        record(3, 10, False)
+        record(3, 10, True)
+        record(4, 12, False)
+
+        self.assertEqual(self.leaderboard.top(10), [
+            {'rank': 1, 'user_id': 1, 'solved': 2, 'penalty': 0},
+            {'rank': 2, 'user_id': 2, 'solved': 1, 'penalty': 20},
+            {'rank': 2, 'user_id': 3, 'solved': 1, 'penalty': 20},
+        ])
+        self.assertEqual(len(self.leaderboard), 3)
+        self.assertIsNone(self.leaderboard.rank_of(4))
+
+    def test_verdicts_after_a_solve_are_ignored(self):
+        self.leaderboard.record(1, 10, True)
+        self.leaderboard.record(1, 10, False)
+        self.leaderboard.record(1, 10, True)
+
+        self.assertEqual(self.leaderboard.rank_of(1), {'rank': 1, 'user_id': 1, 'solved': 1, 'penalty': 0})
+
+    def test_neighbours(self):
+        for user_id in range(1, 8):
+            for question_id in range(user_id):
+                self.leaderboard.record(user_id, question_id, True)
+
+        neighbours = self.leaderboard.neighbours(4, 1)
+
+        self.assertEqual([entry['user_id'] for entry in neighbours], [5, 4, 3])
+        self.assertEqual(self.leaderboard.neighbours(99, 1), [])
+
+    def test_rebuilds_from_history(self):
+        alice = User.objects.create_user(username='alice', password='x')
+        bob = User.objects.create_user(username='bob', password='x')
+        question = Question.objects.create(title='Two Sum')
+        for user, verdict in ((alice, 'wrong_answer'), (alice, 'accepted'), (bob, 'accepted')):
+            Submission.objects.create(user=user, question=question, language='python',
+                                      verdict=verdict, code_hash='0' * 64)
+
+        leaderboard = Leaderboard()
+
+        self.assertEqual([entry['user_id'] for entry in leaderboard.top(10)], [bob.id, alice.id])
+        self.assertEqual(leaderboard.rank_of(alice.id)['penalty'], Leaderboard.PENALTY_PER_REJECTION)
+
+    def test_stale_ranking_is_rebuilt(self):
+        leaderboard = Leaderboard(rebuild_interval=60)
+        leaderboard.rebuild()
+        leaderboard.record(1, 10, True)
+
+        with mock.patch('submissions.leaderboard.time.monotonic', return_value=leaderboard._built_at + 61):
+            self.assertEqual(len(leaderboard), 0)
+
+    def test_verdicts_counted_by_a_rebuild_are_not_applied_again(self):
+        alice = User.objects.create_user(username='alice', password='x')
+        question = Question.objects.create(title='Two Sum')
+        rejected = Submission.objects.create(user=alice, question=question, language='python',
+                                             verdict='wrong_answer', code_hash='0' * 64)
+        leaderboard = Leaderboard()
+        leaderboard.rebuild()
+
+        leaderboard.record(alice.id, question.id, False, submission_id=rejected.id)
+        leaderboard.record(alice.id, question.id, True, submission_id=rejected.id + 1)
+
+        self.assertEqual(leaderboard.rank_of(alice.id)['penalty'], Leaderboard.PENALTY_PER_REJECTION)
+
+    def test_rebuild_reads_history_outside_the_lock(self):
+        alice = User.objects.create_user(username='alice', password='x')
+        bob = User.objects.create_user(username='bob', password='x')
+        question = Question.objects.create(title='Two Sum')
+        accepted = Submission.objects.create(user=bob, question=question, language='python',
+                                             verdict='accepted', code_hash='0' * 64)
+        leaderboard = Leaderboard()
+        leaderboard.rebuild()
+        leaderboard.record(99, question.id, True)
+        readers = []
+        apply = _Standings.apply
+        interleaved = threading.Event()
+
+        def apply_while_readers_wait(standings, *args):
+            if not interleaved.is_set():
+                interleaved.set()
+                # Verdict committed after the history query started
+                leaderboard.record(alice.id, question.id, True, submission_id=accepted.id + 1)
+                reader = threading.Thread(target=lambda: readers.append(leaderboard.top(10)))
+                reader.start()
+                reader.join(timeout=5)
+            apply(standings, *args)
+
+        with mock.patch.object(_Standings, 'apply', apply_while_readers_wait):
+            leaderboard.rebuild()
+
+        self.assertEqual([entry['user_id'] for entry in readers[0]], [alice.id, bob.id, 99])
+        self.assertEqual([entry['user_id'] for entry in leaderboard.top(10)], [alice.id, bob.id])
+
+
+class QuestionStatsTests(TestCase):
+
+    def setUp(self):
+        stats._language_ids.clear()
+        self.python = Language.objects.create(name='python')
+        self.java = Language.objects.create(name='java')
+        self.question = Question.objects.create(title='Two Sum')
+        self.users = [User.objects.create_user(username=f'user{index}', password='x') for index in range(2)]
+
+    def submit(self, user, language, verdict):
+        Submission.objects.create(user=user, question=self.question, language=language,
+                                  verdict=verdict, code_hash='0' * 64)
+
+    def rows(self):
+        return {
+            row.language_id: (row.attempts, row.accepted, row.solvers)
+            for row in QuestionStats.objects.filter(question=self.question)
+        }
+
+    def test_record_increments_overall_and_language_rows(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            stats.record_question_stats(self.question.id, 'python', False, False, False)
+            stats.record_question_stats(self.question.id, 'python', True, True, True)
+            stats.record_question_stats(self.question.id, 'java', True, False, True)
+
+        self.assertEqual(self.rows(), {
+            None: (3, 2, 1),
+            self.python.id: (2, 1, 1),
+            self.java.id: (1, 1, 1),
+        })
+        self.assertEqual(len(callbacks), 3)
+
+    def test_unknown_language_only_counts_overall(self):
+        stats.record_question_stats(self.question.id, 'cobol', True, True, True)
+
+        self.assertEqual(self.rows(), {None: (1, 1, 1)})
+
+    def test_reconcile_replaces_drifted_rows(self):
+        first, second = self.users
+        self.submit(first, 'python', 'wrong_answer')
+        self.submit(first, 'python', 'accepted')
+        self.submit(first, 'java', 'accepted')
+        self.submit(second, 'java', 'accepted')
+        QuestionStats.objects.create(question=self.question, language=None, attempts=99, accepted=99, solvers=99)
+        QuestionStats.objects.create(question=self.question, language=self.python, attempts=1)
+        empty = Question.objects.create(title='Unsolved')
+        QuestionStats.objects.create(question=empty, language=None, attempts=5)
+
+        written = stats.reconcile_question_stats()
+
+        self.assertEqual(written, 3)
+        self.assertEqual(self.rows(), {
+            None: (4, 3, 2),
+            self.python.id: (2, 1, 1),
+            self.java.id: (2, 2, 2),
+        })
+        self.assertFalse(QuestionStats.objects.filter(question=empty).exists())
+
+    def test_reconcile_bumps_list_version(self):
+        version = get_version('list')
+
+        stats.reconcile_question_stats()
+
+        self.assertNotEqual(get_version('list'), version)
+
+
+class RuntimeSketchTests(TestCase):
+
+    def setUp(self):
+        randomizer = random.Random(3)
+        self.values = [randomizer.lognormvariate(3, 1) for _ in range(5000)]
+
+    def test_quantiles_are_within_relative_accuracy(self):
+        sketch = RuntimeSketch(relative_accuracy=0.01)
+        for value in self.values:
+            sketch.add(value)
+
+        ordered = sorted(self.values)
+        for q in (0.01, 0.25, 0.5, 0.9, 0.99):
+            exact = ordered[int(q * (len(ordered) - 1))]
+            self.assertAlmostEqual(sketch.quantile(q) / exact, 1, delta=0.011)
+
+    def test_rank_matches_the_exact_fraction_below(self):
+        sketch = RuntimeSketch()
+        for value in self.values:
+            sketch.add(value)
+
+        for probe in (5.0, 20.0, 50.0, 200.0):
+            exact = sum(value < probe for value in self.values) / len(self.values)
+            self.assertAlmostEqual(sketch.rank(probe), exact, delta=0.01)
+        self.assertEqual(sketch.rank(1e9), 1.0)
+        self.assertEqual(RuntimeSketch().rank(10), 0.0)
+
+    def test_round_trips_through_bytes(self):
+        sketch = RuntimeSketch()
+        for value in self.values + [0, 0]:
+            sketch.add(value)
+
+        restored = RuntimeSketch.from_bytes(sketch.to_bytes())
+
+        self.assertEqual(restored.buckets, sketch.buckets)
+        self.assertEqual(restored.zero_count, 2)
+        self.assertEqual(restored.count, sketch.count)
+        with self.assertRaises(ValueError):
+            RuntimeSketch.from_bytes(b'\x09')
+
+    def test_merge_equals_adding_everything(self):
+        whole, left, right = RuntimeSketch(), RuntimeSketch(), RuntimeSketch()
+        for index, value in enumerate(self.values):
+            whole.add(value)
+            (left if index % 2 else right).add(value)
+
+        left.merge(right)
+
+        self.assertEqual(left.buckets, whole.buckets)
+        self.assertEqual(left.count, whole.count)
+        with self.assertRaises(ValueError):
+            left.merge(RuntimeSketch(relative_accuracy=0.05))
+
+    def test_bucket_count_is_bounded(self):
+        sketch = RuntimeSketch(max_buckets=128)
+        for value in self.values:
+            sketch.add(value)
+
+        # Collapsing loses accuracy on the fastest runtimes, not the tail
+        self.assertLessEqual(len(sketch.buckets), 128)
+        self.assertEqual(sketch.count, len(self.values))
+        self.assertAlmostEqual(sketch.quantile(0.99) / sorted(self.values)[4949], 1, delta=0.011)
+
+
+class RecordSubmissionTests(TestCase):
+
+    def setUp(self):
+        stats._language_ids.clear()
+        Language.objects.create(name='python')
+        self.question = Question.objects.create(title='Two Sum')
+        self.user = User.objects.create_user(username='alice', password='x')
+        self.counters = ProfileCounterBatcher()
+        for patcher in (
+            mock.patch.object(ProfileCounterBatcher, '_start'),
+            mock.patch.object(services, 'profile_counters', self.counters),
+            mock.patch.object(services, 'leaderboard', Leaderboard()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def submit(self, status='correct'):
+        return services.record_submission(self.user.id, self.question.id, 'python', 'print(1)',
+                                           [{'status': status, 'runtime_ms': 10}])
+
+    def solvers(self):
+        return QuestionStats.objects.get(question=self.question, language=None).solvers
+
+    def test_only_the_first_accepted_submission_is_a_first_solve(self):
+        self.submit('incorrect')
+        self.submit()
+        self.submit()
+
+        self.assertEqual(self.solvers(), 1)
+        self.assertEqual(self.counters._pending, {self.user.id: (3, 1)})
+        self.assertEqual(SolvedQuestion.objects.filter(user=self.user).count(), 2)
+
+    def test_concurrent_first_solves_count_once(self):
+        verdict = services.submission_verdict
+        interleaved = threading.Event()
+
+        def verdict_then_a_concurrent_solve(*args):
+            if not interleaved.is_set():
+                interleaved.set()
+                # Another accepted submission commits between this one's
+                # verdict and its claim
+                self.submit()
+            return verdict(*args)
+
+        with mock.patch.object(services, 'submission_verdict', verdict_then_a_concurrent_solve):
+            submission = self.submit()
+
+        self.assertEqual(submission.verdict, 'accepted')
+        self.assertEqual(Submission.objects.count(), 2)
+        self.assertEqual(self.solvers(), 1)
+        self.assertEqual(self.counters._pending, {self.user.id: (2, 1)})
+
+
+class SubmissionHistoryTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='x')
+        self.questions = [Question.objects.create(title=title) for title in ('Two Sum', 'Three Sum')]
+        self.submissions = [
+            Submission.objects.create(user=self.user, question=self.questions[index % 2], language='python',
+                                      verdict='wrong_answer', code_hash='0' * 64)
+            for index in range(5)
+        ]
+        other = User.objects.create_user(username='bob', password='x')
+        Submission.objects.create(user=other, question=self.questions[0], language='python',
+                                  verdict='accepted', code_hash='0' * 64)
+
+    def page(self, **params):
+        response = self.client.get(f'/api/submissions/users/{self.user.id}/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_keyset_pages_cover_the_history_newest_first(self):
+        ids, before = [], None
+        while True:
+            page = self.page(limit=2, **({'before': before} if before else {}))
+            ids.extend(row['id'] for row in page['results'])
+            before = page['next_before']
+            if before is None:
+                break
+
+        self.assertEqual(ids, [submission.id for submission in reversed(self.submissions)])
+
+    def test_filters_by_question(self):
+        page = self.page(question_id=self.questions[1].id)
+
+        self.assertEqual([row['id'] for row in page['results']], [self.submissions[3].id, self.submissions[1].id])
+
+    def test_limit_is_clamped(self):
+        for limit in (0, -5):
+            with self.subTest(limit=limit):
+                page = self.page(limit=limit)
+                self.assertEqual([row['id'] for row in page['results']], [self.submissions[-1].id])
+                self.assertEqual(page['next_before'], self.submissions[-1].id)
+
+
+class RecordRuntimeTests(TestCase):
+
+    def test_reports_share_of_slower_runtimes(self):
+        question = Question.objects.create(title='Two Sum')
+
+        self.assertIsNone(stats.record_runtime(question.id, 'python', 40))
+        for runtime_ms in (10, 20, 30):
+            stats.record_runtime(question.id, 'python', runtime_ms)
+
+        self.assertEqual(stats.record_runtime(question.id, 'python', 25), 50.0)
+        self.assertEqual(stats.record_runtime(question.id, 'python', 5), 100.0)
+        distribution = RuntimeDistribution.objects.get(question=question, language='python')
+        self.assertEqual(distribution.count, 6)
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('users/<int:user_id>/', views.SubmissionHistoryAPIView.as_view(), name='submission-history'),
+    path('leaderboard/', views.LeaderboardAPIView.as_view(), name='leaderboard'),
+    path('leaderboard/users/<int:user_id>/', views.LeaderboardUserAPIView.as_view(), name='leaderboard-user'),
+]
@@ -0,0 +1,140 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from .leaderboard import leaderboard
+from .models import Submission
+
+
+class SubmissionHistoryAPIView(APIView):
+    """
+    API view to page through a user's submissions, newest first.
+    Uses keyset pagination on the submission ID so every page is served
+    from the user history index, however deep the user pages.
+    """
+    
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 100
+    LISTED_FIELDS = (
+        'id', 'question_id', 'language', 'verdict',
+        'passed_cases', 'total_cases', 'runtime_ms', 'created_at'
+    )
+    
+    def get(self, request, user_id):
+        """
+        Query params: before (submission ID cursor), limit, question_id
+        """
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', self.DEFAULT_LIMIT)), self.MAX_LIMIT))
+            before = request.query_params.get('before')
+            before = int(before) if before else None
+            question_id = request.query_params.get('question_id')
+            question_id = int(question_id) if question_id else None
+        except ValueError:
+            return Response({
+                'success': False,
+                'error': 'limit, before and question_id must be integers'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            submissions = Submission.objects.filter(user_id=user_id)
+            if question_id:
+                submissions = submissions.filter(question_id=question_id)
+            if before:
+                submissions = submissions.filter(id__lt=before)
+            
+            rows = list(submissions.order_by('-id').values(*self.LISTED_FIELDS)[:limit + 1])
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            
+            return Response({
+                'success': True,
+                'results': rows,
+                'next_before': rows[-1]['id'] if has_more else None
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({
+                'success': False,
+                'error': f'Failed to fetch submissions: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _with_usernames(entries):
+    usernames = dict(
+        get_user_model().objects
+        .filter(id__in=[entry['user_id'] for entry in entries])
+        .values_list('id', 'username')
+    )
+    for entry in entries:
+        entry['username'] = usernames.get(entry['user_id'])
+    return entries
+
+
+class LeaderboardAPIView(APIView):
+    """
+    API view for the top of the leaderboard.
+    """
+    
+    DEFAULT_LIMIT = 50
+    MAX_LIMIT = 500
+    
+    def get(self, request):
+        """Query params: limit"""
+        try:
+            limit = min(int(request.query_params.get('limit', self.DEFAULT_LIMIT)), self.MAX_LIMIT)
+        except ValueError:
+            return Response({
+                'success': False,
+                'error': 'limit must be an integer'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            results = leaderboard.top(limit)
+            return Response({
+                'success': True,
+                'total_ranked': len(leaderboard),
+                'results': _with_usernames(results)
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({
+                'success': False,
+                'error': f'Failed to fetch leaderboard: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class LeaderboardUserAPIView(APIView):
+    """
+    API view for a user's rank and the users ranked around them.
+    """
+    
+    DEFAULT_RADIUS = 5
+    MAX_RADIUS = 50
+    
+    def get(self, request, user_id):
+        """Query params: radius (neighbours above and below)"""
+        try:
+            radius = min(int(request.query_params.get('radius', self.DEFAULT_RADIUS)), self.MAX_RADIUS)
+        except ValueError:
+            return Response({
+                'success': False,
+                'error': 'radius must be an integer'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            entry = leaderboard.rank_of(user_id)
+            if entry is None:
+                return Response({
+                    'success': False,
+                    'error': 'User has not solved any question yet'
+                }, status=status.HTTP_404_NOT_FOUND)
+            
+            return Response({
+                'success': True,
+                'user': entry,
+                'neighbours': _with_usernames(leaderboard.neighbours(user_id, radius))
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({
+                'success': False,
+                'error': f'Failed to fetch leaderboard: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
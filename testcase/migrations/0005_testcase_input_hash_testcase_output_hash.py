@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-19 10:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testcase', '0004_remove_testcase_input_path_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testcase',
+            name='input_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the uploaded input', max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='testcase',
+            name='output_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the uploaded output', max_length=64, null=True),
+        ),
+    ]
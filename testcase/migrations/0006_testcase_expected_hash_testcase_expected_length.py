@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-19 14:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testcase', '0005_testcase_input_hash_testcase_output_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testcase',
+            name='expected_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the normalized output', max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='testcase',
+            name='expected_length',
+            field=models.PositiveBigIntegerField(blank=True, help_text='UTF-8 length of the normalized output', null=True),
+        ),
+    ]
@@ -6,6 +6,10 @@ class TestCase(models.Model):
     question = models.ForeignKey('questions.Question', on_delete=models.CASCADE, related_name='test_cases')
     input_s3_key = models.CharField(max_length=500, help_text="S3 key for input file", null=True, blank=True)
     output_s3_key = models.CharField(max_length=500, help_text="S3 key for output file", null=True, blank=True)
+    input_hash = models.CharField(max_length=64, help_text="SHA-256 of the uploaded input", null=True, blank=True)
+    output_hash = models.CharField(max_length=64, help_text="SHA-256 of the uploaded output", null=True, blank=True)
+    expected_hash = models.CharField(max_length=64, help_text="SHA-256 of the normalized output", null=True, blank=True)
+    expected_length = models.PositiveBigIntegerField(help_text="UTF-8 length of the normalized output", null=True, blank=True)
     is_example = models.BooleanField(default=False, help_text="Whether this is an example test case")
     is_hidden = models.BooleanField(default=False, help_text="Whether this test case is hidden from users")
     created_at = models.DateTimeField(auto_now_add=True)
@@ -0,0 +1,40 @@
+from rest_framework import authentication, exceptions
+
+from .tokens import ExpiredToken, InvalidToken, validate_access_token, user_cache
+
+
+class SignedTokenAuthentication(authentication.BaseAuthentication):
+    """
+    Authenticates ``Authorization: Bearer <access token>`` headers using the
+    signed tokens issued at login. Users are served from the in-process
+    user cache, so a warm request does no database work.
+
+    Headers that do not carry one of our tokens (malformed, unsigned, or
+    placeholders such as ``Bearer null``) are ignored rather than rejected,
+    so public endpoints keep working for such clients; the request is then
+    anonymous. Expired tokens are rejected so clients know to refresh.
+    """
+
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        header = authentication.get_authorization_header(request).split()
+        if not header or header[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(header) != 2:
+            return None
+
+        try:
+            user_id = validate_access_token(header[1].decode())
+        except ExpiredToken as e:
+            raise exceptions.AuthenticationFailed(str(e))
+        except (InvalidToken, UnicodeError):
+            return None
+
+        user = user_cache.get_or_load(user_id)
+        if user is None:
+            raise exceptions.AuthenticationFailed('User not found or inactive')
+        return (user, None)
+
+    def authenticate_header(self, request):
+        return self.keyword
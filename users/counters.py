@@ -0,0 +1,123 @@
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+
+from .models import User, UserProfile
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileCounterBatcher:
+    """
+    Write-behind batcher for ``UserProfile`` counters.
+
+    Increments are coalesced in memory per user and applied by a background
+    thread every ``flush_interval`` seconds (or sooner once ``max_pending``
+    users are waiting), as one ``UPDATE ... SET x = x + n`` per user in a
+    single transaction. Hot users during a contest therefore cost one row
+    update per flush instead of one per submission. Pending increments are
+    flushed at interpreter exit.
+
+    Rows are applied independently: increments for users deleted in the
+    meantime are dropped, and only rows that failed are re-queued, so one
+    bad row cannot block everyone else's counters.
+    """
+
+    def __init__(self, flush_interval=2.0, max_pending=1000):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def add(self, user_id, submissions=0, solved=0):
+        with self._lock:
+            pending_submissions, pending_solved = self._pending.get(user_id, (0, 0))
+            self._pending[user_id] = (pending_submissions + submissions, pending_solved + solved)
+            full = len(self._pending) >= self.max_pending
+            if self._thread is None:
+                self._start()
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """Apply every pending increment. Returns the number of users updated."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        applied = 0
+        failed = {}
+        try:
+            with transaction.atomic():
+                # Fixed lock order so concurrent flushes can't deadlock
+                for user_id in sorted(pending):
+                    submissions, solved = pending[user_id]
+                    try:
+                        # Savepoint per row so a failure only loses that row
+                        with transaction.atomic():
+                            applied += self._apply(user_id, submissions, solved)
+                    except Exception as e:
+                        logger.error("Failed to flush profile counters of user %s, re-queueing: %s", user_id, e)
+                        failed[user_id] = (submissions, solved)
+        except Exception as e:
+            # The commit itself failed; nothing was written
+            logger.error("Failed to flush profile counters, re-queueing: %s", e)
+            self._requeue(pending)
+            return 0
+
+        self._requeue(failed)
+        return applied
+
+    def _apply(self, user_id, submissions, solved):
+        """Apply one user's increments. Returns 0 when the user no longer exists."""
+        updated = UserProfile.objects.filter(user_id=user_id).update(
+            total_submissions=F('total_submissions') + submissions,
+            problems_solved=F('problems_solved') + solved
+        )
+        if updated:
+            return 1
+        # Foreign keys are checked at commit, so test for the user up front
+        # rather than letting one deleted user fail the whole transaction
+        if not User.objects.filter(id=user_id).exists():
+            logger.warning("Dropping profile counters of deleted user %s", user_id)
+            return 0
+        UserProfile.objects.create(
+            user_id=user_id,
+            total_submissions=submissions,
+            problems_solved=solved
+        )
+        return 1
+
+    def _requeue(self, entries):
+        with self._lock:
+            for user_id, (submissions, solved) in entries.items():
+                pending_submissions, pending_solved = self._pending.get(user_id, (0, 0))
+                self._pending[user_id] = (pending_submissions + submissions, pending_solved + solved)
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name='profile-counter-flusher', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+profile_counters = ProfileCounterBatcher(
+    flush_interval=settings.PROFILE_COUNTER_FLUSH_INTERVAL,
+    max_pending=settings.PROFILE_COUNTER_MAX_PENDING
+)
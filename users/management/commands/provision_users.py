@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from users.provisioning import UserProvisioner, read_rows
+
+
+class Command(BaseCommand):
+    help = "Create users in bulk from a CSV, NDJSON or JSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='File of users (username, password, email, first_name, last_name, user_type)')
+        parser.add_argument('--format', choices=['csv', 'ndjson', 'json'], default=None,
+                            help='Input format (default: from the file extension)')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Processes used for password hashing (default: CPU count)')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Users inserted per database batch')
+
+    def handle(self, *args, **options):
+        source = options['source']
+        data_format = options['format'] or source.rsplit('.', 1)[-1].lower()
+        if data_format not in ('csv', 'ndjson', 'json'):
+            raise CommandError(f"Cannot infer format from {source}; pass --format")
+
+        provisioner = UserProvisioner(batch_size=options['batch_size'], workers=options['workers'])
+        try:
+            with open(source, newline='', encoding='utf-8') as handle:
+                report = provisioner.provision(read_rows(handle, data_format))
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for failure in report['failed']:
+            self.stderr.write(f"row {failure['row']} ({failure['username']}): {failure['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {report['created']} users, {len(report['failed'])} failed"
+        ))
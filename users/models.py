@@ -11,6 +11,13 @@ class User(AbstractUser):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True) 
     
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['email'], name='users_user_email_idx'),
+            models.Index(fields=['user_type', 'id'], name='users_user_type_id_idx'),
+            models.Index(fields=['created_at'], name='users_user_created_idx'),
+        ]
+    
     def is_admin_user(self):
         return self.user_type == 'admin'
     
@@ -0,0 +1,13 @@
+from rest_framework.permissions import BasePermission
+
+
+class IsAdminUserType(BasePermission):
+    """
+    Allows access only to authenticated users whose ``user_type`` is admin.
+    """
+    
+    message = 'Admin access required'
+    
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and user.is_admin_user())
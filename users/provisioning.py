@@ -0,0 +1,188 @@
+import csv
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+
+from .models import User, UserProfile
+
+
+def _init_worker():
+    """Configure Django in pool processes started with the spawn method."""
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gencoder.settings')
+    django.setup()
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def shared_hashing_pool():
+    """
+    Process pool for password hashing in web workers, started on first use
+    and then reused by every request of this process.
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = ProcessPoolExecutor(
+                max_workers=settings.USER_PROVISION_WORKERS,
+                initializer=_init_worker
+            )
+        return _shared_pool
+
+
+class InvalidRow:
+    """A row that could not be parsed, reported as that row's failure."""
+
+    def __init__(self, error):
+        self.error = error
+
+
+def _ndjson_rows(lines):
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield InvalidRow(f'Invalid JSON: {e}')
+
+
+def read_rows(lines, data_format):
+    """
+    Iterate user rows from an iterable of text lines.
+    ``data_format`` is ``csv`` (with a header row), ``ndjson`` (one object
+    per line) or ``json`` (a single array, loaded at once). An NDJSON line
+    that isn't valid JSON is yielded as an ``InvalidRow``.
+    """
+    if data_format == 'csv':
+        return csv.DictReader(lines)
+    if data_format == 'ndjson':
+        return _ndjson_rows(lines)
+    if data_format == 'json':
+        rows = json.loads(''.join(lines))
+        if not isinstance(rows, list):
+            raise ValueError('JSON input must be an array of user objects')
+        return iter(rows)
+    raise ValueError(f'Unsupported format: {data_format}')
+
+
+class UserProvisioner:
+    """
+    Creates users in batches. Password hashing (PBKDF2, CPU-bound) runs on a
+    process pool, and each batch's users and profiles are inserted with
+    ``bulk_create``. Rows that fail parsing, validation or insertion are
+    reported with their 1-based row number without aborting the rest of the
+    batch.
+
+    ``pool`` is a process pool of ``workers`` processes to reuse (see
+    ``shared_hashing_pool``); without one, a pool is started for the call.
+    """
+
+    def __init__(self, batch_size=500, workers=None, pool=None):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.pool = pool
+
+    def provision(self, rows):
+        if self.pool is not None:
+            return self._provision(self.pool, rows)
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as pool:
+            return self._provision(pool, rows)
+
+    def _provision(self, pool, rows):
+        report = {'created': 0, 'failed': []}
+        numbered = enumerate(rows, start=1)
+        while True:
+            batch = list(islice(numbered, self.batch_size))
+            if not batch:
+                return report
+            self._provision_batch(pool, batch, report)
+
+    def _provision_batch(self, pool, batch, report):
+        valid = self._validate(batch, report)
+        if not valid:
+            return
+
+        passwords = [row['password'] for _, row in valid]
+        chunksize = max(1, len(passwords) // ((self.workers or os.cpu_count() or 1) * 4))
+        hashed = list(pool.map(make_password, passwords, chunksize=chunksize))
+
+        users = [
+            User(
+                username=row['username'],
+                email=row.get('email') or '',
+                first_name=row.get('first_name') or '',
+                last_name=row.get('last_name') or '',
+                user_type=row.get('user_type') or 'user',
+                password=password_hash
+            )
+            for (_, row), password_hash in zip(valid, hashed)
+        ]
+
+        try:
+            with transaction.atomic():
+                created = User.objects.bulk_create(users)
+                UserProfile.objects.bulk_create([UserProfile(user=user) for user in created])
+            report['created'] += len(created)
+        except IntegrityError:
+            # A concurrent insert collided; retry row by row to isolate it
+            for (number, row), user in zip(valid, users):
+                try:
+                    with transaction.atomic():
+                        user.save()
+                        UserProfile.objects.create(user=user)
+                    report['created'] += 1
+                except IntegrityError as e:
+                    report['failed'].append(self._failure(number, row, str(e)))
+
+    def _validate(self, batch, report):
+        """Return the rows that can be inserted, recording failures for the rest."""
+        rows = [row for _, row in batch if isinstance(row, dict)]
+        usernames = [row.get('username') for row in rows if row.get('username')]
+        emails = [row.get('email') for row in rows if row.get('email')]
+        taken_usernames = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        taken_emails = set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+        user_types = dict(User.USER_TYPES)
+
+        valid = []
+        for number, row in batch:
+            if isinstance(row, InvalidRow):
+                report['failed'].append(self._failure(number, {}, row.error))
+                continue
+            if not isinstance(row, dict):
+                report['failed'].append(self._failure(number, {}, 'Row must be an object'))
+                continue
+
+            username = row.get('username')
+            email = row.get('email')
+            if not username or not row.get('password'):
+                error = 'Username and password required'
+            elif (row.get('user_type') or 'user') not in user_types:
+                error = f"Invalid user_type: {row.get('user_type')}"
+            elif username in taken_usernames:
+                error = 'Username already exists'
+            elif email and email in taken_emails:
+                error = 'Email already exists'
+            else:
+                error = None
+
+            if error:
+                report['failed'].append(self._failure(number, row, error))
+                continue
+
+            taken_usernames.add(username)
+            if email:
+                taken_emails.add(email)
+            valid.append((number, row))
+        return valid
+
+    def _failure(self, number, row, error):
+        return {'row': number, 'username': row.get('username'), 'error': error}
@@ -1,3 +1,227 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
-# Create your tests here.
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.request import Request
+
+from .authentication import SignedTokenAuthentication
+from .counters import ProfileCounterBatcher
+from .models import User, UserProfile
+from .provisioning import UserProvisioner, read_rows
+from .tokens import ExpiredToken, InvalidToken, issue_tokens, refresh_tokens, user_cache, validate_access_token
+
+
+class TokenTests(TestCase):
+
+    def setUp(self):
+        user_cache._entries.clear()
+        self.user = User.objects.create_user(username='alice', password='secret')
+
+    def test_access_token_round_trip(self):
+        tokens = issue_tokens(self.user)
+
+        self.assertEqual(validate_access_token(tokens['access_token']), self.user.id)
+        with self.assertRaises(InvalidToken):
+            validate_access_token(tokens['refresh_token'])
+        with self.assertRaises(InvalidToken):
+            validate_access_token('null')
+
+    @override_settings(ACCESS_TOKEN_LIFETIME=-1)
+    def test_expired_access_token(self):
+        tokens = issue_tokens(self.user)
+
+        with self.assertRaises(ExpiredToken):
+            validate_access_token(tokens['access_token'])
+
+    def test_password_change_revokes_refresh_tokens(self):
+        tokens = issue_tokens(self.user)
+        user, refreshed = refresh_tokens(tokens['refresh_token'])
+        self.assertEqual(user, self.user)
+        self.assertEqual(validate_access_token(refreshed['access_token']), self.user.id)
+
+        self.user.set_password('changed')
+        self.user.save()
+
+        with self.assertRaises(InvalidToken):
+            refresh_tokens(tokens['refresh_token'])
+
+
+class SignedTokenAuthenticationTests(TestCase):
+
+    def setUp(self):
+        user_cache._entries.clear()
+        self.user = User.objects.create_user(username='alice', password='secret')
+        self.admin = User.objects.create_user(username='root', password='secret', user_type='admin')
+        self.factory = RequestFactory()
+
+    def authenticate(self, header):
+        request = Request(self.factory.get('/', HTTP_AUTHORIZATION=header))
+        return SignedTokenAuthentication().authenticate(request)
+
+    def bearer(self, user):
+        return f"Bearer {issue_tokens(user)['access_token']}"
+
+    def test_valid_token_is_served_from_the_user_cache(self):
+        header = self.bearer(self.user)
+        self.assertEqual(self.authenticate(header)[0], self.user)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate(header)[0], self.user)
+
+    def test_saving_a_user_evicts_it(self):
+        header = self.bearer(self.user)
+        self.authenticate(header)
+
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get('/api/questions/languages/', HTTP_AUTHORIZATION=header)
+        self.assertEqual(response.status_code, 401)
+
+    def test_malformed_headers_are_anonymous_on_public_endpoints(self):
+        for header in ('Bearer null', 'Bearer', 'Bearer a b', 'Bearer not-a-token', 'Token abc'):
+            with self.subTest(header=header):
+                self.assertIsNone(self.authenticate(header))
+                response = self.client.get('/api/questions/languages/', HTTP_AUTHORIZATION=header)
+                self.assertEqual(response.status_code, 200)
+
+    @override_settings(ACCESS_TOKEN_LIFETIME=-1)
+    def test_expired_token_is_rejected(self):
+        response = self.client.get('/api/questions/languages/', HTTP_AUTHORIZATION=self.bearer(self.user))
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer')
+
+    def test_admin_endpoint_requires_an_admin_token(self):
+        self.assertEqual(self.client.get('/api/users/list/').status_code, 401)
+        response = self.client.get('/api/users/list/', HTTP_AUTHORIZATION=self.bearer(self.user))
+        self.assertEqual(response.status_code, 403)
+
+        response = self.client.get('/api/users/list/', HTTP_AUTHORIZATION=self.bearer(self.admin))
+        self.assertEqual(response.status_code, 200)
+
+    def test_user_list_clamps_limit_and_rejects_a_negative_cursor(self):
+        header = self.bearer(self.admin)
+
+        for limit in ('0', '-3'):
+            with self.subTest(limit=limit):
+                response = self.client.get(f'/api/users/list/?limit={limit}', HTTP_AUTHORIZATION=header)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual([row['id'] for row in response.json()['data']], [self.user.id])
+                self.assertEqual(response.json()['next_after'], self.user.id)
+
+        response = self.client.get('/api/users/list/?after=-1', HTTP_AUTHORIZATION=header)
+        self.assertEqual(response.status_code, 400)
+
+    def test_login_and_refresh(self):
+        self.user.email = 'alice@example.com'
+        self.user.save()
+
+        login = self.client.post('/api/users/login/', {'email': 'alice@example.com', 'password': 'secret'},
+                                 content_type='application/json')
+        self.assertEqual(login.status_code, 200)
+        refresh_token = login.json()['data']['refresh_token']
+
+        response = self.client.post('/api/users/token/refresh/', {'refresh_token': refresh_token},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['user_id'], self.user.id)
+
+        response = self.client.post('/api/users/token/refresh/', {'refresh_token': 'null'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+
+
+class ProfileCounterBatcherTests(TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(ProfileCounterBatcher, '_start')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.batcher = ProfileCounterBatcher()
+        self.alice = User.objects.create_user(username='alice', password='x')
+        self.bob = User.objects.create_user(username='bob', password='x')
+        UserProfile.objects.create(user=self.alice, total_submissions=5, problems_solved=1)
+
+    def counters(self, user):
+        profile = UserProfile.objects.get(user=user)
+        return profile.total_submissions, profile.problems_solved
+
+    def test_increments_are_coalesced_per_user(self):
+        self.batcher.add(self.alice.id, submissions=1)
+        self.batcher.add(self.alice.id, submissions=1, solved=1)
+        self.batcher.add(self.bob.id, submissions=1)
+        self.assertEqual(self.batcher._pending, {self.alice.id: (2, 1), self.bob.id: (1, 0)})
+
+        self.assertEqual(self.batcher.flush(), 2)
+
+        self.assertEqual(self.counters(self.alice), (7, 2))
+        self.assertEqual(self.counters(self.bob), (1, 0))
+        self.assertEqual(self.batcher._pending, {})
+        self.assertEqual(self.batcher.flush(), 0)
+
+    def test_failed_rows_are_requeued_alone(self):
+        apply = ProfileCounterBatcher._apply
+
+        def fail_for_bob(batcher, user_id, submissions, solved):
+            if user_id == self.bob.id:
+                raise RuntimeError('row locked')
+            return apply(batcher, user_id, submissions, solved)
+
+        self.batcher.add(self.alice.id, submissions=1)
+        self.batcher.add(self.bob.id, submissions=1, solved=1)
+        with mock.patch.object(ProfileCounterBatcher, '_apply', fail_for_bob):
+            self.assertEqual(self.batcher.flush(), 1)
+
+        self.assertEqual(self.counters(self.alice), (6, 1))
+        self.assertEqual(self.batcher._pending, {self.bob.id: (1, 1)})
+
+        self.batcher.add(self.bob.id, submissions=1)
+        self.assertEqual(self.batcher.flush(), 1)
+        self.assertEqual(self.counters(self.bob), (2, 1))
+
+    def test_deleted_users_are_dropped(self):
+        self.batcher.add(self.bob.id + 100, submissions=1)
+
+        self.assertEqual(self.batcher.flush(), 0)
+        self.assertEqual(self.batcher._pending, {})
+
+
+class UserProvisionerTests(TestCase):
+
+    def provision(self, lines, data_format='ndjson'):
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            return UserProvisioner(batch_size=2, pool=pool).provision(read_rows(lines, data_format))
+
+    def test_unparseable_and_non_object_rows_fail_alone(self):
+        report = self.provision([
+            '{"username": "alice", "password": "secret"}\n',
+            '[1, 2]\n',
+            '\n',
+            '{"username": \n',
+            '"bob"\n',
+            '{"username": "carol", "password": "secret"}\n',
+        ])
+
+        self.assertEqual(report['created'], 2)
+        self.assertEqual([failure['row'] for failure in report['failed']], [2, 3, 4])
+        self.assertEqual(report['failed'][0], {'row': 2, 'username': None, 'error': 'Row must be an object'})
+        self.assertTrue(report['failed'][1]['error'].startswith('Invalid JSON'))
+        self.assertEqual(set(User.objects.values_list('username', flat=True)), {'alice', 'carol'})
+
+    def test_duplicates_are_reported_per_row(self):
+        User.objects.create_user(username='alice', password='secret')
+
+        report = self.provision([
+            '[{"username": "alice", "password": "x"},'
+            ' {"username": "bob", "password": "x", "email": "bob@example.com"},'
+            ' {"username": "bobby", "password": "x", "email": "bob@example.com"},'
+            ' {"username": "eve", "password": "x", "user_type": "root"}]'
+        ], data_format='json')
+
+        self.assertEqual(report['created'], 1)
+        self.assertEqual([(failure['row'], failure['error']) for failure in report['failed']], [
+            (1, 'Username already exists'),
+            (3, 'Email already exists'),
+            (4, 'Invalid user_type: root'),
+        ])
@@ -0,0 +1,132 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core import signing
+
+from .models import User
+
+
+ACCESS_SALT = 'users.tokens.access'
+REFRESH_SALT = 'users.tokens.refresh'
+
+
+class InvalidToken(Exception):
+    pass
+
+
+class ExpiredToken(InvalidToken):
+    pass
+
+
+def _password_fingerprint(user):
+    """
+    Short digest of the stored password hash. Embedded in refresh tokens so
+    that changing the password revokes them.
+    """
+    return hashlib.sha256(user.password.encode('utf-8')).hexdigest()[:16]
+
+
+def issue_tokens(user):
+    """
+    Issue a short-lived access token and a longer-lived refresh token.
+    Both are signed with SECRET_KEY and carry their own expiry, so
+    validating them needs no database or token table.
+    """
+    access_token = signing.dumps({'uid': user.id}, salt=ACCESS_SALT, compress=True)
+    refresh_token = signing.dumps(
+        {'uid': user.id, 'pwd': _password_fingerprint(user)},
+        salt=REFRESH_SALT,
+        compress=True
+    )
+    return {
+        'access_token': access_token,
+        'refresh_token': refresh_token,
+        'token_type': 'Bearer',
+        'expires_in': settings.ACCESS_TOKEN_LIFETIME
+    }
+
+
+def validate_access_token(token):
+    """Return the user ID from a valid, unexpired access token."""
+    try:
+        payload = signing.loads(token, salt=ACCESS_SALT, max_age=settings.ACCESS_TOKEN_LIFETIME)
+    except signing.SignatureExpired:
+        raise ExpiredToken('Access token expired')
+    except signing.BadSignature:
+        raise InvalidToken('Invalid access token')
+    return payload['uid']
+
+
+def refresh_tokens(refresh_token):
+    """
+    Exchange a refresh token for a new token pair. This is the only token
+    operation that reads the database: it checks the user is still active
+    and the password hasn't changed since the token was issued.
+    """
+    try:
+        payload = signing.loads(refresh_token, salt=REFRESH_SALT, max_age=settings.REFRESH_TOKEN_LIFETIME)
+    except signing.SignatureExpired:
+        raise InvalidToken('Refresh token expired')
+    except signing.BadSignature:
+        raise InvalidToken('Invalid refresh token')
+
+    try:
+        user = User.objects.get(id=payload['uid'], is_active=True)
+    except User.DoesNotExist:
+        raise InvalidToken('User not found')
+    if _password_fingerprint(user) != payload.get('pwd'):
+        raise InvalidToken('Refresh token revoked')
+
+    user_cache.put(user)
+    return user, issue_tokens(user)
+
+
+class UserCache:
+    """
+    In-process LRU of authenticated users, so validating an access token is
+    an HMAC check plus a dictionary lookup. Entries expire after ``ttl``
+    seconds and are evicted when the user is saved or deleted.
+    """
+
+    def __init__(self, max_size=10000, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def put(self, user):
+        with self._lock:
+            self._entries[user.id] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def get_or_load(self, user_id):
+        user = self.get(user_id)
+        if user is None:
+            user = User.objects.filter(id=user_id, is_active=True).first()
+            if user is not None:
+                self.put(user)
+        return user
+
+
+user_cache = UserCache(max_size=settings.TOKEN_USER_CACHE_SIZE, ttl=settings.TOKEN_USER_CACHE_TTL)
@@ -3,4 +3,7 @@ from . import views
 
 urlpatterns = [
     path('login/', views.LoginAPIView.as_view(), name='login'),
+    path('token/refresh/', views.TokenRefreshAPIView.as_view(), name='token-refresh'),
+    path('list/', views.UserListAPIView.as_view(), name='user-list'),
+    path('bulk/', views.UserBulkProvisionAPIView.as_view(), name='user-bulk'),
 ]
\ No newline at end of file
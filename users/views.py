@@ -2,8 +2,14 @@ from .serializers import UserSerializer
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from rest_framework.views import APIView
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_date, parse_datetime
 from users.models import User 
+from .tokens import InvalidToken, issue_tokens, refresh_tokens
+from .permissions import IsAdminUserType
+from .provisioning import UserProvisioner, read_rows, shared_hashing_pool
 import json
 
 class UserAPIView(APIView):
@@ -107,7 +113,8 @@ class LoginAPIView(APIView):
                         'email': user.email,
                         'first_name': user.first_name,
                         'last_name': user.last_name,
-                        'role': user.user_type
+                        'role': user.user_type,
+                        **issue_tokens(user)
                     }
                 }, status=200)
             else:
@@ -128,21 +135,185 @@ class LoginAPIView(APIView):
                 'error': 'Internal server error'
             }, status=500)
 
+@method_decorator(csrf_exempt, name='dispatch')
+class TokenRefreshAPIView(APIView):
+    """
+    Exchange a refresh token for a new access/refresh token pair.
+    """
+    
+    def post(self, request):
+        refresh_token = request.data.get('refresh_token')
+        if not refresh_token:
+            return JsonResponse({
+                'success': False,
+                'error': 'Refresh token required'
+            }, status=400)
+        
+        try:
+            user, tokens = refresh_tokens(refresh_token)
+        except InvalidToken as e:
+            return JsonResponse({
+                'success': False,
+                'error': str(e)
+            }, status=401)
+        
+        return JsonResponse({
+            'success': True,
+            'data': {
+                'user_id': user.id,
+                **tokens
+            }
+        }, status=200)
+
 class UserListAPIView(APIView):
     """
     Handle listing all users (for admin purposes).
+    Pages with a keyset cursor on the user ID, or streams every matching
+    user as NDJSON with ``?export=ndjson``.
     """
     
+    permission_classes = [IsAdminUserType]
+    
+    DEFAULT_LIMIT = 100
+    MAX_LIMIT = 1000
+    EXPORT_CHUNK_SIZE = 2000
+    FIELDS = tuple(UserSerializer.Meta.fields)
+    
     def get(self, request):
         """
-        Retrieve all users.
+        Retrieve users.
+        Query params: fields (comma-separated), user_type, created_after,
+        created_before, after (user ID cursor), limit, export=ndjson
         """
+        params = request.query_params
+        
+        fields = self._parse_fields(params.get('fields'))
+        if fields is None:
+            return JsonResponse({
+                'error': f'Invalid fields; choose from: {", ".join(self.FIELDS)}'
+            }, status=400)
+        
+        try:
+            users = self._filter_users(params)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        
+        if params.get('export') == 'ndjson':
+            response = StreamingHttpResponse(
+                self._stream_ndjson(users.values(*fields)),
+                content_type='application/x-ndjson'
+            )
+            response['Content-Disposition'] = 'attachment; filename="users.ndjson"'
+            return response
+        
         try:
-            users = User.objects.all()
-            serializer = UserSerializer(users, many=True)
+            limit = max(1, min(int(params.get('limit', self.DEFAULT_LIMIT)), self.MAX_LIMIT))
+            after = int(params.get('after', 0))
+        except ValueError:
+            return JsonResponse({'error': 'limit and after must be integers'}, status=400)
+        if after < 0:
+            return JsonResponse({'error': 'after must not be negative'}, status=400)
+        
+        try:
+            rows = list(users.filter(id__gt=after).values(*fields)[:limit + 1])
+            has_more = len(rows) > limit
+            rows = rows[:limit]
             return JsonResponse({
                 'success': True,
-                'data': serializer.data
+                'data': rows,
+                'next_after': rows[-1]['id'] if has_more else None
             }, status=200)
         except Exception as e:
             return JsonResponse({'error': f'Failed to retrieve users: {str(e)}'}, status=500)
+    
+    def _parse_fields(self, fields_param):
+        """Requested fields, always including ``id`` for the cursor; None if invalid."""
+        if not fields_param:
+            return self.FIELDS
+        fields = [field.strip() for field in fields_param.split(',') if field.strip()]
+        if any(field not in self.FIELDS for field in fields):
+            return None
+        if 'id' not in fields:
+            fields.insert(0, 'id')
+        return tuple(fields)
+    
+    def _filter_users(self, params):
+        users = User.objects.order_by('id')
+        
+        user_type = params.get('user_type')
+        if user_type:
+            if user_type not in dict(User.USER_TYPES):
+                raise ValueError(f'Invalid user_type: {user_type}')
+            users = users.filter(user_type=user_type)
+        
+        created_after = self._parse_date(params.get('created_after'), 'created_after')
+        if created_after:
+            users = users.filter(created_at__gte=created_after)
+        created_before = self._parse_date(params.get('created_before'), 'created_before')
+        if created_before:
+            users = users.filter(created_at__lt=created_before)
+        
+        return users
+    
+    def _parse_date(self, value, name):
+        if not value:
+            return None
+        parsed = parse_datetime(value) or parse_date(value)
+        if parsed is None:
+            raise ValueError(f'{name} must be an ISO date or datetime')
+        return parsed
+    
+    def _stream_ndjson(self, rows):
+        """Yield one JSON line per user; memory stays flat regardless of user count."""
+        for row in rows.iterator(chunk_size=self.EXPORT_CHUNK_SIZE):
+            yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+class UserBulkProvisionAPIView(APIView):
+    """
+    Create many users from one upload (admin only).
+    The body is CSV with a header row (``text/csv``), NDJSON
+    (``application/x-ndjson``) or a JSON array (``application/json``) of
+    objects with username, password and optional email, first_name,
+    last_name and user_type. CSV and NDJSON bodies are read as a stream.
+    """
+    
+    permission_classes = [IsAdminUserType]
+    
+    FORMATS = {
+        'text/csv': 'csv',
+        'application/x-ndjson': 'ndjson',
+        'application/json': 'json',
+    }
+    BATCH_SIZE = 500
+    
+    def post(self, request):
+        """
+        Provision users; rows that fail are listed with their row number.
+        """
+        data_format = self.FORMATS.get(request.content_type.split(';')[0].strip())
+        if data_format is None:
+            return JsonResponse({
+                'error': f'Unsupported content type; use one of: {", ".join(self.FORMATS)}'
+            }, status=415)
+        
+        # Read the raw request body line by line instead of request.data
+        stream = request.stream
+        raw_lines = iter(stream.readline, b'') if stream is not None else ()
+        lines = (line.decode('utf-8') for line in raw_lines)
+        try:
+            provisioner = UserProvisioner(
+                batch_size=self.BATCH_SIZE,
+                workers=settings.USER_PROVISION_WORKERS,
+                pool=shared_hashing_pool()
+            )
+            report = provisioner.provision(read_rows(lines, data_format))
+        except (ValueError, UnicodeDecodeError) as e:
+            return JsonResponse({'error': f'Invalid input: {str(e)}'}, status=400)
+        except Exception as e:
+            return JsonResponse({'error': f'Failed to provision users: {str(e)}'}, status=500)
+        
+        return JsonResponse({
+            'success': True,
+            'data': report
+        }, status=200)
@@ -0,0 +1,13 @@
+import hashlib
+
+
+def content_hash(content):
+    """
+    SHA-256 hex digest of stored text content, used to detect which S3
+    objects actually changed before re-uploading them.
+    """
+    if content is None:
+        content = ''
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.sha256(content).hexdigest()
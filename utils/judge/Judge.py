@@ -3,6 +3,8 @@ import ast
 import re
 import inspect
 from typing import Dict, List, Tuple, Optional, Any
+from utils.hashing import content_hash
+from .analysis import AnalysisCache, find_solution_signature, parse_solution_signature, type_category
 
 class Judge:
     
@@ -63,6 +65,33 @@ class Judge:
         }
     }
     
+    # Mappings compiled once; they are only run against the located signature
+    COMPILED_MAPPINGS = {
+        language: [
+            (re.compile(pattern, re.MULTILINE | re.IGNORECASE), pattern, problem_type)
+            for pattern, problem_type in patterns.items()
+        ]
+        for language, patterns in PROBLEM_TYPE_MAPPINGS.items()
+    }
+    
+    # Analysis results memoized by content hash, shared by all Judge instances
+    _language_analysis_cache = AnalysisCache(max_size=4096)
+    _starter_code_analysis_cache = AnalysisCache(max_size=1024)
+    
+    EXECUTE_URL = 'http://localhost:2000/api/v2/execute'
+    
+    # Executor limits used when the caller gives none
+    DEFAULT_COMPILE_TIMEOUT_MS = 10000
+    DEFAULT_RUN_TIMEOUT_MS = 3000
+    
+    # Test input transports: command-line arguments, or stdin read by the
+    # fast-reader wrappers in wrappers/<language>/stdin/
+    TRANSPORT_ARGV = 'argv'
+    TRANSPORT_STDIN = 'stdin'
+    # Inputs larger than this go through stdin: argv has OS length limits
+    # and the argv wrappers split and parse strings slowly
+    ARGV_MAX_CHARS = 4096
+    
     # Parameter type hints for advanced analysis
     TYPE_HINTS = {
         'python': {
@@ -85,37 +114,106 @@ class Judge:
         }
     }
     
-    def load_template(self, language, problem_type):
+    def load_template(self, language, problem_type, transport=TRANSPORT_ARGV):
         """
-        Load the template code for the specified language and type.
+        Load the template code for the specified language, type and input transport.
         """
+        folder = f'utils/judge/wrappers/{language}'
+        if transport == self.TRANSPORT_STDIN:
+            folder = f'{folder}/stdin'
         try:
-            with open(f'utils/judge/wrappers/{language}/{problem_type}.txt', 'r', encoding='utf-8') as file:
+            with open(f'{folder}/{problem_type}.txt', 'r', encoding='utf-8') as file:
                 return file.read()
         except FileNotFoundError:
-            raise Exception(f"Template for {language} and type {problem_type} not found.")
+            raise Exception(f"Template for {language} and type {problem_type} ({transport}) not found.")
         except Exception as e:
             raise Exception(f"An error occurred while loading the template: {str(e)}")
     
-    def inject_template(self, user_code, language, problem_type):
+    def inject_template(self, user_code, language, problem_type, transport=TRANSPORT_ARGV):
         """
         Inject the user code into the template.
         """
-        template_code = self.load_template(language, problem_type)
+        template_code = self.load_template(language, problem_type, transport)
         final_code = template_code.replace("<USER_CODE>", user_code)
         return final_code
     
-    def execute_code(self, user_code, language, problem_type, args=[]):
+    def choose_transport(self, args):
+        """
+        Pass small inputs as arguments and large ones through stdin.
+        """
+        size = sum(len(arg) for arg in args)
+        return self.TRANSPORT_STDIN if size > self.ARGV_MAX_CHARS else self.TRANSPORT_ARGV
+    
+    def encode_stdin(self, problem_type, args):
+        """
+        Encode test input arguments for the stdin wrappers.
+        Arrays are length-prefixed (count, then space-separated elements) so
+        readers can preallocate; empty elements, as left by a trailing comma,
+        are dropped so the count matches what the readers parse. Integers go
+        on one line; a string is the first line.
+        """
+        if problem_type == 'function_only_array':
+            values = [value.strip() for value in args[0].split(',')] if args else []
+            values = [value for value in values if value]
+            return f"{len(values)}\n{' '.join(values)}\n"
+        if problem_type == 'function_only_string':
+            return f"{args[0] if args else ''}\n"
+        return ' '.join(args) + '\n'
+    
+    def execute_code(self, user_code, language, problem_type, args=[], transport=None,
+                     run_timeout_ms=None, memory_limit_bytes=None, compile_timeout_ms=None):
         """
         Execute user code using the judge service.
+        The input transport is chosen from the input size unless given.
+        Memory is unlimited (-1) unless ``memory_limit_bytes`` is given.
+        """
+        payload = self.build_execution_payload(
+            user_code, language, problem_type, args, transport,
+            run_timeout_ms, memory_limit_bytes, compile_timeout_ms
+        )
         
+        try:
+            response = requests.post(self.EXECUTE_URL, json=payload, timeout=30)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Judge service error: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Unexpected error: {str(e)}")
+    
+    async def execute_code_async(self, client, user_code, language, problem_type, args=[], transport=None,
+                                 run_timeout_ms=None, memory_limit_bytes=None, compile_timeout_ms=None):
+        """
+        ``execute_code`` on an async HTTP client (``httpx.AsyncClient``),
+        for async views: the request does not hold a thread while it waits.
         """
-        url = 'http://localhost:2000/api/v2/execute'
+        payload = self.build_execution_payload(
+            user_code, language, problem_type, args, transport,
+            run_timeout_ms, memory_limit_bytes, compile_timeout_ms
+        )
         
+        try:
+            response = await client.post(self.EXECUTE_URL, json=payload, timeout=30)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            raise Exception(f"Judge service error: {str(e)}")
+    
+    def build_execution_payload(self, user_code, language, problem_type, args=[], transport=None,
+                                run_timeout_ms=None, memory_limit_bytes=None, compile_timeout_ms=None):
+        """The executor request body for one run of the wrapped user code."""
         if language not in self.VERSIONS:
             raise ValueError(f"Unsupported language: {language}")
         
-        wrapper_code = self.inject_template(user_code, language, problem_type)
+        if transport is None:
+            transport = self.choose_transport(args)
+        
+        wrapper_code = self.inject_template(user_code, language, problem_type, transport)
+        
+        stdin = ""
+        if transport == self.TRANSPORT_STDIN:
+            stdin = self.encode_stdin(problem_type, args)
+            args = []
         
         files = []
         
@@ -133,22 +231,65 @@ class Judge:
             "language": language,
             "version": self.VERSIONS[language],
             "files": files,
-            "stdin": "",
+            "stdin": stdin,
             "args": args,
-            "compile_timeout": 10000,
-            "run_timeout": 3000,
+            "compile_timeout": compile_timeout_ms or self.DEFAULT_COMPILE_TIMEOUT_MS,
+            "run_timeout": run_timeout_ms or self.DEFAULT_RUN_TIMEOUT_MS,
             "compile_memory_limit": -1,
-            "run_memory_limit": -1
+            "run_memory_limit": memory_limit_bytes or -1
         }
+        return payload
+    
+    def extract_metrics(self, stage):
+        """
+        Resource usage of one executor stage (``run`` or ``compile``):
+        wall and CPU time in milliseconds, peak memory in bytes, exit code
+        and signal. Figures the executor did not report are None.
+        """
+        if not stage:
+            return None
         
-        try:
-            response = requests.post(url, json=payload, timeout=30)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Judge service error: {str(e)}")
-        except Exception as e:
-            raise Exception(f"Unexpected error: {str(e)}")
+        def as_int(value):
+            return int(round(value)) if isinstance(value, (int, float)) else None
+        
+        return {
+            'wall_time_ms': as_int(stage.get('wall_time')),
+            'cpu_time_ms': as_int(stage.get('cpu_time')),
+            'memory_bytes': as_int(stage.get('memory')),
+            'exit_code': stage.get('code'),
+            'signal': stage.get('signal')
+        }
+    
+    def classify_result(self, result, run_timeout_ms=None, memory_limit_bytes=None):
+        """
+        Map the executor's status, signal and usage figures to a verdict for
+        an execution that did not finish normally: ``compilation_error``,
+        ``time_limit_exceeded``, ``memory_limit_exceeded`` or
+        ``runtime_error``. Returns None when the program ran to completion.
+        """
+        compile_stage = result.get('compile')
+        if compile_stage and (compile_stage.get('code') not in (0, None) or compile_stage.get('signal')):
+            return 'compilation_error'
+        
+        run = result.get('run') or {}
+        status = run.get('status')
+        signal = run.get('signal')
+        wall_time = run.get('wall_time')
+        memory = run.get('memory')
+        
+        if status == 'TO':
+            return 'time_limit_exceeded'
+        if signal == 'SIGKILL' and run_timeout_ms and wall_time is not None and wall_time >= run_timeout_ms:
+            return 'time_limit_exceeded'
+        if memory_limit_bytes and memory is not None and memory >= memory_limit_bytes:
+            return 'memory_limit_exceeded'
+        if signal == 'SIGKILL' and wall_time is None and memory is None:
+            # Executors without usage figures only report the kill, which
+            # they issue when the run timeout expires
+            return 'time_limit_exceeded'
+        if signal or status in ('RE', 'SG') or run.get('code') not in (0, None):
+            return 'runtime_error'
+        return None
     
     def analyze_starter_code(self, starter_code: Dict[str, str]) -> Dict[str, Any]:
         """
@@ -161,6 +302,19 @@ class Judge:
             Dictionary containing analysis results including detected problem type,
             confidence scores, and detailed analysis for each language
         """
+        key = tuple(sorted(
+            (language, content_hash(code))
+            for language, code in starter_code.items()
+            if code and code.strip()
+        ))
+        return self._starter_code_analysis_cache.get_or_compute(
+            key, lambda: self._analyze_starter_code(starter_code)
+        )
+    
+    def _analyze_starter_code(self, starter_code: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Uncached analysis behind analyze_starter_code.
+        """
         analysis_results = {}
         problem_type_votes = {}
         
@@ -195,9 +349,11 @@ class Judge:
                 best_score = weighted_score
                 best_type = problem_type
         
+        detected_count = len([r for r in analysis_results.values() if r['detected_type']])
+        
         return {
             'detected_problem_type': best_type,
-            'confidence': best_score / len([r for r in analysis_results.values() if r['detected_type']]) if analysis_results else 0,
+            'confidence': best_score / detected_count if detected_count else 0,
             'language_analysis': analysis_results,
             'problem_type_votes': problem_type_votes,
             'total_languages_analyzed': len(analysis_results)
@@ -222,10 +378,31 @@ class Judge:
                 'error': f'Language {language} not supported for analysis'
             }
         
+        return self._language_analysis_cache.get_or_compute(
+            (language, content_hash(code)),
+            lambda: self._analyze_supported_language(language, code)
+        )
+    
+    def _analyze_supported_language(self, language: str, code: str) -> Dict[str, Any]:
+        """
+        Uncached analysis behind _analyze_language_code.
+        """
         # Use both regex pattern matching and AST parsing
         regex_result = self._analyze_with_regex(language, code)
         ast_result = self._analyze_with_ast(language, code)
-        
+
+        # A parsed Java/C++ signature with unsupported declared types (e.g.
+        # vector<string>) is final: the looser name patterns may not override it
+        if language in ('java', 'cpp') and 'parameter_analysis' in ast_result and not ast_result['detected_type']:
+            return {
+                'detected_type': None,
+                'confidence': 0,
+                'regex_analysis': regex_result,
+                'ast_analysis': ast_result,
+                'agreement': None,
+                'error': ast_result['error']
+            }
+
         # Combine results with weighted confidence
         combined_result = self._combine_analysis_results(regex_result, ast_result)
         
@@ -234,12 +411,23 @@ class Judge:
     def _analyze_with_regex(self, language: str, code: str) -> Dict[str, Any]:
         """
         Analyze code using regex pattern matching.
+        The solution declaration is located in one linear scan and the
+        precompiled patterns run only against that short text, so their
+        backtracking cost does not grow with the size of the code.
         """
-        patterns = self.PROBLEM_TYPE_MAPPINGS[language]
+        signature = find_solution_signature(language, code)
+        if signature is None:
+            return {
+                'method': 'regex',
+                'detected_type': None,
+                'confidence': 0,
+                'matches': []
+            }
+        
         matches = []
         
-        for pattern, problem_type in patterns.items():
-            if re.search(pattern, code, re.MULTILINE | re.IGNORECASE):
+        for compiled, pattern, problem_type in self.COMPILED_MAPPINGS[language]:
+            if compiled.search(signature['text']):
                 matches.append({
                     'pattern': pattern,
                     'problem_type': problem_type,
@@ -266,8 +454,12 @@ class Judge:
     
     def _analyze_with_ast(self, language: str, code: str) -> Dict[str, Any]:
         """
-        Analyze code using AST parsing (primarily for Python).
+        Analyze code using AST parsing for Python and a signature
+        tokenizer/parser for Java and C++.
         """
+        if language in ('java', 'cpp'):
+            return self._analyze_with_parser(language, code)
+        
         if language != 'python':
             return {
                 'method': 'ast',
@@ -304,6 +496,7 @@ class Judge:
                 'confidence': 0.9 if problem_type else 0,
                 'parameter_analysis': param_analysis,
                 'function_name': func.name,
+                'return_type': ast.unparse(func.returns) if func.returns is not None else None,
                 'parameter_count': len(func.args.args)
             }
             
@@ -322,6 +515,87 @@ class Judge:
                 'error': f'AST parsing error: {str(e)}'
             }
     
+    def _analyze_with_parser(self, language: str, code: str) -> Dict[str, Any]:
+        """
+        Analyze Java or C++ code from its parsed solution signature, using the
+        declared parameter types rather than parameter names.
+        """
+        try:
+            signature = parse_solution_signature(language, code)
+        except Exception as e:
+            return {
+                'method': 'ast',
+                'detected_type': None,
+                'confidence': 0,
+                'error': f'Signature parsing error: {str(e)}'
+            }
+        
+        if signature is None:
+            return {
+                'method': 'ast',
+                'detected_type': None,
+                'confidence': 0,
+                'error': 'No solution function found'
+            }
+        
+        params = [
+            {
+                'name': parameter['name'],
+                'type_hint': parameter['type'],
+                'inferred_type': type_category(parameter['type'])
+            }
+            for parameter in signature['parameters']
+        ]
+        param_analysis = {
+            'parameters': params,
+            'parameter_count': len(params),
+            'has_type_hints': True
+        }
+        
+        unsupported = [p['type_hint'] for p in params if p['inferred_type'] not in ('int', 'string', 'array')]
+        if unsupported:
+            return {
+                'method': 'ast',
+                'detected_type': None,
+                'confidence': 0,
+                'parameter_analysis': param_analysis,
+                'function_name': signature['function_name'],
+                'return_type': signature['return_type'],
+                'parameter_count': len(params),
+                'error': f'Unsupported parameter types: {", ".join(unsupported)}'
+            }
+        
+        problem_type = self._problem_type_from_declared_types(params)
+        
+        result = {
+            'method': 'ast',
+            'detected_type': problem_type,
+            'confidence': 0.9 if problem_type else 0,
+            'parameter_analysis': param_analysis,
+            'function_name': signature['function_name'],
+            'return_type': signature['return_type'],
+            'parameter_count': len(params)
+        }
+        if problem_type is None:
+            result['error'] = 'Parameter types do not match a supported problem type: ' + \
+                ', '.join(p['type_hint'] for p in params)
+        return result
+    
+    def _problem_type_from_declared_types(self, params: List[Dict[str, Any]]) -> Optional[str]:
+        """
+        Problem type for parameters with declared types. Unlike name-based
+        inference there is no fallback: only all-int parameters, or a single
+        array or string parameter, match a wrapper; mixed categories do not.
+        """
+        categories = [p['inferred_type'] for p in params]
+        if categories and all(category == 'int' for category in categories):
+            return 'function_only_int'
+        if categories == ['array']:
+            return 'function_only_array'
+        if categories == ['string']:
+            return 'function_only_string'
+        return None
+    
     def _analyze_function_parameters(self, func_node: ast.FunctionDef) -> Dict[str, Any]:
         """
         Analyze function parameters using AST.
@@ -457,18 +731,21 @@ class Judge:
                 'agreement': None
             }
     
-    def get_recommended_problem_type(self, starter_code: Dict[str, str], fallback: str = 'function_only_int') -> str:
+    def get_recommended_problem_type(self, starter_code: Dict[str, str], fallback: str = 'function_only_int',
+                                     analysis: Optional[Dict[str, Any]] = None) -> str:
         """
         Get recommended problem type based on starter code analysis.
         
         Args:
             starter_code: Dictionary mapping language names to starter code
             fallback: Default problem type if analysis fails
+            analysis: Result of analyze_starter_code for this code, if already computed
             
         Returns:
             Recommended problem type string
         """
-        analysis = self.analyze_starter_code(starter_code)
+        if analysis is None:
+            analysis = self.analyze_starter_code(starter_code)
         
         # Return detected type if confidence is high enough
         if analysis['detected_problem_type'] and analysis['confidence'] > 0.6:
@@ -476,18 +753,21 @@ class Judge:
         
         return fallback
     
-    def validate_problem_type_compatibility(self, starter_code: Dict[str, str], problem_type: str) -> Dict[str, Any]:
+    def validate_problem_type_compatibility(self, starter_code: Dict[str, str], problem_type: str,
+                                            analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Validate if the given problem type is compatible with the starter code.
         
         Args:
             starter_code: Dictionary mapping language names to starter code
             problem_type: Problem type to validate
+            analysis: Result of analyze_starter_code for this code, if already computed
             
         Returns:
             Validation results including compatibility status and suggestions
         """
-        analysis = self.analyze_starter_code(starter_code)
+        if analysis is None:
+            analysis = self.analyze_starter_code(starter_code)
         
         is_compatible = analysis['detected_problem_type'] == problem_type
         confidence = analysis['confidence']
@@ -539,17 +819,20 @@ class Judge:
             }
         ]
     
-    def analyze_and_suggest_improvements(self, starter_code: Dict[str, str]) -> Dict[str, Any]:
+    def analyze_and_suggest_improvements(self, starter_code: Dict[str, str],
+                                         analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Analyze starter code and suggest improvements for better type detection.
         
         Args:
             starter_code: Dictionary mapping language names to starter code
+            analysis: Result of analyze_starter_code for this code, if already computed
             
         Returns:
             Analysis results with improvement suggestions
         """
-        analysis = self.analyze_starter_code(starter_code)
+        if analysis is None:
+            analysis = self.analyze_starter_code(starter_code)
         suggestions = []
         
         # Check confidence levels
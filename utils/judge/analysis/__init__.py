@@ -0,0 +1,5 @@
+from .cache import AnalysisCache
+from .clike import parse_solution_signature, type_category
+from .signature import find_solution_signature
+
+__all__ = ['AnalysisCache', 'find_solution_signature', 'parse_solution_signature', 'type_category']
@@ -0,0 +1,52 @@
+from ..Judge import Judge
+
+
+# Suggestion severities that make a question worth a report entry
+REPORTED_SEVERITIES = ('error', 'warning')
+
+
+def audit_starter_code(item):
+    """
+    Audit one question's starter code. ``item`` is a
+    ``(question_id, stored_problem_type, starter_code)`` tuple. Kept free of
+    Django imports so it can run in pool worker processes.
+    """
+    question_id, stored_type, starter_code = item
+    result = Judge().analyze_and_suggest_improvements(starter_code)
+    detected_type = result['detected_problem_type']
+
+    issues = [
+        suggestion for suggestion in result['suggestions']
+        if suggestion['severity'] in REPORTED_SEVERITIES
+    ]
+    if stored_type and detected_type and stored_type != detected_type:
+        issues.append({
+            'type': 'stored_type_mismatch',
+            'message': f"Stored problem type '{stored_type}' differs from detected '{detected_type}'",
+            'severity': 'error'
+        })
+
+    return {
+        'question_id': question_id,
+        'detected_type': detected_type,
+        'stored_type': stored_type,
+        'confidence': round(result['confidence'], 4),
+        'quality': result['overall_quality'],
+        'issues': issues
+    }
+
+
+def unreadable_result(question_id, stored_type, error):
+    """Report entry for a question whose starter code could not be read."""
+    return {
+        'question_id': question_id,
+        'detected_type': None,
+        'stored_type': stored_type,
+        'confidence': None,
+        'quality': None,
+        'issues': [{
+            'type': 'starter_code_unreadable',
+            'message': f"Starter code could not be read: {error}",
+            'severity': 'error'
+        }]
+    }
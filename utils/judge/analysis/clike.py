@@ -0,0 +1,163 @@
+import re
+
+from .signature import find_solution_signature
+
+
+TOKEN_RE = re.compile(
+    r'\s+|//[^\n]*|/\*.*?\*/|::|&&|\.\.\.|[A-Za-z_]\w*|\d+|\S',
+    re.DOTALL
+)
+
+# Words that qualify a declaration or parameter without changing its type
+MODIFIERS = {
+    'public', 'private', 'protected', 'static', 'final', 'inline', 'virtual',
+    'constexpr', 'synchronized', 'abstract', 'const', 'volatile', 'explicit',
+    'struct', 'typename', 'register', 'mutable',
+}
+
+INT_TYPES = {
+    'int', 'long', 'short', 'long long', 'long int', 'long long int',
+    'unsigned', 'unsigned int', 'unsigned long', 'unsigned long long',
+    'Integer', 'Long', 'Short', 'size_t', 'int32_t', 'int64_t', 'uint32_t', 'uint64_t',
+}
+STRING_TYPES = {'string', 'String', 'char*', 'CharSequence'}
+CONTAINER_RE = re.compile(r'^(?:vector|List|ArrayList|LinkedList|deque|array|Collection)<(.+?)(?:,\s*\d+)?>$')
+
+
+def _tokens(text):
+    """Significant tokens of ``text``; whitespace and comments are dropped."""
+    return [
+        token for token in TOKEN_RE.findall(text)
+        if not token.isspace() and not token.startswith(('//', '/*'))
+    ]
+
+
+def _is_word(token):
+    return token[0].isalpha() or token[0] == '_'
+
+
+def _join_type(tokens):
+    """Render type tokens canonically: ``std::vector < long long > &`` -> ``vector<long long>``."""
+    parts = []
+    previous = None
+    for token in tokens:
+        if token in MODIFIERS or token in ('&', '&&'):
+            continue
+        if token == 'std' or (token == '::' and previous == 'std'):
+            previous = token
+            continue
+        if parts and previous is not None and _is_word(token) and _is_word(previous):
+            parts.append(' ')
+        elif token == '...':
+            token = '[]'
+        parts.append(token)
+        previous = token
+    return ''.join(parts)
+
+
+def _skip_annotations(tokens):
+    """Drop Java annotations such as ``@Override`` or ``@NonNull``."""
+    kept = []
+    index = 0
+    while index < len(tokens):
+        if tokens[index] == '@' and index + 1 < len(tokens):
+            index += 2
+            if index < len(tokens) and tokens[index] == '(':
+                depth = 0
+                while index < len(tokens):
+                    depth += {'(': 1, ')': -1}.get(tokens[index], 0)
+                    index += 1
+                    if depth == 0:
+                        break
+            continue
+        kept.append(tokens[index])
+        index += 1
+    return kept
+
+
+def _split_parameters(tokens):
+    """Split parameter tokens on commas outside ``<>``, ``()``, ``[]`` and ``{}``."""
+    parameters = [[]]
+    depth = 0
+    for token in tokens:
+        if token in '<([{' and len(token) == 1:
+            depth += 1
+        elif token in '>)]}' and len(token) == 1:
+            depth -= 1
+        elif token == ',' and depth == 0:
+            parameters.append([])
+            continue
+        parameters[-1].append(token)
+    return [parameter for parameter in parameters if parameter]
+
+
+def _parse_parameter(tokens):
+    tokens = _skip_annotations(tokens)
+    if '=' in tokens:
+        tokens = tokens[:tokens.index('=')]  # C++ default argument
+    suffix = []
+    while len(tokens) >= 2 and tokens[-2:] == ['[', ']']:
+        suffix = ['[', ']'] + suffix  # C-style ``int arr[]``
+        tokens = tokens[:-2]
+    if len(tokens) >= 2 and _is_word(tokens[-1]) and tokens[-1] not in MODIFIERS:
+        name, type_tokens = tokens[-1], tokens[:-1]
+    else:
+        name, type_tokens = None, tokens  # Unnamed C++ parameter
+    return {'name': name, 'type': _join_type(type_tokens + suffix)}
+
+
+def type_category(type_name):
+    """Classify a canonical type as ``int``, ``string``, ``array``, ``string_array`` or ``unknown``."""
+    if not type_name:
+        return 'unknown'
+    if type_name in INT_TYPES:
+        return 'int'
+    if type_name in STRING_TYPES:
+        return 'string'
+
+    element = None
+    if type_name.endswith('[]'):
+        element = type_name[:-2]
+    elif type_name.endswith('*'):
+        element = type_name[:-1]
+    else:
+        match = CONTAINER_RE.match(type_name)
+        if match:
+            element = match.group(1)
+    if element is not None:
+        element_category = type_category(element)
+        if element_category == 'int':
+            return 'array'
+        if element_category == 'string':
+            return 'string_array'
+    return 'unknown'
+
+
+def parse_solution_signature(language, code):
+    """
+    Parse the ``solution`` declaration of Java or C++ code.
+
+    The declaration is located with :func:`find_solution_signature` and
+    tokenized once, so the cost is linear in the code size. Handles generics,
+    ``const``/reference qualifiers, multi-word types like ``long long``,
+    C-style array parameters, varargs, annotations, default arguments and
+    signatures split over several lines. Returns ``{'function_name',
+    'return_type', 'parameters': [{'name', 'type'}]}``, or None when there is
+    no declaration.
+    """
+    signature = find_solution_signature(language, code)
+    if signature is None:
+        return None
+
+    prefix_tokens = _skip_annotations(_tokens(signature['prefix']))
+    if 'template' in prefix_tokens:
+        prefix_tokens = prefix_tokens[prefix_tokens.index('>', prefix_tokens.index('template')) + 1:]
+
+    return {
+        'function_name': 'solution',
+        'return_type': _join_type(prefix_tokens),
+        'parameters': [
+            _parse_parameter(parameter)
+            for parameter in _split_parameters(_tokens(signature['parameters']))
+        ]
+    }
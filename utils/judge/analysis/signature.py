@@ -0,0 +1,92 @@
+import re
+
+
+SOLUTION_RE = re.compile(r'\bsolution\s*\(')
+PAREN_RE = re.compile(r'[()]')
+
+# What ends the text preceding a declaration's modifiers and return type
+BOUNDARY_RES = {
+    'python': re.compile(r'\n'),
+    'java': re.compile(r'[;{}]'),
+    'cpp': re.compile(r'[;{}]'),
+}
+# Longest run of modifiers and return type looked at before ``solution``
+MAX_PREFIX_LENGTH = 200
+# Lines between a boundary and a declaration that aren't part of it
+NOISE_LINE_RE = re.compile(r'\s*(?:#|//|@)[^\n]*\n')
+
+# Words that put a ``solution(`` occurrence in an expression, not a declaration
+EXPRESSION_KEYWORDS = {'return', 'new', 'throw', 'else', 'case'}
+EXPRESSION_ENDINGS = ('=', '(', ',', '.', '->', '::', '+', '-', '*', '/', '<<', '>>', '!', '&&', '||', '?', ':')
+
+
+def _matching_paren(code, open_index):
+    """Index of the parenthesis closing the one at ``open_index``, or None."""
+    depth = 0
+    for match in PAREN_RE.finditer(code, open_index):
+        depth += 1 if match.group() == '(' else -1
+        if depth == 0:
+            return match.start()
+    return None
+
+
+def _is_declaration(language, prefix):
+    words = prefix.split()
+    if language == 'python':
+        return words[-1:] == ['def']
+    if not words or words[-1] in EXPRESSION_KEYWORDS:
+        return False
+    return not prefix.endswith(EXPRESSION_ENDINGS)
+
+
+def find_solution_signature(language, code):
+    """
+    Locate the declaration of ``solution`` in a single left-to-right scan.
+
+    Calls to ``solution(...)`` (e.g. from an example ``main``) are skipped by
+    resuming after their closing parenthesis, statement boundaries are
+    tracked as the scan advances and at most ``MAX_PREFIX_LENGTH`` characters
+    before each name are inspected, so the scan is linear in the code size. Returns a dict with the declaration ``text`` (modifiers
+    and return type through the closing parenthesis and the following ``:``
+    or ``{``), its ``prefix``, the raw ``parameters`` string and the
+    ``start``/``end`` offsets, or None when there is no declaration.
+    """
+    boundary_re = BOUNDARY_RES.get(language, BOUNDARY_RES['cpp'])
+    boundary_end = 0
+    scanned = 0
+    position = 0
+    while True:
+        match = SOLUTION_RE.search(code, position)
+        if match is None:
+            return None
+        close = _matching_paren(code, match.end() - 1)
+        if close is None:
+            return None
+
+        for boundary in boundary_re.finditer(code, scanned, match.start()):
+            boundary_end = boundary.end()
+        scanned = match.start()
+
+        start = max(boundary_end, match.start() - MAX_PREFIX_LENGTH)
+        noise = NOISE_LINE_RE.match(code, start)
+        while noise and noise.end() <= match.start():
+            start = noise.end()
+            noise = NOISE_LINE_RE.match(code, start)
+        while start < match.start() and code[start].isspace():
+            start += 1
+
+        prefix = code[start:match.start()].strip()
+        if _is_declaration(language, prefix):
+            end = close + 1
+            while end < len(code) and code[end] in ' \t\r\n':
+                end += 1
+            if end < len(code) and code[end] in ':{':
+                end += 1
+            return {
+                'text': code[start:end],
+                'prefix': prefix,
+                'parameters': code[match.end():close],
+                'start': start,
+                'end': end
+            }
+        position = close + 1
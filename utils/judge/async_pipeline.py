@@ -0,0 +1,115 @@
+import asyncio
+import weakref
+from collections import deque
+from contextlib import aclosing
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .pipeline import JudgePipeline
+from .scheduler import AsyncExecutionScheduler, ExecutionScheduler
+
+
+# One executor client and scheduler per event loop: connections are pooled
+# across requests, and asyncio primitives can't be shared between loops (a
+# WSGI worker runs each async response on a loop of its own)
+_clients = weakref.WeakKeyDictionary()
+_schedulers = weakref.WeakKeyDictionary()
+
+
+def executor_client():
+    """The running event loop's shared ``httpx.AsyncClient`` for the executor."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(limits=httpx.Limits(
+            max_connections=settings.JUDGE_ASYNC_EXECUTOR_SLOTS,
+            max_keepalive_connections=settings.JUDGE_ASYNC_EXECUTOR_SLOTS
+        ))
+        _clients[loop] = client
+    return client
+
+
+def loop_execution_scheduler():
+    """The running event loop's ``AsyncExecutionScheduler``."""
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        scheduler = AsyncExecutionScheduler(
+            slots=settings.JUDGE_ASYNC_EXECUTOR_SLOTS,
+            reserved_interactive=settings.JUDGE_INTERACTIVE_RESERVED_SLOTS
+        )
+        _schedulers[loop] = scheduler
+    return scheduler
+
+
+class AsyncJudgePipeline(JudgePipeline):
+    """
+    ``JudgePipeline`` for async views and streams. Executor calls go
+    through an async HTTP client and the event loop's scheduler (unless one
+    is given), so a waiting submission holds no thread. The case-key query
+    runs through ``sync_to_async``; storage reads and output comparison,
+    which may read the expected output, run in threads. The read-ahead is
+    still bounded by ``prefetch``, so memory per in-flight submission stays
+    constant.
+    """
+
+    def __init__(self, judge, storage, comparator=None, prefetch=2,
+                 scheduler=None, lane=ExecutionScheduler.BATCH, client=None):
+        super().__init__(judge, storage, comparator, prefetch, scheduler, lane)
+        self.client = client
+
+    async def _fetched_cases_async(self, question_id, examples_only=False):
+        keys = await sync_to_async(self._case_keys)(question_id, examples_only)
+        pending = deque()
+        try:
+            for case in keys:
+                pending.append(asyncio.ensure_future(asyncio.to_thread(self._fetch, case)))
+                if len(pending) > self.prefetch:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _execute_async(self, user_code, language, problem_type, input_content, limits):
+        async with (self.scheduler or loop_execution_scheduler()).slot(self.lane):
+            result = await self.judge.execute_code_async(
+                self.client or executor_client(),
+                user_code=user_code,
+                language=language,
+                problem_type=problem_type,
+                args=input_content.split('\n'),
+                **limits
+            )
+        return self._outcome(result, limits)
+
+    async def run_async(self, question_id, user_code, language, problem_type, limits=None,
+                        examples_only=False, fail_fast=False):
+        """Async generator with the same summaries and stopping rules as ``run``."""
+        limits = limits or {}
+        index = 0
+        async with aclosing(self._fetched_cases_async(question_id, examples_only)) as cases:
+            async for fetched in cases:
+                input_content = fetched[1]
+                result, metrics, verdict = await self._execute_async(
+                    user_code, language, problem_type, input_content, limits
+                )
+                summary = await asyncio.to_thread(self._summarize, index, fetched, result, metrics, verdict)
+                yield summary
+                if verdict in self.STOPPING_VERDICTS or (fail_fast and summary['status'] != 'correct'):
+                    return
+                index += 1
+
+    async def run_custom_async(self, inputs, user_code, language, problem_type, limits=None):
+        """Async generator with the same results as ``run_custom``."""
+        limits = limits or {}
+        for index, input_content in enumerate(inputs):
+            result, metrics, verdict = await self._execute_async(
+                user_code, language, problem_type, input_content, limits
+            )
+            yield self._custom_summary(index, result, metrics, verdict)
+            if verdict == 'compilation_error':
+                return
@@ -0,0 +1,222 @@
+import hashlib
+import math
+import re
+
+
+COMPARE_EXACT = 'exact'
+COMPARE_TOKENS = 'tokens'
+COMPARE_FLOAT = 'float'
+
+CHUNK_SIZE = 64 * 1024
+# Characters of context shown on each side of a mismatch
+DIFF_CONTEXT = 80
+MAX_DIFF_TOKEN = 200
+
+_TRAILING_SPACE_RE = re.compile(r'[^\S\n]+\n')
+
+
+def iter_chunks(text, size=CHUNK_SIZE):
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+def iter_normalized(chunks):
+    """
+    Normalize streamed output: CRs are dropped, trailing whitespace is
+    removed from every line, and leading and trailing whitespace of the
+    whole output is removed. Whitespace at the end of a chunk is held back
+    until the next chunk shows whether it ends a line.
+    """
+    pending = ''
+    started = False
+    for chunk in chunks:
+        text = pending + chunk.replace('\r', '')
+        if not started:
+            text = text.lstrip()
+            if not text:
+                pending = ''
+                continue
+            started = True
+        body = text.rstrip()
+        pending = text[len(body):]
+        if body:
+            yield _TRAILING_SPACE_RE.sub('\n', body)
+
+
+def normalize_output(text):
+    return ''.join(iter_normalized(iter_chunks(text or '')))
+
+
+def expected_digest(text):
+    """
+    ``(sha256, length)`` of the normalized form of an expected output,
+    stored when test cases are uploaded. Length is in UTF-8 bytes.
+    """
+    hasher = hashlib.sha256()
+    length = 0
+    for piece in iter_normalized(iter_chunks(text or '')):
+        data = piece.encode('utf-8')
+        hasher.update(data)
+        length += len(data)
+    return hasher.hexdigest(), length
+
+
+def iter_tokens(chunks):
+    """Whitespace-separated tokens, joining tokens split across chunks."""
+    carry = ''
+    for chunk in chunks:
+        text = carry + chunk
+        parts = text.split()
+        carry = parts.pop() if parts and not text[-1].isspace() else ''
+        yield from parts
+    if carry:
+        yield carry
+
+
+def _clip(text, limit):
+    return text if len(text) <= limit else f"{text[:limit]}..."
+
+
+class OutputComparator:
+    """
+    Compares program output with an expected output without copying either.
+
+    ``exact`` compares normalized text (see :func:`iter_normalized`), first
+    against the stored digest of the expected output when there is one, so
+    the expected output is only read on a mismatch. ``tokens`` compares
+    whitespace-separated tokens and ``float`` additionally accepts numeric
+    tokens within ``float_tolerance`` (absolute or relative). Every mode
+    streams the outputs in chunks and stops at the first difference, and
+    reports a diff of bounded size.
+    """
+
+    def __init__(self, mode=COMPARE_EXACT, float_tolerance=1e-6):
+        self.mode = mode
+        self.float_tolerance = float_tolerance
+
+    def compare(self, actual, load_expected, expected_hash=None, expected_length=None):
+        """
+        Return ``{'matched': bool, 'diff': dict or None}``. ``load_expected``
+        is called at most once, and not at all when the stored digest matches.
+        """
+        actual = actual or ''
+        if self.mode == COMPARE_EXACT and expected_hash and expected_length is not None:
+            if self.matches_digest(actual, expected_hash, expected_length):
+                return {'matched': True, 'diff': None}
+
+        expected = load_expected() or ''
+        if self.mode == COMPARE_EXACT:
+            diff = self._text_diff(actual, expected)
+        else:
+            diff = self._token_diff(actual, expected)
+        return {'matched': diff is None, 'diff': diff}
+
+    def matches_digest(self, actual, expected_hash, expected_length):
+        hasher = hashlib.sha256()
+        length = 0
+        for piece in iter_normalized(iter_chunks(actual)):
+            data = piece.encode('utf-8')
+            length += len(data)
+            if length > expected_length:
+                return False
+            hasher.update(data)
+        return length == expected_length and hasher.hexdigest() == expected_hash
+
+    def _text_diff(self, actual, expected):
+        """Diff at the first differing character of the normalized outputs, or None."""
+        actual_pieces = iter_normalized(iter_chunks(actual))
+        expected_pieces = iter_normalized(iter_chunks(expected))
+        actual_buffer = expected_buffer = ''
+        consumed_tail = ''
+        line = 1
+        column = 1
+
+        while True:
+            if not actual_buffer:
+                actual_buffer = next(actual_pieces, None)
+            if not expected_buffer:
+                expected_buffer = next(expected_pieces, None)
+            if actual_buffer is None or expected_buffer is None:
+                break
+
+            size = min(len(actual_buffer), len(expected_buffer))
+            if actual_buffer[:size] != expected_buffer[:size]:
+                index = next(i for i in range(size) if actual_buffer[i] != expected_buffer[i])
+                same = actual_buffer[:index]
+                consumed_tail = (consumed_tail + same)[-DIFF_CONTEXT:]
+                line, column = self._advance(line, column, same)
+                return self._diff(line, column, consumed_tail,
+                                  actual_buffer[index:], actual_pieces,
+                                  expected_buffer[index:], expected_pieces)
+
+            same = actual_buffer[:size]
+            consumed_tail = (consumed_tail + same)[-DIFF_CONTEXT:]
+            line, column = self._advance(line, column, same)
+            actual_buffer = actual_buffer[size:]
+            expected_buffer = expected_buffer[size:]
+
+        if actual_buffer is None and expected_buffer is None:
+            return None
+        return self._diff(line, column, consumed_tail,
+                          actual_buffer or '', actual_pieces,
+                          expected_buffer or '', expected_pieces)
+
+    @staticmethod
+    def _advance(line, column, text):
+        newlines = text.count('\n')
+        if newlines:
+            return line + newlines, len(text) - text.rfind('\n')
+        return line, column + len(text)
+
+    @staticmethod
+    def _diff(line, column, before, actual_rest, actual_pieces, expected_rest, expected_pieces):
+        def upcoming(rest, pieces):
+            text = rest
+            while len(text) < DIFF_CONTEXT:
+                piece = next(pieces, None)
+                if piece is None:
+                    break
+                text += piece
+            return text[:DIFF_CONTEXT]
+
+        return {
+            'line': line,
+            'column': column,
+            'context': before,
+            'expected': upcoming(expected_rest, expected_pieces),
+            'actual': upcoming(actual_rest, actual_pieces)
+        }
+
+    def _token_diff(self, actual, expected):
+        """Diff at the first differing token, or None."""
+        actual_tokens = iter_tokens(iter_chunks(actual))
+        expected_tokens = iter_tokens(iter_chunks(expected))
+        index = 0
+        while True:
+            actual_token = next(actual_tokens, None)
+            expected_token = next(expected_tokens, None)
+            if actual_token is None and expected_token is None:
+                return None
+            if actual_token is None or expected_token is None or \
+                    not self._tokens_equal(actual_token, expected_token):
+                return {
+                    'token': index + 1,
+                    'expected': _clip(expected_token, MAX_DIFF_TOKEN) if expected_token is not None else None,
+                    'actual': _clip(actual_token, MAX_DIFF_TOKEN) if actual_token is not None else None
+                }
+            index += 1
+
+    def _tokens_equal(self, actual, expected):
+        if actual == expected:
+            return True
+        if self.mode != COMPARE_FLOAT:
+            return False
+        try:
+            actual_value = float(actual)
+            expected_value = float(expected)
+        except ValueError:
+            return False
+        if math.isnan(actual_value) or math.isnan(expected_value):
+            return math.isnan(actual_value) and math.isnan(expected_value)
+        return math.isclose(actual_value, expected_value,
+                            rel_tol=self.float_tolerance, abs_tol=self.float_tolerance)
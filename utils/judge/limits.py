@@ -0,0 +1,18 @@
+from django.conf import settings
+
+
+def effective_limits(language, time_limit_ms, memory_limit_mb):
+    """
+    Executor limits for one language: the question's limits scaled by the
+    language's ``JUDGE_LANGUAGE_LIMIT_MULTIPLIERS``, with the run timeout
+    capped at ``JUDGE_MAX_RUN_TIMEOUT_MS``. Returns a dict of keyword
+    arguments for ``Judge.execute_code``.
+    """
+    multipliers = settings.JUDGE_LANGUAGE_LIMIT_MULTIPLIERS.get(language, {})
+    run_timeout_ms = int(time_limit_ms * multipliers.get('time', 1.0))
+    memory_limit_mb = memory_limit_mb * multipliers.get('memory', 1.0)
+    return {
+        'run_timeout_ms': min(run_timeout_ms, settings.JUDGE_MAX_RUN_TIMEOUT_MS),
+        'memory_limit_bytes': int(memory_limit_mb * 1024 * 1024),
+        'compile_timeout_ms': settings.JUDGE_COMPILE_TIMEOUT_MS,
+    }
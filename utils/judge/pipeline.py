@@ -0,0 +1,197 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+
+from testcase.models import TestCase
+from gencoder.db_router import read_from_replica
+from .comparator import COMPARE_EXACT, OutputComparator
+from .scheduler import ExecutionScheduler, execution_scheduler
+
+
+# Longest output echoed back per case; the rest is dropped, not buffered
+MAX_REPORTED_OUTPUT = 4096
+
+
+def clip(text, limit=MAX_REPORTED_OUTPUT):
+    """Bound a reported output so per-case summaries stay small."""
+    if text is None or len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [{len(text) - limit} more characters]"
+
+
+class JudgePipeline:
+    """
+    Streams a submission through fetch -> execute -> compare -> summarize,
+    one test case at a time.
+
+    Only test case IDs, storage keys and expected-output digests are loaded
+    up front. Each case's input is fetched from storage at most ``prefetch``
+    cases ahead of the one executing; its expected output is fetched too
+    only when the comparison needs it (no stored digest, or a token-wise
+    mode), otherwise only on a mismatch. A case's content and executor
+    result are released once its summary has been yielded, so memory stays
+    constant whatever the size of the test suite.
+
+    Executions that hit a limit or crash get that verdict without their
+    output being compared. Judging stops after a time limit or compilation
+    error, since the remaining cases would only tie up the executor;
+    ``total_cases`` still counts the whole suite.
+
+    Every executor call holds a slot of ``scheduler`` in ``lane``; example
+    runs use the interactive lane so they are not queued behind submissions.
+    """
+
+    # Verdicts after which the remaining cases are not run
+    STOPPING_VERDICTS = ('time_limit_exceeded', 'compilation_error')
+
+    def __init__(self, judge, storage, comparator=None, prefetch=2,
+                 scheduler=execution_scheduler, lane=ExecutionScheduler.BATCH):
+        self.judge = judge
+        self.storage = storage
+        self.comparator = comparator or OutputComparator()
+        self.prefetch = prefetch
+        self.scheduler = scheduler
+        self.lane = lane
+        self.total_cases = 0
+        self.compile_metrics = None
+
+    @read_from_replica()
+    def _case_keys(self, question_id, examples_only=False):
+        test_cases = TestCase.objects.filter(question_id=question_id)
+        if examples_only:
+            test_cases = test_cases.filter(is_example=True)
+        keys = list(
+            test_cases
+            .order_by('id')
+            .values_list('id', 'input_s3_key', 'output_s3_key', 'expected_hash', 'expected_length')
+        )
+        self.total_cases = len(keys)
+        return keys
+
+    def _needs_expected(self, expected_hash):
+        return self.comparator.mode != COMPARE_EXACT or not expected_hash
+
+    def _fetch(self, case):
+        test_case_id, input_key, output_key, expected_hash, expected_length = case
+        expected = self.storage.get_content(output_key) if self._needs_expected(expected_hash) else None
+        return test_case_id, self.storage.get_content(input_key), expected, case
+
+    def _fetched_cases(self, question_id, examples_only=False):
+        """Yield ``(test_case_id, input, expected or None, case)`` with a bounded read-ahead."""
+        with ThreadPoolExecutor(max_workers=self.prefetch) as pool:
+            pending = deque()
+            for case in self._case_keys(question_id, examples_only):
+                pending.append(pool.submit(self._fetch, case))
+                if len(pending) > self.prefetch:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _execute(self, user_code, language, problem_type, input_content, limits):
+        with self.scheduler.slot(self.lane):
+            result = self.judge.execute_code(
+                user_code=user_code,
+                language=language,
+                problem_type=problem_type,
+                args=input_content.split('\n'),
+                **limits
+            )
+        return self._outcome(result, limits)
+
+    def _outcome(self, result, limits):
+        """``(result, metrics, verdict)`` of one execution; keeps the first compile metrics."""
+        metrics = self.judge.extract_metrics(result['run'])
+        if self.compile_metrics is None:
+            self.compile_metrics = self.judge.extract_metrics(result.get('compile'))
+        verdict = self.judge.classify_result(
+            result,
+            run_timeout_ms=limits.get('run_timeout_ms'),
+            memory_limit_bytes=limits.get('memory_limit_bytes')
+        )
+        return result, metrics, verdict
+
+    def run(self, question_id, user_code, language, problem_type, limits=None, examples_only=False,
+            fail_fast=False):
+        """
+        Yield one summary per executed test case, in order:
+        ``{'test_case_id', 'status', 'runtime_ms', 'metrics', 'report'}``
+        where ``report`` is the entry for the response's ``correct`` or
+        ``incorrect`` list, with outputs clipped, a bounded diff and the
+        case's metrics. Compilation metrics of the first execution are kept
+        in ``compile_metrics``.
+        ``limits`` are the executor limits from ``effective_limits``.
+        With ``examples_only`` only the question's example cases are run,
+        and with ``fail_fast`` judging stops at the first case not correct.
+        """
+        limits = limits or {}
+        for index, fetched in enumerate(self._fetched_cases(question_id, examples_only)):
+            input_content = fetched[1]
+            result, metrics, verdict = self._execute(user_code, language, problem_type, input_content, limits)
+            summary = self._summarize(index, fetched, result, metrics, verdict)
+            yield summary
+            if verdict in self.STOPPING_VERDICTS or (fail_fast and summary['status'] != 'correct'):
+                return
+
+    def _summarize(self, index, fetched, result, metrics, verdict):
+        """
+        Compare one execution with its expected output and build the case's
+        summary. May read the expected output from storage on a mismatch.
+        """
+        test_case_id, _, expected_output, case = fetched
+        _, _, output_key, expected_hash, expected_length = case
+        output = result['run']['output']
+
+        if verdict:
+            report = {
+                'test_case_id': index + 1,
+                'output': clip(output if verdict != 'compilation_error' else result['compile'].get('output')),
+                'status': verdict
+            }
+        else:
+            load_expected = cache(
+                lambda: expected_output if expected_output is not None else self.storage.get_content(output_key)
+            )
+            comparison = self.comparator.compare(
+                output, load_expected, expected_hash=expected_hash, expected_length=expected_length
+            )
+            report = {
+                'test_case_id': index + 1,
+                'output': clip(output),
+                'status': 'correct' if comparison['matched'] else 'incorrect'
+            }
+            if not comparison['matched']:
+                report['expected_output'] = clip(load_expected())
+                report['diff'] = comparison['diff']
+
+        report['metrics'] = metrics
+
+        return {
+            'test_case_id': test_case_id,
+            'status': report['status'],
+            'runtime_ms': metrics['wall_time_ms'],
+            'metrics': metrics,
+            'report': report
+        }
+
+    def run_custom(self, inputs, user_code, language, problem_type, limits=None):
+        """
+        Execute user-supplied inputs, which have no expected output. Yields
+        ``{'input_id', 'status', 'output', 'metrics'}`` where ``status`` is
+        ``executed`` or the limit/error verdict.
+        """
+        limits = limits or {}
+        for index, input_content in enumerate(inputs):
+            result, metrics, verdict = self._execute(user_code, language, problem_type, input_content, limits)
+            yield self._custom_summary(index, result, metrics, verdict)
+            if verdict == 'compilation_error':
+                return
+
+    @staticmethod
+    def _custom_summary(index, result, metrics, verdict):
+        output = result['run']['output'] if verdict != 'compilation_error' else result['compile'].get('output')
+        return {
+            'input_id': index + 1,
+            'status': verdict or 'executed',
+            'output': clip(output),
+            'metrics': metrics
+        }
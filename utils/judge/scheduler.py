@@ -0,0 +1,111 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+
+from django.conf import settings
+
+
+class ExecutionScheduler:
+    """
+    Admission control for executor calls, with a priority lane.
+
+    At most ``slots`` executions run at once from this process. Interactive
+    runs (``INTERACTIVE``) may use every slot and are admitted ahead of any
+    waiting batch work; full submissions (``BATCH``) may use all but
+    ``reserved_interactive`` slots and only start when no interactive run is
+    waiting. Slots are taken per test case, so an interactive run waits at
+    most for one case of a bulk submission to finish.
+    """
+
+    INTERACTIVE = 'interactive'
+    BATCH = 'batch'
+
+    def __init__(self, slots=8, reserved_interactive=2):
+        self.slots = slots
+        self.reserved_interactive = min(reserved_interactive, slots - 1)
+        self._condition = threading.Condition()
+        self._in_use = 0
+        self._waiting_interactive = 0
+
+    def _acquire(self, lane):
+        with self._condition:
+            if lane == self.INTERACTIVE:
+                self._waiting_interactive += 1
+                try:
+                    self._condition.wait_for(lambda: self._in_use < self.slots)
+                finally:
+                    self._waiting_interactive -= 1
+            else:
+                self._condition.wait_for(
+                    lambda: self._waiting_interactive == 0
+                    and self._in_use < self.slots - self.reserved_interactive
+                )
+            self._in_use += 1
+
+    def _release(self):
+        with self._condition:
+            self._in_use -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, lane):
+        """Hold one executor slot in ``lane`` for the duration of the block."""
+        self._acquire(lane)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self):
+        with self._condition:
+            return {'in_use': self._in_use, 'waiting_interactive': self._waiting_interactive}
+
+
+class AsyncExecutionScheduler(ExecutionScheduler):
+    """
+    ``ExecutionScheduler`` for coroutines on one event loop: the same lanes
+    and reservation, but waiting suspends the coroutine instead of blocking
+    a thread. Its slots are separate from those of the threaded scheduler.
+    """
+
+    def __init__(self, slots=8, reserved_interactive=2):
+        super().__init__(slots, reserved_interactive)
+        self._condition = asyncio.Condition()
+
+    async def _acquire(self, lane):
+        async with self._condition:
+            if lane == self.INTERACTIVE:
+                self._waiting_interactive += 1
+                try:
+                    await self._condition.wait_for(lambda: self._in_use < self.slots)
+                finally:
+                    self._waiting_interactive -= 1
+            else:
+                await self._condition.wait_for(
+                    lambda: self._waiting_interactive == 0
+                    and self._in_use < self.slots - self.reserved_interactive
+                )
+            self._in_use += 1
+
+    async def _release(self):
+        async with self._condition:
+            self._in_use -= 1
+            self._condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(self, lane):
+        """Hold one executor slot in ``lane`` for the duration of the block."""
+        await self._acquire(lane)
+        try:
+            yield
+        finally:
+            await self._release()
+
+    def stats(self):
+        return {'in_use': self._in_use, 'waiting_interactive': self._waiting_interactive}
+
+
+execution_scheduler = ExecutionScheduler(
+    slots=settings.JUDGE_EXECUTOR_SLOTS,
+    reserved_interactive=settings.JUDGE_INTERACTIVE_RESERVED_SLOTS
+)
@@ -0,0 +1,50 @@
+import json
+import logging
+from contextlib import aclosing
+
+
+logger = logging.getLogger(__name__)
+
+
+def sse_event(event, data):
+    """Encode one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def judge_events(pipeline, cases, finish):
+    """
+    Server-Sent Events for a judge run, as an async iterator for
+    ``StreamingHttpResponse``. ``cases`` is the async case generator of an
+    ``AsyncJudgePipeline`` and ``finish`` a coroutine function called with
+    the case results:
+
+    - ``compile`` once, after the first execution: ``{'status', 'output', 'metrics'}``
+    - ``case`` per judged test case: its report, as in the JSON response
+    - ``done`` last: the result of ``finish(case_results)``
+    - ``error`` instead of ``done`` if judging fails
+
+    The case generator is closed when the stream ends or the client
+    disconnects, which cancels its pending storage reads.
+    """
+    case_results = []
+    try:
+        async with aclosing(cases):
+            async for case in cases:
+                if not case_results:
+                    failed = case['status'] == 'compilation_error'
+                    yield sse_event('compile', {
+                        'status': 'error' if failed else 'ok',
+                        'output': case['report']['output'] if failed else None,
+                        'metrics': pipeline.compile_metrics
+                    })
+                case_results.append({
+                    'status': case['status'],
+                    'runtime_ms': case['runtime_ms'],
+                    'metrics': case['metrics']
+                })
+                yield sse_event('case', case['report'])
+
+        yield sse_event('done', await finish(case_results))
+    except Exception as e:
+        logger.error("Judge stream failed: %s", e)
+        yield sse_event('error', {'error': f'Execution error: {str(e)}'})
@@ -1,7 +1,14 @@
 from django.urls import path
-from .views import ExecuteCodeAPIView
+from .views import (
+    ExecuteCodeAPIView, ExecuteCodeStreamAPIView, ExecuteCodeAsyncView, StarterCodeAnalysisAPIView,
+    ProblemTypeValidationAPIView
+)
 
 urlpatterns = [
     path('execute', ExecuteCodeAPIView.as_view(), name='execute-code'),
+    path('execute/stream', ExecuteCodeStreamAPIView.as_view(), name='execute-code-stream'),
+    path('execute/async', ExecuteCodeAsyncView.as_view(), name='execute-code-async'),
+    path('analyze-starter-code/', StarterCodeAnalysisAPIView.as_view(), name='analyze-starter-code'),
+    path('validate-problem-type/', ProblemTypeValidationAPIView.as_view(), name='validate-problem-type'),
 ]
 
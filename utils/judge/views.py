@@ -1,3 +1,4 @@
+import functools
 import os
 import django
 
@@ -7,12 +8,31 @@ if __name__ == "__main__":
     django.setup()
 
 
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from .Judge import Judge
+from .pipeline import JudgePipeline
+from .async_pipeline import AsyncJudgePipeline
+from .scheduler import ExecutionScheduler
+from .streaming import judge_events
+from .comparator import OutputComparator
+from .limits import effective_limits
 from utils.storage.s3_service import S3Service
-from testcase.models import TestCase
+from questions.models import Question
+from questions.judging import get_judge_config
+from submissions.services import record_submission, submission_verdict, summarize_metrics
+from users.permissions import IsAdminUserType
+import logging
+
+
+logger = logging.getLogger(__name__)
 
 
 s3service = S3Service()
@@ -20,57 +40,50 @@ s3service = S3Service()
 class ExecuteCodeAPIView(APIView):
     """
     API endpoint for executing user code using the judge service.
+    
+    ``mode`` is ``submit`` (default), which judges the full hidden test set
+    and records a submission, or ``run``, which only runs the example cases
+    plus up to ``MAX_CUSTOM_INPUTS`` inputs of the user's own, records
+    nothing, and executes on the interactive lane ahead of queued submissions.
     """
     
+    MODE_RUN = 'run'
+    MODE_SUBMIT = 'submit'
+    
+    MAX_CUSTOM_INPUTS = 5
+    MAX_CUSTOM_INPUT_CHARS = 64 * 1024
+    
+    pipeline_class = JudgePipeline
+    
     def post(self, request):
         """
         Execute user code with the judge service.
         """
         try:
             submission_results = {"correct": [], "incorrect": []}
+            case_results = []
             
-            # Extract data from request
-            queston_id = request.data.get('question_id')
-            user_code = request.data.get('user_code')
-            language = request.data.get('language')
-            problem_type = request.data.get('problem_type')
-            
-            # Initialize judge and execute code
-            judge = Judge()
+            job = self._prepare(request)
             
-            input_output_pairs = self._get_testcases(queston_id)
-            
-            inputs = input_output_pairs['input']
-            outputs = input_output_pairs['output']
-            
-            for i in range(len(inputs)):
-                result = judge.execute_code(
-                        user_code=user_code,
-                        language=language,
-                        problem_type=problem_type,
-                        args=inputs[i],
-                )
-                
-                actual_output = result['run']['output'].strip()
-                expected_output = outputs[i]
-                
-                if actual_output == expected_output:
-                    submission_results['correct'].append({
-                        'test_case_id': i + 1,
-                        'output': result['run']['output'],
-                        'status': 'correct'
+            for case in self._run_cases(job):
+                case_results.append({
+                    'status': case['status'],
+                    'runtime_ms': case['runtime_ms'],
+                    'metrics': case['metrics']
                 })
-                    
-                else:
-                    submission_results['incorrect'].append({
-                        'test_case_id': i + 1,
-                        'output': result['run']['output'],
-                        'expected_output': outputs[i],
-                        'status': 'incorrect'
-                    })
+                bucket = 'correct' if case['status'] == 'correct' else 'incorrect'
+                submission_results[bucket].append(case['report'])
+            
+            if job['mode'] == self.MODE_RUN:
+                return Response({
+                    'success': True,
+                    **self._run_result(job, case_results),
+                    'submission_results': submission_results
+                }, status=status.HTTP_200_OK)
             
             return Response({
                 'success': True,
+                **self._submit_result(job, self._get_user_id(request), case_results),
                 'submission_results': submission_results
             }, status=status.HTTP_200_OK)
             
@@ -86,16 +99,416 @@ class ExecuteCodeAPIView(APIView):
                 'error': f'Execution error: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
-    def _get_testcases(self, question_id):
+    def _prepare(self, request):
+        """
+        Validate the request and set up its pipeline. Raises ``ValueError``
+        for invalid input.
+        """
+        # Extract data from request
+        queston_id = request.data.get('question_id')
+        user_code = request.data.get('user_code')
+        language = request.data.get('language')
+        mode = request.data.get('mode') or self.MODE_SUBMIT
+        if mode not in (self.MODE_RUN, self.MODE_SUBMIT):
+            raise ValueError(f"mode must be '{self.MODE_RUN}' or '{self.MODE_SUBMIT}'")
+        custom_inputs = self._get_custom_inputs(request) if mode == self.MODE_RUN else []
+        
+        # Problem type is detected from the starter code when the question
+        # is saved; the client's value is not trusted
+        judge_config = self._get_judge_config(queston_id)
+        
+        # Initialize judge and stream the test cases through it
+        pipeline = self.pipeline_class(
+            Judge(),
+            s3service,
+            comparator=OutputComparator(judge_config['compare_mode'], judge_config['float_tolerance']),
+            lane=ExecutionScheduler.INTERACTIVE if mode == self.MODE_RUN else ExecutionScheduler.BATCH
+        )
+        
+        return {
+            'question_id': queston_id,
+            'user_code': user_code,
+            'language': language,
+            'mode': mode,
+            'custom_inputs': custom_inputs,
+            'judge_config': judge_config,
+            'pipeline': pipeline,
+            'limits': effective_limits(language, judge_config['time_limit_ms'], judge_config['memory_limit_mb'])
+        }
+    
+    def _run_cases(self, job, fail_fast=False):
+        return job['pipeline'].run(
+            job['question_id'], job['user_code'], job['language'], job['judge_config']['problem_type'],
+            job['limits'], examples_only=job['mode'] == self.MODE_RUN, fail_fast=fail_fast
+        )
+    
+    def _submit_result(self, job, user_id, case_results):
+        """
+        Record a judged submission and return its verdict, ID, runtime
+        percentile and metrics. A failure to record is logged, not raised.
+        """
+        pipeline = job['pipeline']
+        submission_id = None
+        faster_than = None
+        try:
+            submission = record_submission(
+                user_id=user_id,
+                question_id=job['question_id'],
+                language=job['language'],
+                user_code=job['user_code'],
+                case_results=case_results,
+                total_cases=pipeline.total_cases,
+                compile_metrics=pipeline.compile_metrics
+            )
+            submission_id = submission.id
+            faster_than = submission.faster_than
+        except Exception as e:
+            logger.error("Failed to record submission for question %s: %s", job['question_id'], e)
+        
+        return {
+            'mode': self.MODE_SUBMIT,
+            'verdict': submission_verdict(case_results, pipeline.total_cases),
+            'submission_id': submission_id,
+            'runtime_faster_than': faster_than,
+            'metrics': summarize_metrics(case_results, pipeline.compile_metrics)
+        }
+    
+    def _run_result(self, job, case_results, custom_results=None):
+        """
+        Result for ``run`` mode: the example verdict plus the outputs of the
+        custom inputs, which are skipped once the code fails to compile.
+        ``custom_results`` are used as given when already executed.
+        """
+        pipeline = job['pipeline']
+        if custom_results is None:
+            custom_results = []
+            if job['custom_inputs'] and not self._compile_failed(case_results):
+                custom_results = list(pipeline.run_custom(
+                    job['custom_inputs'], job['user_code'], job['language'],
+                    job['judge_config']['problem_type'], job['limits']
+                ))
+        
+        return {
+            'mode': self.MODE_RUN,
+            'verdict': submission_verdict(case_results, pipeline.total_cases) if case_results else None,
+            'metrics': summarize_metrics(
+                case_results + [{'metrics': result['metrics']} for result in custom_results],
+                pipeline.compile_metrics
+            ),
+            'custom_results': custom_results
+        }
+    
+    @staticmethod
+    def _compile_failed(case_results):
+        return any(case['status'] == 'compilation_error' for case in case_results)
+    
+    def _get_custom_inputs(self, request):
+        """
+        The user's own inputs for ``run`` mode: ``custom_input`` as a string
+        or a list of strings, in the same format as test case input files.
+        """
+        custom_input = request.data.get('custom_input')
+        if custom_input is None or custom_input == '':
+            return []
+        inputs = [custom_input] if isinstance(custom_input, str) else custom_input
+        if not isinstance(inputs, list) or not all(isinstance(item, str) for item in inputs):
+            raise ValueError("custom_input must be a string or a list of strings")
+        if len(inputs) > self.MAX_CUSTOM_INPUTS:
+            raise ValueError(f"At most {self.MAX_CUSTOM_INPUTS} custom inputs per run")
+        if any(len(item) > self.MAX_CUSTOM_INPUT_CHARS for item in inputs):
+            raise ValueError(f"Each custom input must be at most {self.MAX_CUSTOM_INPUT_CHARS} characters")
+        return inputs
+    
+    def _get_judge_config(self, question_id):
+        """
+        The wrapper type and output comparison settings stored for the question.
+        """
+        try:
+            judge_config = get_judge_config(question_id)
+        except Question.DoesNotExist:
+            raise ValueError(f"Question {question_id} not found")
+        if not judge_config['problem_type']:
+            raise ValueError(f"Question {question_id} has no detectable solution signature in its starter code")
+        return judge_config
+    
+    def _get_user_id(self, request):
+        """
+        The submitting user, or None for anonymous requests. A ``user_id`` in
+        the body is ignored: it would let anyone submit as another user.
+        """
+        if request.user and request.user.is_authenticated:
+            return request.user.id
+        return None
+
+
+
+class AsyncExecuteCodeAPIView(ExecuteCodeAPIView):
+    """
+    Request handling of the execute endpoint for views that drive an
+    ``AsyncJudgePipeline`` from async code: ``ExecuteCodeAsyncView`` and
+    the stream.
+    """
+    
+    pipeline_class = AsyncJudgePipeline
+    
+    def accept(self, request):
+        """
+        Authenticate, check permissions and parse the body of a Django
+        request the way DRF would for this view. Blocking; runs in a thread.
+        """
+        drf_request = self.initialize_request(request)
+        self.request = drf_request
+        self.headers = {}
+        self.format_kwarg = None
+        self.initial(drf_request)
+        drf_request.data
+        return drf_request
+    
+    def _run_cases_async(self, job, fail_fast=False):
+        return job['pipeline'].run_async(
+            job['question_id'], job['user_code'], job['language'], job['judge_config']['problem_type'],
+            job['limits'], examples_only=job['mode'] == self.MODE_RUN, fail_fast=fail_fast
+        )
+    
+    async def _finish_async(self, job, user_id, case_results):
+        """
+        ``_run_result`` or ``_submit_result`` for the judged cases, with the
+        custom inputs executed and the submission recorded off the loop.
+        """
+        if job['mode'] == self.MODE_RUN:
+            custom_results = []
+            if job['custom_inputs'] and not self._compile_failed(case_results):
+                custom_results = [
+                    result async for result in job['pipeline'].run_custom_async(
+                        job['custom_inputs'], job['user_code'], job['language'],
+                        job['judge_config']['problem_type'], job['limits']
+                    )
+                ]
+            return self._run_result(job, case_results, custom_results)
+        return await sync_to_async(self._submit_result)(job, user_id, case_results)
+
+
+class ExecuteCodeStreamAPIView(AsyncExecuteCodeAPIView):
+    """
+    Streaming variant of the execute endpoint: judges the same request and
+    pushes progress as Server-Sent Events (see ``judge_events``) instead of
+    one response at the end. Judging stops at the first failing case unless
+    ``fail_fast`` is false.
+    
+    The events come from an async iterator over an ``AsyncJudgePipeline``,
+    so under ASGI (``gencoder.asgi``) an open stream holds no thread while
+    it waits on the executor or S3. Serve it through ASGI: under WSGI,
+    Django buffers an async iterator into a list before responding, so the
+    client gets every event at once when judging ends.
+    """
+    
+    def post(self, request):
+        """
+        Validate the request, then stream its judging.
+        """
+        try:
+            job = self._prepare(request)
+            user_id = self._get_user_id(request) if job['mode'] == self.MODE_SUBMIT else None
+            fail_fast = request.data.get('fail_fast', True) not in (False, 'false', '0', 0)
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': f'Validation error: {str(e)}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({
+                'success': False,
+                'error': f'Execution error: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        response = StreamingHttpResponse(
+            judge_events(
+                job['pipeline'],
+                self._run_cases_async(job, fail_fast=fail_fast),
+                functools.partial(self._finish_async, job, user_id)
+            ),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class ExecuteCodeAsyncView(View):
+    """
+    Native async variant of the execute endpoint, with the same request and
+    response. Executor calls use an async HTTP client and storage reads run
+    in threads, so under ASGI (``gencoder.asgi``) a submission waiting on
+    the executor or S3 does not pin a worker thread. Concurrent executor
+    calls per event loop are bounded by its async scheduler.
+    
+    DRF views cannot be coroutines, so authentication, permissions and body
+    parsing are delegated to ``AsyncExecuteCodeAPIView``; like DRF views,
+    CSRF is only enforced for session-authenticated requests.
+    """
+    
+    http_method_names = ['post', 'options']
+    
+    async def post(self, request):
+        """
+        Execute user code with the judge service.
+        """
+        api_view = AsyncExecuteCodeAPIView()
+        try:
+            submission_results = {"correct": [], "incorrect": []}
+            case_results = []
+            
+            drf_request = await sync_to_async(api_view.accept)(request)
+            job = await sync_to_async(api_view._prepare)(drf_request)
+            
+            async for case in api_view._run_cases_async(job):
+                case_results.append({
+                    'status': case['status'],
+                    'runtime_ms': case['runtime_ms'],
+                    'metrics': case['metrics']
+                })
+                bucket = 'correct' if case['status'] == 'correct' else 'incorrect'
+                submission_results[bucket].append(case['report'])
+            
+            result = await api_view._finish_async(job, api_view._get_user_id(drf_request), case_results)
+            
+            return JsonResponse({
+                'success': True,
+                **result,
+                'submission_results': submission_results
+            }, status=status.HTTP_200_OK)
+            
+        except APIException as e:
+            return JsonResponse({
+                'success': False,
+                'error': str(e.detail)
+            }, status=e.status_code)
+            
+        except ValueError as e:
+            return JsonResponse({
+                'success': False,
+                'error': f'Validation error: {str(e)}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+            
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'error': f'Execution error: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class StarterCodeAnalysisAPIView(APIView):
+    """
+    API endpoint for analyzing the function signatures of many starter code
+    sets in one call (admin only).
+    """
+    
+    permission_classes = [IsAdminUserType]
+    
+    MAX_ITEMS = 200
+    
+    def post(self, request):
+        """
+        Analyze starter code sets.
+        Body: {"items": [{"id": ..., "starter_code": {language: code}}]}, or a
+        single {"starter_code": {...}}. Each result echoes the item's ``id``.
+        """
+        try:
+            items = _analysis_items(request.data, self.MAX_ITEMS)
+            judge = Judge()
+            results = []
+            for item in items:
+                analysis = judge.analyze_and_suggest_improvements(item['starter_code'])
+                results.append({
+                    'id': item.get('id'),
+                    'recommended_problem_type': judge.get_recommended_problem_type(
+                        item['starter_code'], analysis=analysis
+                    ),
+                    **analysis
+                })
+            
+            return Response({
+                'success': True,
+                'results': results
+            }, status=status.HTTP_200_OK)
+            
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': f'Validation error: {str(e)}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+            
+        except Exception as e:
+            return Response({
+                'success': False,
+                'error': f'Analysis error: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ProblemTypeValidationAPIView(APIView):
+    """
+    API endpoint for checking problem types against starter code for many
+    items in one call (admin only).
+    """
+    
+    permission_classes = [IsAdminUserType]
+    
+    MAX_ITEMS = 200
+    
+    def post(self, request):
         """
-        Helper method to retrieve test cases for a given question ID.
+        Validate problem types.
+        Body: {"items": [{"id": ..., "starter_code": {...}, "problem_type": ...}]},
+        or a single {"starter_code": {...}, "problem_type": ...}.
         """
-        test_cases = TestCase.objects.filter(question_id=question_id)
-        input_output_pairs = {"input": [], "output": []}
-        for id in range(len(test_cases)):
-            response = s3service.get_input_and_output(question_id = question_id, case_id = id + 1)
-            input_output_pairs["input"].append(response['input'].split('\n'))
-            input_output_pairs["output"].append(response['output'])
+        try:
+            items = _analysis_items(request.data, self.MAX_ITEMS)
+            judge = Judge()
+            supported_types = {entry['type'] for entry in judge.get_supported_problem_types()}
+            results = []
+            for index, item in enumerate(items):
+                problem_type = item.get('problem_type')
+                if problem_type not in supported_types:
+                    raise ValueError(f"Item {index}: problem_type must be one of {', '.join(sorted(supported_types))}")
+                results.append({
+                    'id': item.get('id'),
+                    **judge.validate_problem_type_compatibility(item['starter_code'], problem_type)
+                })
+            
+            return Response({
+                'success': True,
+                'results': results
+            }, status=status.HTTP_200_OK)
             
-        return input_output_pairs
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': f'Validation error: {str(e)}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+            
+        except Exception as e:
+            return Response({
+                'success': False,
+                'error': f'Analysis error: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+
+def _analysis_items(data, max_items):
+    """
+    Normalize a batch or single-item analysis request into a list of items,
+    each with a ``starter_code`` dict of strings.
+    """
+    items = data.get('items') if 'items' in data else [data]
+    if not isinstance(items, list) or not items:
+        raise ValueError("items must be a non-empty list")
+    if len(items) > max_items:
+        raise ValueError(f"At most {max_items} items per request")
+    
+    for index, item in enumerate(items):
+        starter_code = item.get('starter_code') if isinstance(item, dict) else None
+        if not isinstance(starter_code, dict) or not all(
+            isinstance(code, str) for code in starter_code.values()
+        ):
+            raise ValueError(f"Item {index}: starter_code must map languages to code strings")
+    return items
@@ -0,0 +1,85 @@
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import groupby, islice
+
+from django.core.management.base import BaseCommand
+
+from questions.models import Code
+from utils.judge.analysis.audit import audit_starter_code, unreadable_result
+from utils.storage.s3_service import S3Service
+
+
+class Command(BaseCommand):
+    help = "Analyze every question's starter code and report low-quality or inconsistent questions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=None,
+                            help='File for the NDJSON report (default: stdout)')
+        parser.add_argument('--min-score', type=float, default=60,
+                            help='Report questions whose quality score is below this')
+        parser.add_argument('--processes', type=int, default=None,
+                            help='Processes used for analysis (default: CPU count)')
+        parser.add_argument('--io-workers', type=int, default=16,
+                            help='Threads used for reading starter code from storage')
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help='Questions fetched and analyzed per batch')
+
+    def handle(self, *args, **options):
+        s3 = S3Service()
+        processes = options['processes'] or os.cpu_count() or 1
+        output = open(options['output'], 'w', encoding='utf-8') if options['output'] else sys.stdout
+        audited = reported = 0
+
+        def fetch(entry):
+            """``(item, None)``, or ``(None, report entry)`` when a read fails."""
+            question_id, stored_type, keys = entry
+            try:
+                return (question_id, stored_type, {language: s3.get_content(key) for language, key in keys}), None
+            except Exception as e:
+                return None, unreadable_result(question_id, stored_type, e)
+
+        try:
+            with ThreadPoolExecutor(max_workers=options['io_workers']) as io_pool, \
+                    ProcessPoolExecutor(max_workers=processes) as cpu_pool:
+                entries = self._starter_code_keys()
+                while True:
+                    batch = list(islice(entries, options['batch_size']))
+                    if not batch:
+                        break
+                    items, results = [], []
+                    for item, unreadable in io_pool.map(fetch, batch):
+                        if unreadable:
+                            results.append(unreadable)
+                        else:
+                            items.append(item)
+                    chunksize = max(1, len(items) // (processes * 4))
+                    results.extend(cpu_pool.map(audit_starter_code, items, chunksize=chunksize))
+                    for result in results:
+                        audited += 1
+                        if result['issues'] or result['quality']['score'] < options['min_score']:
+                            reported += 1
+                            output.write(json.dumps(result) + '\n')
+                    self.stderr.write(f"Audited {audited} questions")
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Audited {audited} questions, {reported} need attention"
+        ))
+
+    def _starter_code_keys(self):
+        """
+        Yield ``(question_id, stored_problem_type, [(language, key), ...])``
+        per question, streaming the Code table in question order.
+        """
+        rows = (
+            Code.objects
+            .order_by('question_id', 'language__name')
+            .values_list('question_id', 'question__problem_type', 'language__name', 'code_s3_key')
+            .iterator(chunk_size=2000)
+        )
+        for (question_id, stored_type), group in groupby(rows, key=lambda row: row[:2]):
+            yield question_id, stored_type, [(language, key) for _, _, language, key in group]
@@ -126,6 +126,45 @@ class S3Service:
         except Exception as e:
             raise Exception(f"Failed to retrieve input/output: {str(e)}")
 
+    def get_content(self, key):
+        """Retrieve the UTF-8 content stored under an exact key."""
+        try:
+            response = self.s3_client.get_object(
+                Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+                Key=key
+            )
+            return response['Body'].read().decode('utf-8')
+        except Exception as e:
+            raise Exception(f"Failed to retrieve {key}: {str(e)}")
+
+    def put_content(self, key, content, content_type=None):
+        """Overwrite the object stored under an exact key."""
+        extra = {'ContentType': content_type} if content_type else {}
+        try:
+            self.s3_client.put_object(
+                Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+                Key=key,
+                Body=content,
+                **extra
+            )
+            return key
+        except Exception as e:
+            raise Exception(f"Failed to upload {key}: {str(e)}")
+
+    def delete_keys(self, keys):
+        """Delete specific objects, e.g. the files of a removed test case."""
+        keys = [key for key in keys if key]
+        if not keys:
+            return {"message": "Nothing to delete"}
+        try:
+            self.s3_client.delete_objects(
+                Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+                Delete={'Objects': [{'Key': key} for key in keys]}
+            )
+            return {"message": f"Successfully deleted {len(keys)} objects"}
+        except Exception as e:
+            raise Exception(f"Failed to delete objects: {str(e)}")
+
     def delete_question(self, question_id):
         """Delete all files related to a specific question."""
         prefix = f"questions/question_{question_id}/"
@@ -0,0 +1,732 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+
+import httpx
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.permissions import IsAuthenticated
+
+from questions.models import Code, Language, Question
+from testcase.models import TestCase as QuestionTestCase
+from .judge.Judge import Judge
+from .judge.analysis import parse_solution_signature, type_category
+from .judge.comparator import (
+    CHUNK_SIZE, COMPARE_EXACT, COMPARE_FLOAT, COMPARE_TOKENS, DIFF_CONTEXT, MAX_DIFF_TOKEN, OutputComparator,
+    expected_digest, iter_chunks, iter_normalized, iter_tokens, normalize_output
+)
+from .judge.limits import effective_limits
+from .judge.pipeline import MAX_REPORTED_OUTPUT, JudgePipeline
+from .judge.async_pipeline import loop_execution_scheduler
+from .judge.scheduler import AsyncExecutionScheduler, ExecutionScheduler
+from .judge.views import AsyncExecuteCodeAPIView, ExecuteCodeAPIView
+from submissions import services, stats
+from submissions.leaderboard import Leaderboard
+from submissions.models import Submission
+from users.counters import ProfileCounterBatcher
+from users.models import User
+from users.tokens import issue_tokens, user_cache
+
+
+class SignatureParserTests(SimpleTestCase):
+
+    def parameters(self, language, code):
+        return [(p['name'], p['type']) for p in parse_solution_signature(language, code)['parameters']]
+
+    def test_java_signatures(self):
+        signature = parse_solution_signature(
+            'java',
+            'class Solution {\n'
+            '    @Override\n'
+            '    public static List<Integer> solution(@NonNull String s,\n'
+            '                                         final int... xs) { return null; }\n'
+            '}'
+        )
+
+        self.assertEqual(signature['return_type'], 'List<Integer>')
+        self.assertEqual(
+            [(p['name'], p['type']) for p in signature['parameters']],
+            [('s', 'String'), ('xs', 'int[]')]
+        )
+
+    def test_cpp_signatures(self):
+        self.assertEqual(
+            self.parameters(
+                'cpp',
+                'template <typename T>\n'
+                'long long solution(const std::vector<long long>& nums, /* k */ int k = 3,\n'
+                '                   int arr[], unsigned long n, std::map<int, int> m) {}'
+            ),
+            [('nums', 'vector<long long>'), ('k', 'int'), ('arr', 'int[]'),
+             ('n', 'unsigned long'), ('m', 'map<int,int>')]
+        )
+
+    def test_missing_declaration(self):
+        self.assertIsNone(parse_solution_signature('java', 'int helper(int x) { return x; }'))
+
+    def test_type_categories(self):
+        for type_name, category in (
+            ('long long', 'int'),
+            ('Integer', 'int'),
+            ('String', 'string'),
+            ('vector<long long>', 'array'),
+            ('int*', 'array'),
+            ('List<String>', 'string_array'),
+            ('map<int,int>', 'unknown'),
+            ('double', 'unknown'),
+        ):
+            with self.subTest(type_name=type_name):
+                self.assertEqual(type_category(type_name), category)
+
+
+class ProblemTypeDetectionTests(SimpleTestCase):
+
+    def setUp(self):
+        Judge._language_analysis_cache.clear()
+        Judge._starter_code_analysis_cache.clear()
+        self.judge = Judge()
+
+    def detected(self, language, code):
+        return self.judge._analyze_language_code(language, code)['detected_type']
+
+    def test_supported_declared_types(self):
+        self.assertEqual(self.detected('cpp', 'int solution(int a, int b) { return a + b; }'), 'function_only_int')
+        self.assertEqual(self.detected('cpp', 'long long solution(long long a, int b, int c) {}'), 'function_only_int')
+        self.assertEqual(self.detected('java', 'public int solution(int[] nums) { return 0; }'), 'function_only_array')
+        self.assertEqual(self.detected('cpp', 'int solution(const vector<int>& values) {}'), 'function_only_array')
+        self.assertEqual(self.detected('java', 'public int solution(String text) { return 0; }'), 'function_only_string')
+
+    def test_mixed_parameter_types_are_not_classified(self):
+        self.assertIsNone(self.detected('java', 'public String solution(int n, String word) { return word; }'))
+        self.assertIsNone(self.detected('java', 'public int solution(int[] nums, int k) { return k; }'))
+        self.assertIsNone(self.detected('cpp', 'int solution(vector<int>& nums, int k) {}'))
+
+    def test_unsupported_types_are_not_classified(self):
+        result = self.judge._analyze_language_code('cpp', 'int solution(vector<string>& words) {}')
+
+        self.assertIsNone(result['detected_type'])
+        self.assertIn('vector<string>', result['error'])
+        self.assertIsNone(self.detected('java', 'public double solution(double x) { return x; }'))
+        self.assertIsNone(self.detected('java', 'public int solution(Map<String, Integer> counts) { return 0; }'))
+
+    def test_languages_vote(self):
+        analysis = self.judge.analyze_starter_code({
+            'python': 'def solution(nums: List[int]):\n    pass\n',
+            'java': 'public int solution(int[] nums) { return 0; }',
+            'cpp': 'int solution(vector<string>& nums) {}',
+        })
+
+        self.assertEqual(analysis['detected_problem_type'], 'function_only_array')
+        self.assertEqual(analysis['problem_type_votes']['function_only_array']['votes'], 2)
+
+
+class OutputComparatorTests(SimpleTestCase):
+
+    def compare(self, actual, expected, mode=COMPARE_EXACT, **kwargs):
+        return OutputComparator(mode, **kwargs).compare(actual, lambda: expected)
+
+    def test_exact_mode_normalizes_whitespace(self):
+        result = self.compare('\n 1 2  \r\n3\t\r\n\n\n', '1 2\n3')
+
+        self.assertEqual(result, {'matched': True, 'diff': None})
+
+    def test_normalization_is_independent_of_chunking(self):
+        text = '  a \n b  \r\n\n c \n  '
+        expected = ''.join(iter_normalized([text]))
+        for size in range(1, len(text) + 1):
+            with self.subTest(size=size):
+                self.assertEqual(''.join(iter_normalized(iter_chunks(text, size))), expected)
+        self.assertEqual(normalize_output(text), 'a\n b\n\n c')
+
+    def test_tokens_split_across_chunks(self):
+        self.assertEqual(list(iter_tokens(['12', '34 5', '6\n', '7'])), ['1234', '56', '7'])
+
+    def test_exact_diff_reports_first_difference(self):
+        result = self.compare('1\n2\n3 4\n', '1\n2\n3 5\n')
+
+        self.assertFalse(result['matched'])
+        self.assertEqual(result['diff']['line'], 3)
+        self.assertEqual(result['diff']['column'], 3)
+        self.assertEqual(result['diff']['expected'], '5')
+        self.assertEqual(result['diff']['actual'], '4')
+
+    def test_exact_diff_on_truncated_output(self):
+        diff = self.compare('1\n2', '1\n2\n3')['diff']
+
+        self.assertEqual((diff['line'], diff['column'], diff['actual'], diff['expected']), (2, 2, '', '\n3'))
+
+    def test_large_outputs_stream_and_bound_the_diff(self):
+        expected = 'x' * (3 * CHUNK_SIZE) + 'y' + 'z' * CHUNK_SIZE
+        actual = 'x' * (3 * CHUNK_SIZE) + 'q' + 'z' * CHUNK_SIZE
+
+        diff = self.compare(actual, expected)['diff']
+
+        self.assertEqual(diff['column'], 3 * CHUNK_SIZE + 1)
+        self.assertEqual(len(diff['context']), DIFF_CONTEXT)
+        self.assertEqual(len(diff['expected']), DIFF_CONTEXT)
+
+    def test_matching_digest_skips_the_expected_output(self):
+        expected_hash, expected_length = expected_digest('1 2\n3\n')
+
+        def load_expected():
+            raise AssertionError('expected output should not be read')
+
+        result = OutputComparator().compare('1 2\r\n3', load_expected, expected_hash, expected_length)
+
+        self.assertTrue(result['matched'])
+
+    def test_digest_mismatch_falls_back_to_a_diff(self):
+        expected_hash, expected_length = expected_digest('1 2\n3\n')
+
+        result = OutputComparator().compare('1 2\n4', lambda: '1 2\n3\n', expected_hash, expected_length)
+
+        self.assertFalse(result['matched'])
+        self.assertEqual(result['diff']['line'], 2)
+        self.assertFalse(OutputComparator().matches_digest('1 2\n3\n' * 2, expected_hash, expected_length))
+
+    def test_token_mode(self):
+        self.assertTrue(self.compare('1   2\n3', '1 2 3', COMPARE_TOKENS)['matched'])
+
+        diff = self.compare('1 2', '1 2 3', COMPARE_TOKENS)['diff']
+        self.assertEqual(diff, {'token': 3, 'expected': '3', 'actual': None})
+        self.assertFalse(self.compare('1.0', '1', COMPARE_TOKENS)['matched'])
+
+    def test_float_mode_tolerance(self):
+        self.assertTrue(self.compare('0.3333334 nan', '0.3333333 nan', COMPARE_FLOAT)['matched'])
+        self.assertTrue(self.compare('1000001', '1000000', COMPARE_FLOAT, float_tolerance=1e-6)['matched'])
+        self.assertFalse(self.compare('0.34', '0.33', COMPARE_FLOAT)['matched'])
+        self.assertFalse(self.compare('abc', '0', COMPARE_FLOAT)['matched'])
+
+    def test_long_tokens_are_clipped(self):
+        diff = self.compare('a' * 1000, 'b', COMPARE_TOKENS)['diff']
+
+        self.assertEqual(len(diff['actual']), MAX_DIFF_TOKEN + 3)
+
+
+class JudgeTransportTests(SimpleTestCase):
+
+    def setUp(self):
+        self.judge = Judge()
+
+    def test_large_inputs_go_through_stdin(self):
+        small = ['1,2,3']
+        large = [','.join(['7'] * (Judge.ARGV_MAX_CHARS // 2 + 1))]
+
+        self.assertEqual(self.judge.choose_transport(small), Judge.TRANSPORT_ARGV)
+        self.assertEqual(self.judge.choose_transport(large), Judge.TRANSPORT_STDIN)
+        self.assertEqual(self.judge.choose_transport([]), Judge.TRANSPORT_ARGV)
+
+    def test_arrays_are_length_prefixed(self):
+        encode = self.judge.encode_stdin
+
+        self.assertEqual(encode('function_only_array', ['1,-2,3']), '3\n1 -2 3\n')
+        self.assertEqual(encode('function_only_array', [' 1, 2 ,3, ']), '3\n1 2 3\n')
+        self.assertEqual(encode('function_only_array', ['4,,5,']), '2\n4 5\n')
+        self.assertEqual(encode('function_only_array', ['']), '0\n\n')
+        self.assertEqual(encode('function_only_array', []), '0\n\n')
+
+    def test_strings_and_integers(self):
+        self.assertEqual(self.judge.encode_stdin('function_only_string', ['hello world']), 'hello world\n')
+        self.assertEqual(self.judge.encode_stdin('function_only_int', ['1', '2']), '1 2\n')
+
+    def test_payload_per_transport(self):
+        code = 'def solution(arr):\n    return sum(arr)\n'
+        argv = self.judge.build_execution_payload(code, 'python', 'function_only_array', ['1,2,'])
+        stdin = self.judge.build_execution_payload(code, 'python', 'function_only_array', ['1,2,'],
+                                                   transport=Judge.TRANSPORT_STDIN)
+
+        self.assertEqual((argv['args'], argv['stdin']), (['1,2,'], ''))
+        self.assertEqual((stdin['args'], stdin['stdin']), ([], '2\n1 2\n'))
+        self.assertIn('sys.stdin', stdin['files'][0]['content'])
+        self.assertEqual(stdin['files'][1]['content'], code)
+
+
+@override_settings(
+    JUDGE_LANGUAGE_LIMIT_MULTIPLIERS={'java': {'time': 2.0, 'memory': 2.0}, 'python': {'time': 3.0, 'memory': 1.5}},
+    JUDGE_MAX_RUN_TIMEOUT_MS=3000,
+    JUDGE_COMPILE_TIMEOUT_MS=10000
+)
+class JudgeLimitsTests(SimpleTestCase):
+
+    def setUp(self):
+        self.judge = Judge()
+
+    def test_limits_are_scaled_per_language(self):
+        self.assertEqual(effective_limits('java', 1000, 256), {
+            'run_timeout_ms': 2000,
+            'memory_limit_bytes': 512 * 1024 * 1024,
+            'compile_timeout_ms': 10000,
+        })
+        self.assertEqual(effective_limits('cpp', 500, 64)['run_timeout_ms'], 500)
+
+    def test_run_timeout_is_capped(self):
+        limits = effective_limits('python', 2000, 100)
+
+        self.assertEqual(limits['run_timeout_ms'], 3000)
+        self.assertEqual(limits['memory_limit_bytes'], 150 * 1024 * 1024)
+
+    def test_limits_reach_the_executor_payload(self):
+        payload = self.judge.build_execution_payload(
+            'def solution(a, b):\n    return a + b\n', 'python', 'function_only_int', ['1', '2'],
+            **effective_limits('python', 500, 128)
+        )
+
+        self.assertEqual(payload['run_timeout'], 1500)
+        self.assertEqual(payload['run_memory_limit'], 192 * 1024 * 1024)
+        self.assertEqual(payload['compile_timeout'], 10000)
+
+    def test_classify_result(self):
+        limits = {'run_timeout_ms': 1000, 'memory_limit_bytes': 1024}
+        for result, verdict in (
+            ({'run': {'code': 0, 'wall_time': 10, 'memory': 512}}, None),
+            ({'compile': {'code': 1}, 'run': {}}, 'compilation_error'),
+            ({'run': {'status': 'TO', 'signal': 'SIGKILL'}}, 'time_limit_exceeded'),
+            ({'run': {'signal': 'SIGKILL', 'wall_time': 1000, 'memory': 100}}, 'time_limit_exceeded'),
+            ({'run': {'signal': 'SIGKILL'}}, 'time_limit_exceeded'),
+            ({'run': {'signal': 'SIGKILL', 'wall_time': 50, 'memory': 2048}}, 'memory_limit_exceeded'),
+            ({'run': {'code': 0, 'wall_time': 50, 'memory': 1024}}, 'memory_limit_exceeded'),
+            ({'run': {'signal': 'SIGSEGV', 'wall_time': 5, 'memory': 100}}, 'runtime_error'),
+            ({'run': {'code': 1, 'wall_time': 5, 'memory': 100}}, 'runtime_error'),
+        ):
+            with self.subTest(result=result):
+                self.assertEqual(self.judge.classify_result(result, **limits), verdict)
+
+
+class ScriptedJudge(Judge):
+    """Judge whose executor returns the given outputs (or result dicts) in order."""
+
+    def __init__(self, outputs):
+        self.outputs = list(outputs)
+        self.calls = []
+
+    def execute_code(self, user_code, language, problem_type, args=[], **limits):
+        self.calls.append((args, limits))
+        output = self.outputs[len(self.calls) - 1]
+        if isinstance(output, dict):
+            return output
+        return {'run': {'output': output, 'code': 0, 'wall_time': 5, 'cpu_time': 4, 'memory': 1024}}
+
+
+class CountingStorage:
+
+    def __init__(self, objects):
+        self.objects = objects
+        self.reads = []
+
+    def get_content(self, key):
+        self.reads.append(key)
+        return self.objects[key]
+
+
+class JudgePipelineTests(TestCase):
+
+    def setUp(self):
+        self.question = Question.objects.create(title='Double')
+        objects = {}
+        for slot, value in enumerate((1, 2, 3), start=1):
+            objects[f'in/{slot}'] = str(value)
+            objects[f'out/{slot}'] = f'{value * 2}\n'
+            expected_hash, expected_length = expected_digest(objects[f'out/{slot}'])
+            QuestionTestCase.objects.create(
+                question=self.question,
+                input_s3_key=f'in/{slot}',
+                output_s3_key=f'out/{slot}',
+                expected_hash=expected_hash,
+                expected_length=expected_length,
+                is_example=slot == 1
+            )
+        self.storage = CountingStorage(objects)
+
+    def run_pipeline(self, outputs, comparator=None, **kwargs):
+        judge = ScriptedJudge(outputs)
+        pipeline = JudgePipeline(judge, self.storage, comparator=comparator, scheduler=ExecutionScheduler(slots=2))
+        summaries = list(pipeline.run(self.question.id, 'code', 'python', 'function_only_int', **kwargs))
+        return pipeline, judge, summaries
+
+    def test_matching_digests_never_read_expected_outputs(self):
+        pipeline, judge, summaries = self.run_pipeline(['2', '4\n', '6  \r\n'], limits={'run_timeout_ms': 1000})
+
+        self.assertEqual([summary['status'] for summary in summaries], ['correct'] * 3)
+        self.assertEqual(sorted(self.storage.reads), ['in/1', 'in/2', 'in/3'])
+        self.assertEqual(judge.calls[0], (['1'], {'run_timeout_ms': 1000}))
+        self.assertEqual(summaries[0]['metrics']['memory_bytes'], 1024)
+        self.assertEqual(pipeline.total_cases, 3)
+
+    def test_mismatch_reads_and_reports_expected_output(self):
+        _, _, summaries = self.run_pipeline(['2', '5', '6'])
+
+        report = summaries[1]['report']
+        self.assertEqual(report['status'], 'incorrect')
+        self.assertEqual(report['expected_output'], '4\n')
+        self.assertEqual(report['diff']['actual'], '5')
+        self.assertEqual(self.storage.reads.count('out/2'), 1)
+
+    def test_token_modes_read_expected_outputs_up_front(self):
+        _, _, summaries = self.run_pipeline(['2', '4', '6'], comparator=OutputComparator(COMPARE_TOKENS))
+
+        self.assertEqual([summary['status'] for summary in summaries], ['correct'] * 3)
+        self.assertEqual(sorted(key for key in self.storage.reads if key.startswith('out/')), ['out/1', 'out/2', 'out/3'])
+
+    def test_time_limit_stops_judging(self):
+        timed_out = {'run': {'output': '', 'status': 'TO', 'signal': 'SIGKILL', 'wall_time': 1000}}
+
+        pipeline, judge, summaries = self.run_pipeline(['2', timed_out, '6'])
+
+        self.assertEqual([summary['status'] for summary in summaries], ['correct', 'time_limit_exceeded'])
+        self.assertEqual(len(judge.calls), 2)
+        self.assertEqual(pipeline.total_cases, 3)
+
+    def test_fail_fast_and_examples_only(self):
+        _, _, summaries = self.run_pipeline(['2', '0', '6'], fail_fast=True)
+        self.assertEqual([summary['status'] for summary in summaries], ['correct', 'incorrect'])
+
+        pipeline, _, summaries = self.run_pipeline(['2'], examples_only=True)
+        self.assertEqual(len(summaries), 1)
+        self.assertEqual(pipeline.total_cases, 1)
+
+    def test_long_outputs_are_clipped(self):
+        _, _, summaries = self.run_pipeline(['x' * (MAX_REPORTED_OUTPUT + 10), '4', '6'])
+
+        self.assertTrue(summaries[0]['report']['output'].endswith('... [10 more characters]'))
+
+
+class ExecutionSchedulerTests(SimpleTestCase):
+
+    def setUp(self):
+        self.admitted = []
+        self.releases = {}
+        self.threads = []
+
+    def tearDown(self):
+        for release in self.releases.values():
+            release.set()
+        for thread in self.threads:
+            thread.join(timeout=5)
+
+    def wait_until(self, predicate):
+        deadline = time.monotonic() + 5
+        while not predicate():
+            self.assertLess(time.monotonic(), deadline, "timed out")
+            time.sleep(0.001)
+
+    def hold(self, scheduler, lane, name):
+        """Run ``name`` in a thread that holds a slot until released."""
+        self.releases[name] = threading.Event()
+
+        def run():
+            with scheduler.slot(lane):
+                self.admitted.append(name)
+                self.releases[name].wait(5)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        self.threads.append(thread)
+
+    def test_batch_work_leaves_the_reserved_slots_free(self):
+        scheduler = ExecutionScheduler(slots=3, reserved_interactive=1)
+        self.hold(scheduler, ExecutionScheduler.BATCH, 'batch 1')
+        self.hold(scheduler, ExecutionScheduler.BATCH, 'batch 2')
+        self.wait_until(lambda: len(self.admitted) == 2)
+
+        self.hold(scheduler, ExecutionScheduler.BATCH, 'batch 3')
+        self.hold(scheduler, ExecutionScheduler.INTERACTIVE, 'run')
+        self.wait_until(lambda: 'run' in self.admitted)
+
+        self.assertNotIn('batch 3', self.admitted)
+        self.assertEqual(scheduler.stats(), {'in_use': 3, 'waiting_interactive': 0})
+        # The interactive run counts against the batch limit too
+        self.releases['batch 1'].set()
+        self.wait_until(lambda: scheduler.stats()['in_use'] == 2)
+        self.assertNotIn('batch 3', self.admitted)
+        self.releases['run'].set()
+        self.wait_until(lambda: 'batch 3' in self.admitted)
+
+    def test_interactive_runs_are_admitted_ahead_of_waiting_batch_work(self):
+        scheduler = ExecutionScheduler(slots=1, reserved_interactive=0)
+        self.hold(scheduler, ExecutionScheduler.BATCH, 'batch 1')
+        self.wait_until(lambda: self.admitted == ['batch 1'])
+        self.hold(scheduler, ExecutionScheduler.BATCH, 'batch 2')
+        time.sleep(0.01)
+        self.hold(scheduler, ExecutionScheduler.INTERACTIVE, 'run')
+        self.wait_until(lambda: scheduler.stats()['waiting_interactive'] == 1)
+
+        self.releases['batch 1'].set()
+        self.wait_until(lambda: len(self.admitted) == 2)
+        self.assertEqual(self.admitted, ['batch 1', 'run'])
+
+        self.releases['run'].set()
+        self.wait_until(lambda: len(self.admitted) == 3)
+        self.assertEqual(self.admitted[-1], 'batch 2')
+
+    def test_at_least_one_slot_stays_open_to_batch_work(self):
+        self.assertEqual(ExecutionScheduler(slots=2, reserved_interactive=5).reserved_interactive, 1)
+
+
+class ExecuteRunModeTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.question = Question.objects.create(title='Double', problem_type='function_only_int')
+        objects = {}
+        for slot, value in enumerate((1, 2), start=1):
+            objects[f'in/{slot}'] = str(value)
+            objects[f'out/{slot}'] = f'{value * 2}\n'
+            QuestionTestCase.objects.create(question=self.question, input_s3_key=f'in/{slot}',
+                                            output_s3_key=f'out/{slot}', is_example=slot == 1)
+        self.judge = ScriptedJudge([])
+        for target, replacement in (('s3service', CountingStorage(objects)), ('Judge', lambda: self.judge)):
+            patcher = mock.patch(f'utils.judge.views.{target}', replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def execute(self, **data):
+        return self.client.post('/api/judge/execute', {
+            'question_id': self.question.id, 'user_code': 'code', 'language': 'python', **data
+        }, content_type='application/json')
+
+    def test_run_mode_judges_examples_and_custom_inputs(self):
+        self.judge.outputs = ['2', '10', '14']
+
+        response = self.execute(mode='run', custom_input=['5', '7'])
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['mode'], data['verdict']), ('run', 'accepted'))
+        self.assertEqual([result['output'] for result in data['custom_results']], ['10', '14'])
+        self.assertEqual([call[0] for call in self.judge.calls], [['1'], ['5'], ['7']])
+        self.assertFalse(Submission.objects.exists())
+
+    def test_custom_inputs_are_skipped_when_compilation_fails(self):
+        self.judge.outputs = [{'compile': {'code': 1, 'output': 'syntax error'}, 'run': {'output': ''}}]
+
+        data = self.execute(mode='run', custom_input='5').json()
+
+        self.assertEqual(data['verdict'], 'compilation_error')
+        self.assertEqual(data['custom_results'], [])
+        self.assertEqual(len(self.judge.calls), 1)
+
+    def test_invalid_mode_is_rejected(self):
+        response = self.execute(mode='debug')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.judge.calls, [])
+
+    def test_custom_input_validation(self):
+        view = ExecuteCodeAPIView()
+        too_long = 'x' * (ExecuteCodeAPIView.MAX_CUSTOM_INPUT_CHARS + 1)
+        too_many = ['1'] * (ExecuteCodeAPIView.MAX_CUSTOM_INPUTS + 1)
+
+        for custom_input, expected in ((None, []), ('', []), ('1 2', ['1 2']), (['1', '2'], ['1', '2'])):
+            with self.subTest(custom_input=custom_input):
+                self.assertEqual(view._get_custom_inputs(SimpleNamespace(data={'custom_input': custom_input})),
+                                 expected)
+        for custom_input in (5, ['1', 2], {'a': '1'}, too_many, [too_long]):
+            with self.subTest(custom_input=custom_input):
+                with self.assertRaises(ValueError):
+                    view._get_custom_inputs(SimpleNamespace(data={'custom_input': custom_input}))
+
+
+def stub_executor(outputs):
+    """
+    ``httpx.AsyncClient`` answering executor requests with ``outputs`` in
+    order, as ``ScriptedJudge`` does, and the list of request payloads.
+    """
+    payloads = []
+
+    def handle(request):
+        payloads.append(json.loads(request.content))
+        output = outputs[len(payloads) - 1]
+        if not isinstance(output, dict):
+            output = {'run': {'output': output, 'code': 0, 'wall_time': 5, 'cpu_time': 4, 'memory': 1024}}
+        return httpx.Response(200, json=output)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handle)), payloads
+
+
+class AsyncExecuteTests(TestCase):
+
+    TIMED_OUT = {'run': {'output': '', 'status': 'TO', 'signal': 'SIGKILL', 'wall_time': 1000}}
+
+    def setUp(self):
+        cache.clear()
+        user_cache._entries.clear()
+        stats._language_ids.clear()
+        self.user = User.objects.create_user(username='alice', password='secret')
+        self.question = Question.objects.create(title='Double', problem_type='function_only_int')
+        objects = {}
+        for slot, value in enumerate((1, 2, 3), start=1):
+            objects[f'in/{slot}'] = str(value)
+            objects[f'out/{slot}'] = f'{value * 2}\n'
+            QuestionTestCase.objects.create(question=self.question, input_s3_key=f'in/{slot}',
+                                            output_s3_key=f'out/{slot}', is_example=slot == 1)
+        self.executor = None
+        for patcher in (
+            mock.patch('utils.judge.views.s3service', CountingStorage(objects)),
+            mock.patch('utils.judge.async_pipeline.executor_client', lambda: self.executor),
+            mock.patch.object(ProfileCounterBatcher, '_start'),
+            mock.patch.object(services, 'profile_counters', ProfileCounterBatcher()),
+            mock.patch.object(services, 'leaderboard', Leaderboard()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def execute(self, outputs, headers=None, **data):
+        self.executor, payloads = stub_executor(outputs)
+        response = await self.async_client.post('/api/judge/execute/async', {
+            'question_id': self.question.id, 'user_code': 'code', 'language': 'python', **data
+        }, content_type='application/json', headers=headers or {})
+        return response, payloads
+
+    async def test_submission_is_recorded_for_the_authenticated_user(self):
+        tokens = await asyncio.to_thread(issue_tokens, self.user)
+
+        response, payloads = await self.execute(
+            ['2', '4', '6'], headers={'Authorization': f"Bearer {tokens['access_token']}"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['verdict'], 'accepted')
+        self.assertEqual(len(data['submission_results']['correct']), 3)
+        self.assertEqual(len(payloads), 3)
+        submission = await Submission.objects.aget(id=data['submission_id'])
+        self.assertEqual(submission.user_id, self.user.id)
+
+    async def test_judging_stops_at_a_time_limit(self):
+        response, payloads = await self.execute(['2', self.TIMED_OUT, '6'])
+
+        data = response.json()
+        self.assertEqual(data['verdict'], 'time_limit_exceeded')
+        self.assertEqual(len(payloads), 2)
+        self.assertIsNone((await Submission.objects.aget(id=data['submission_id'])).user_id)
+
+    async def test_run_mode_executes_custom_inputs(self):
+        response, payloads = await self.execute(['2', '10'], mode='run', custom_input='5')
+
+        data = response.json()
+        self.assertEqual((data['mode'], data['verdict']), ('run', 'accepted'))
+        self.assertEqual([result['output'] for result in data['custom_results']], ['10'])
+        self.assertEqual(len(payloads), 2)
+        self.assertFalse(await Submission.objects.aexists())
+
+    @override_settings(ACCESS_TOKEN_LIFETIME=-1)
+    async def test_authentication_runs_before_judging(self):
+        tokens = await asyncio.to_thread(issue_tokens, self.user)
+
+        response, payloads = await self.execute(
+            ['2', '4', '6'], headers={'Authorization': f"Bearer {tokens['access_token']}"}
+        )
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(payloads, [])
+
+    async def test_permissions_are_checked(self):
+        with mock.patch.object(AsyncExecuteCodeAPIView, 'permission_classes', [IsAuthenticated]):
+            response, payloads = await self.execute(['2', '4', '6'])
+
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(response.json()['success'])
+        self.assertEqual(payloads, [])
+
+    async def test_validation_errors(self):
+        response, payloads = await self.execute([], mode='run', custom_input=[1])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(payloads, [])
+
+    async def test_stream_pushes_events_from_the_async_pipeline(self):
+        self.executor, payloads = stub_executor(['2', '0', '6'])
+
+        response = await self.async_client.post('/api/judge/execute/stream', {
+            'question_id': self.question.id, 'user_code': 'code', 'language': 'python'
+        }, content_type='application/json')
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = [
+            (lines[0].removeprefix('event: '), json.loads(lines[1].removeprefix('data: ')))
+            for lines in (event.split('\n') for event in body.strip().split('\n\n'))
+        ]
+        self.assertEqual([name for name, _ in events], ['compile', 'case', 'case', 'done'])
+        self.assertEqual(events[0][1]['status'], 'ok')
+        self.assertEqual(events[-1][1]['verdict'], 'wrong_answer')
+        self.assertEqual(len(payloads), 2)
+
+
+class AsyncExecutionSchedulerTests(SimpleTestCase):
+
+    async def test_interactive_runs_are_admitted_ahead_of_waiting_batch_work(self):
+        scheduler = AsyncExecutionScheduler(slots=1, reserved_interactive=0)
+        admitted = []
+        release = asyncio.Event()
+
+        async def run(lane, name, hold=False):
+            async with scheduler.slot(lane):
+                admitted.append(name)
+                if hold:
+                    await release.wait()
+
+        holder = asyncio.create_task(run(ExecutionScheduler.BATCH, 'batch 1', hold=True))
+        await asyncio.sleep(0)
+        waiting = [
+            asyncio.create_task(run(ExecutionScheduler.BATCH, 'batch 2')),
+            asyncio.create_task(run(ExecutionScheduler.INTERACTIVE, 'run')),
+        ]
+        await asyncio.sleep(0)
+        self.assertEqual(scheduler.stats(), {'in_use': 1, 'waiting_interactive': 1})
+
+        release.set()
+        await asyncio.wait_for(asyncio.gather(holder, *waiting), timeout=5)
+
+        self.assertEqual(admitted, ['batch 1', 'run', 'batch 2'])
+        self.assertEqual(scheduler.stats(), {'in_use': 0, 'waiting_interactive': 0})
+
+    def test_each_event_loop_has_its_own_scheduler(self):
+        async def schedulers():
+            return loop_execution_scheduler(), loop_execution_scheduler()
+
+        first, again = asyncio.run(schedulers())
+        other, _ = asyncio.run(schedulers())
+
+        self.assertIs(first, again)
+        self.assertIsNot(first, other)
+
+
+class StarterCodeAuditTests(TestCase):
+
+    def setUp(self):
+        python = Language.objects.create(name='python')
+        java = Language.objects.create(name='java')
+        self.readable = Question.objects.create(title='Two Sum')
+        self.unreadable = Question.objects.create(title='Three Sum', problem_type='function_only_int')
+        Code.objects.create(question=self.readable, language=python, code_s3_key='readable/python.txt')
+        Code.objects.create(question=self.unreadable, language=python, code_s3_key='unreadable/python.txt')
+        Code.objects.create(question=self.unreadable, language=java, code_s3_key='missing/java.txt')
+
+    def test_unreadable_starter_code_is_reported_without_aborting(self):
+        storage = CountingStorage({
+            'readable/python.txt': 'def solution(a: int, b: int) -> int:\n    pass\n',
+            'unreadable/python.txt': 'def solution(a: int) -> int:\n    pass\n',
+        })
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch('utils.management.commands.audit_starter_code.S3Service', return_value=storage), \
+                mock.patch('utils.management.commands.audit_starter_code.ProcessPoolExecutor', ThreadPoolExecutor):
+            path = os.path.join(directory, 'report.ndjson')
+            stdout = StringIO()
+            call_command('audit_starter_code', output=path, min_score=101, stdout=stdout, stderr=StringIO())
+            with open(path, encoding='utf-8') as file:
+                report = {entry['question_id']: entry for entry in map(json.loads, file)}
+
+        self.assertIn('Audited 2 questions, 2 need attention', stdout.getvalue())
+        self.assertIsNotNone(report[self.readable.id]['detected_type'])
+        unreadable = report[self.unreadable.id]
+        self.assertEqual(unreadable['stored_type'], 'function_only_int')
+        self.assertEqual([issue['type'] for issue in unreadable['issues']], ['starter_code_unreadable'])